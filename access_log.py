@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步结构化日志
+访问日志和事件日志（文件保存等）都是 JSON 行，请求线程只把记录放进有界队列，
+由后台线程序列化并写入文件，请求处理不会等待终端或磁盘：
+- 队列已满时丢弃记录并计数，不会阻塞
+- 日志文件超过大小上限时轮转为 .1 .2 ...
+- 成功的 GET/HEAD 请求可以按比例采样，高峰期减少日志量
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import random
+import threading
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+# 后台线程一次最多写入的记录数
+WRITE_BATCH = 512
+SAMPLED_METHODS = ('GET', 'HEAD')
+
+
+def format_timestamp(ts):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(ts)) + f'.{int(ts % 1 * 1000):03d}'
+
+
+class AsyncLogWriter:
+    """
+    后台写日志的线程
+    path 为 None 时写到标准错误输出（同样在后台线程中写），否则写入文件并按大小轮转
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                 queue_size=DEFAULT_QUEUE_SIZE, sample_rate=1.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.sample_rate = sample_rate
+        self._queue = queue.Queue(maxsize=queue_size)
+        # 计数器在请求线程和写日志线程中都会更新
+        self._counter_lock = threading.Lock()
+        self.dropped = 0
+        self.sampled_out = 0
+        self.written = 0
+        self._file = None
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        """放入队列，队列已满时丢弃并返回 False"""
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self._count_dropped(1)
+            return False
+
+    def access(self, record):
+        """访问日志，成功的 GET/HEAD 按采样率记录"""
+        if (self.sample_rate < 1.0 and record.get('method') in SAMPLED_METHODS
+                and record.get('status', 500) < 400):
+            if random.random() >= self.sample_rate:
+                with self._counter_lock:
+                    self.sampled_out += 1
+                return False
+            record['sample_rate'] = self.sample_rate
+        record['ts'] = time.time()
+        record['type'] = 'access'
+        return self.submit(record)
+
+    def event(self, event, **fields):
+        fields['ts'] = time.time()
+        fields['type'] = 'event'
+        fields['event'] = event
+        return self.submit(fields)
+
+    def stats(self):
+        with self._counter_lock:
+            return {
+                'queued': self._queue.qsize(),
+                'dropped': self.dropped,
+                'sampled_out': self.sampled_out,
+                'written': self.written,
+            }
+
+    def _count_dropped(self, count):
+        with self._counter_lock:
+            self.dropped += count
+
+    def _format(self, record):
+        record = dict(record, ts=format_timestamp(record['ts']))
+        return json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+    def _run(self):
+        while True:
+            records = [self._queue.get()]
+            # 一次取出队列中已有的记录，合并成一次写入
+            while len(records) < WRITE_BATCH:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in records
+            lines = ''.join(self._format(record) for record in records if record is not None)
+            try:
+                self._write(lines)
+                with self._counter_lock:
+                    self.written += len(records) - stop
+            except (OSError, ValueError):
+                # 磁盘已满等错误时丢弃这一批，服务器继续运行
+                self._count_dropped(len(records) - stop)
+            if stop:
+                return
+
+    def _write(self, text):
+        if not text:
+            return
+        if self._file is None:
+            sys.stderr.write(text)
+            sys.stderr.flush()
+            return
+        self._file.write(text)
+        self._file.flush()
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """access.log -> access.log.1 -> access.log.2 ...，超过保留数量的删除"""
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f'{self.path}.{i}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{i + 1}')
+        if self.backup_count > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self, timeout=2.0):
+        """写完队列中剩余的记录后停止"""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        if self._file is not None:
+            self._file.close()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def configure_logging(path=None, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                      queue_size=DEFAULT_QUEUE_SIZE, sample_rate=1.0):
+    """按启动参数创建日志线程，替换之前的配置"""
+    global _writer
+    with _writer_lock:
+        old = _writer
+        _writer = AsyncLogWriter(path, max_bytes=max_bytes, backup_count=backup_count,
+                                 queue_size=queue_size, sample_rate=sample_rate)
+    if old is not None:
+        old.close()
+    return _writer
+
+
+def get_log_writer():
+    """进程内共用一个日志线程，没有配置时写到标准错误输出"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AsyncLogWriter()
+        return _writer
+
+
+def log_event(event, **fields):
+    """记录一条事件日志，如 log_event('upload_saved', file=..., size=...)"""
+    return get_log_writer().event(event, **fields)
+
+
+def log_access(record):
+    return get_log_writer().access(record)
+
+
+@atexit.register
+def _flush_on_exit():
+    if _writer is not None:
+        _writer.close()
+
+
+def add_logging_arguments(parser):
+    """为命令行解析器添加日志参数"""
+    parser.add_argument('--log-file', default=None,
+                        help='JSON 日志文件，不指定时输出到标准错误')
+    parser.add_argument('--log-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help=f'日志文件轮转大小（MB） (默认: {DEFAULT_MAX_BYTES // (1024 * 1024)})')
+    parser.add_argument('--log-backups', type=int, default=DEFAULT_BACKUP_COUNT,
+                        help=f'保留的旧日志文件数 (默认: {DEFAULT_BACKUP_COUNT})')
+    parser.add_argument('--log-sample', type=float, default=1.0,
+                        help='成功的 GET 请求的记录比例，0~1 (默认: 1，全部记录)')
+    return parser
+
+
+def configure_logging_from_args(args):
+    return configure_logging(args.log_file, max_bytes=args.log_max_mb * 1024 * 1024,
+                             backup_count=args.log_backups,
+                             sample_rate=max(0.0, min(1.0, args.log_sample)))
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传请求的准入控制
+在读取请求体之前决定是否接收，培训结束后集中上传时服务器仍能响应其他请求：
+- 请求体超过大小上限时直接返回 413，不读取请求体
+- 每个客户端（IP）同时进行的上传数有上限，上传请求的频率用令牌桶限制，超过时返回 429
+- 所有正在接收的请求体总字节数有上限，已满时返回 503 和 Retry-After
+
+只检查带请求体的请求（POST、PUT、PATCH），下载和页面访问不受影响。
+"""
+
+import json
+import math
+import time
+import threading
+
+from batch_upload import MAX_BATCH_SIZE
+from request_body import MAX_UPLOAD_SIZE
+
+BODY_METHODS = ('POST', 'PUT', 'PATCH')
+DEFAULT_MAX_BODY_SIZE = MAX_UPLOAD_SIZE
+DEFAULT_MAX_BATCH_SIZE = MAX_BATCH_SIZE
+# 每个客户端同时进行的上传数
+DEFAULT_UPLOADS_PER_CLIENT = 4
+# 每个客户端每秒的上传请求数，以及允许的突发数量
+DEFAULT_UPLOAD_RATE = 10.0
+DEFAULT_UPLOAD_BURST = 30
+# 所有正在接收的请求体的总大小
+DEFAULT_MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+# 客户端忙或服务器忙时建议的重试间隔（秒）
+RETRY_AFTER = 1
+# 记录令牌桶的客户端数上限，超过时清理令牌已满的客户端
+MAX_TRACKED_CLIENTS = 4096
+REJECTION_REASONS = ('body_too_large', 'rate_limited', 'client_busy', 'server_busy')
+
+
+class AdmissionRejected(Exception):
+    """请求不被接收，带HTTP状态码和建议的重试间隔"""
+
+    def __init__(self, status, reason, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.message = message
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """令牌桶：每秒补充 rate 个令牌，最多 burst 个"""
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now):
+        """取一个令牌，成功返回 0，否则返回需要等待的秒数"""
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionTicket:
+    """已接收的请求，处理结束后交还给 release()"""
+
+    __slots__ = ('controller', 'client', 'reserved')
+
+    def __init__(self, controller, client, reserved):
+        # 处理期间重新配置时仍然交还给接收它的 AdmissionController
+        self.controller = controller
+        self.client = client
+        self.reserved = reserved
+
+
+class AdmissionController:
+    """
+    所有请求线程共用的准入状态，upload_rate、uploads_per_client、max_inflight_bytes 为 0 时不限制
+    """
+
+    def __init__(self, max_body_size=DEFAULT_MAX_BODY_SIZE, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 uploads_per_client=DEFAULT_UPLOADS_PER_CLIENT, upload_rate=DEFAULT_UPLOAD_RATE,
+                 upload_burst=DEFAULT_UPLOAD_BURST, max_inflight_bytes=DEFAULT_MAX_INFLIGHT_BYTES):
+        self.max_body_size = max_body_size
+        self.max_batch_size = max_batch_size
+        self.uploads_per_client = uploads_per_client
+        self.upload_rate = upload_rate
+        self.upload_burst = max(1, upload_burst)
+        self.max_inflight_bytes = max_inflight_bytes
+        self._lock = threading.Lock()
+        # 客户端 -> 正在进行的上传数
+        self._active = {}
+        # 客户端 -> TokenBucket
+        self._buckets = {}
+        self.active_uploads = 0
+        self.inflight_bytes = 0
+        self.rejected = dict.fromkeys(REJECTION_REASONS, 0)
+
+    def body_limit(self, large=False):
+        return self.max_batch_size if large else self.max_body_size
+
+    def admit(self, client, content_length, large=False, metered=True):
+        """
+        在读取请求体之前调用，接收时返回 AdmissionTicket，否则抛出 AdmissionRejected
+        content_length 为 None 表示 chunked 请求，大小未知，按上限预留
+        metered 为假时不消耗令牌（同一个上传的后续分块），仍然检查同时上传数和总字节数
+        """
+        limit = self.body_limit(large)
+        if content_length is not None and content_length > limit:
+            self._count('body_too_large')
+            raise AdmissionRejected(413, 'body_too_large',
+                                    f'请求超过 {limit // (1024 * 1024)}MB')
+        reserved = limit if content_length is None else content_length
+        now = time.monotonic()
+        with self._lock:
+            if metered and self.upload_rate > 0:
+                bucket = self._buckets.get(client)
+                if bucket is None:
+                    if len(self._buckets) >= MAX_TRACKED_CLIENTS:
+                        self._prune_buckets(now)
+                    bucket = self._buckets[client] = TokenBucket(self.upload_rate,
+                                                                 self.upload_burst, now)
+                wait = bucket.take(now)
+                if wait:
+                    self.rejected['rate_limited'] += 1
+                    raise AdmissionRejected(429, 'rate_limited', '上传过于频繁，请稍后重试',
+                                            retry_after=max(1, math.ceil(wait)))
+            active = self._active.get(client, 0)
+            if self.uploads_per_client > 0 and active >= self.uploads_per_client:
+                self.rejected['client_busy'] += 1
+                raise AdmissionRejected(429, 'client_busy',
+                                        f'同时上传的请求超过 {self.uploads_per_client} 个',
+                                        retry_after=RETRY_AFTER)
+            # 没有其他请求时总是接收，单个请求不会因为超过总预算而永远无法上传
+            if (self.max_inflight_bytes > 0 and self.inflight_bytes > 0
+                    and self.inflight_bytes + reserved > self.max_inflight_bytes):
+                self.rejected['server_busy'] += 1
+                raise AdmissionRejected(503, 'server_busy', '服务器正在接收其他上传，请稍后重试',
+                                        retry_after=RETRY_AFTER)
+            self._active[client] = active + 1
+            self.active_uploads += 1
+            self.inflight_bytes += reserved
+        return AdmissionTicket(self, client, reserved)
+
+    def release(self, ticket):
+        with self._lock:
+            active = self._active.get(ticket.client, 0) - 1
+            if active > 0:
+                self._active[ticket.client] = active
+            else:
+                self._active.pop(ticket.client, None)
+            self.active_uploads -= 1
+            self.inflight_bytes -= ticket.reserved
+
+    def _count(self, reason):
+        with self._lock:
+            self.rejected[reason] += 1
+
+    def _prune_buckets(self, now):
+        """删除令牌已经补满的客户端，它们与新客户端没有区别"""
+        for client, bucket in list(self._buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.burst:
+                del self._buckets[client]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active_uploads': self.active_uploads,
+                'active_clients': len(self._active),
+                'inflight_bytes': self.inflight_bytes,
+                'max_inflight_bytes': self.max_inflight_bytes,
+                'rejected': dict(self.rejected),
+            }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def configure_admission(**options):
+    """按启动参数创建准入控制，替换之前的配置"""
+    global _controller
+    with _controller_lock:
+        _controller = AdmissionController(**options)
+        return _controller
+
+
+def get_admission_controller():
+    """进程内的所有服务器共用一个准入控制，没有配置时使用默认值"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
+
+
+class AdmissionHandlerMixin:
+    """
+    在请求头解析之后、调用 do_POST 等方法之前检查准入，不接收的请求直接返回错误并关闭连接
+    放在 BaseHTTPRequestHandler 子类的基类列表中 BaseHTTPRequestHandler 之前
+    ADMISSION_BATCH_ROUTES 中的路径（批量上传）使用批量上传的大小上限
+    ADMISSION_UNMETERED_ROUTES 中的 (方法, 路径前缀) 不计入上传频率，用于已创建的上传会话的分块
+    """
+
+    ADMISSION_BATCH_ROUTES = ()
+    ADMISSION_UNMETERED_ROUTES = ()
+
+    def handle_one_request(self):
+        self._admission_ticket = None
+        try:
+            super().handle_one_request()
+        finally:
+            if self._admission_ticket is not None:
+                self._admission_ticket.controller.release(self._admission_ticket)
+                self._admission_ticket = None
+
+    def parse_request(self):
+        if not super().parse_request():
+            return False
+        if self.command not in BODY_METHODS:
+            return True
+        chunked = 'chunked' in self.headers.get('Transfer-Encoding', '').lower()
+        content_length = None
+        if not chunked:
+            try:
+                content_length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                content_length = -1
+            if content_length < 0:
+                self.send_rejection(AdmissionRejected(400, None, 'Invalid Content-Length'))
+                return False
+            if content_length == 0:
+                return True
+        try:
+            self._admission_ticket = get_admission_controller().admit(
+                self.client_address[0], content_length, large=self.is_batch_request(),
+                metered=self.is_metered_request())
+        except AdmissionRejected as e:
+            self.send_rejection(e)
+            return False
+        return True
+
+    def is_batch_request(self):
+        """使用批量上传大小上限的请求"""
+        return self.path.split('?', 1)[0] in self.ADMISSION_BATCH_ROUTES
+
+    def is_metered_request(self):
+        """计入每个客户端上传频率的请求"""
+        path = self.path.split('?', 1)[0]
+        return not any(self.command == method and path.startswith(prefix)
+                       for method, prefix in self.ADMISSION_UNMETERED_ROUTES)
+
+    def send_rejection(self, error):
+        """请求体没有读取，发送错误后必须关闭连接"""
+        body = json.dumps({'success': False, 'error': error.message},
+                          ensure_ascii=False).encode('utf-8')
+        self.close_connection = True
+        self.send_response(error.status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if error.retry_after:
+            self.send_header('Retry-After', str(error.retry_after))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def add_admission_arguments(parser):
+    """为命令行解析器添加准入控制参数"""
+    parser.add_argument('--max-body-mb', type=int, default=DEFAULT_MAX_BODY_SIZE // (1024 * 1024),
+                        help=f'单个上传请求的大小上限（MB） (默认: {DEFAULT_MAX_BODY_SIZE // (1024 * 1024)})')
+    parser.add_argument('--max-batch-mb', type=int, default=DEFAULT_MAX_BATCH_SIZE // (1024 * 1024),
+                        help=f'批量上传请求的大小上限（MB） (默认: {DEFAULT_MAX_BATCH_SIZE // (1024 * 1024)})')
+    parser.add_argument('--uploads-per-client', type=int, default=DEFAULT_UPLOADS_PER_CLIENT,
+                        help=f'每个客户端同时进行的上传数，0 表示不限制 (默认: {DEFAULT_UPLOADS_PER_CLIENT})')
+    parser.add_argument('--upload-rate', type=float, default=DEFAULT_UPLOAD_RATE,
+                        help=f'每个客户端每秒的上传请求数，0 表示不限制 (默认: {DEFAULT_UPLOAD_RATE:g})')
+    parser.add_argument('--upload-burst', type=int, default=DEFAULT_UPLOAD_BURST,
+                        help=f'每个客户端允许连续发送的上传请求数 (默认: {DEFAULT_UPLOAD_BURST})')
+    parser.add_argument('--max-inflight-mb', type=int,
+                        default=DEFAULT_MAX_INFLIGHT_BYTES // (1024 * 1024),
+                        help='同时接收的请求体总大小（MB），0 表示不限制 '
+                             f'(默认: {DEFAULT_MAX_INFLIGHT_BYTES // (1024 * 1024)})')
+    return parser
+
+
+def configure_admission_from_args(args):
+    return configure_admission(max_body_size=args.max_body_mb * 1024 * 1024,
+                               max_batch_size=args.max_batch_mb * 1024 * 1024,
+                               uploads_per_client=args.uploads_per_client,
+                               upload_rate=args.upload_rate,
+                               upload_burst=args.upload_burst,
+                               max_inflight_bytes=args.max_inflight_mb * 1024 * 1024)
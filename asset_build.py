@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课件构建
+把课件目录和 uploads 目录中的HTML压缩后写入 dist/，文件名带内容哈希，
+如 dist/九年级下册第三章圆的对称性（雷新风）.3fa1c0d2e4.html，并生成 dist/manifest.json。
+服务器根据清单：
+- 带哈希的文件内容永远不会变化，发送 Cache-Control: immutable
+- 请求原文件时，如果清单中的构建结果是最新的，发送压缩后的版本
+
+构建是增量的，只处理大小、修改时间和内容哈希发生变化的文件：
+    python asset_build.py [--force]
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+
+from html_minify import minify_html
+
+DIST_DIRNAME = 'dist'
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = 1
+HASH_LENGTH = 10
+SOURCE_EXTENSIONS = ('.html', '.htm')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# 两次检查清单文件之间的最短间隔（秒）
+RELOAD_INTERVAL = 1.0
+
+
+def iter_sources(root_dir, uploads_dirname='uploads'):
+    """返回 (相对路径, 文件路径, stat)，包括 index.html"""
+    sources = ((root_dir, ''), (os.path.join(root_dir, uploads_dirname), uploads_dirname + '/'))
+    for directory, prefix in sources:
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.lower().endswith(SOURCE_EXTENSIONS) and entry.is_file():
+                yield prefix + entry.name, entry.path, entry.stat()
+
+
+def hashed_name(rel_path, digest):
+    """课件.html -> dist/课件.<哈希>.html"""
+    directory, name = os.path.split(rel_path)
+    stem, ext = os.path.splitext(name)
+    return '/'.join(filter(None, (DIST_DIRNAME, directory, f'{stem}.{digest[:HASH_LENGTH]}{ext.lower()}')))
+
+
+def read_manifest(root_dir):
+    path = os.path.join(root_dir, DIST_DIRNAME, MANIFEST_FILENAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def write_manifest(root_dir, files):
+    path = os.path.join(root_dir, DIST_DIRNAME, MANIFEST_FILENAME)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': files}, f,
+                  ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def build_one(root_dir, rel_path, file_path, stat):
+    """压缩一个文件，返回清单记录"""
+    with open(file_path, 'rb') as f:
+        source = f.read()
+    source_digest = hashlib.sha256(source).hexdigest()
+    output = minify_html(source.decode('utf-8', errors='surrogateescape')).encode(
+        'utf-8', errors='surrogateescape')
+    output_digest = hashlib.sha256(output).hexdigest()
+    output_rel = hashed_name(rel_path, output_digest)
+    output_path = os.path.join(root_dir, output_rel)
+    if not os.path.exists(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        temp_path = output_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(output)
+        os.replace(temp_path, output_path)
+    return {
+        'output': output_rel,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': source_digest,
+        'output_size': len(output),
+    }
+
+
+def build(root_dir, force=False):
+    """增量构建，返回统计信息"""
+    root_dir = os.path.abspath(root_dir)
+    os.makedirs(os.path.join(root_dir, DIST_DIRNAME), exist_ok=True)
+    old_files = {} if force else read_manifest(root_dir)
+    files = {}
+    stats = {'built': 0, 'unchanged': 0, 'removed': 0, 'source_bytes': 0, 'output_bytes': 0}
+    for rel_path, file_path, stat in iter_sources(root_dir):
+        entry = old_files.get(rel_path)
+        fresh = (entry is not None and entry['size'] == stat.st_size
+                 and entry['mtime_ns'] == stat.st_mtime_ns
+                 and os.path.exists(os.path.join(root_dir, entry['output'])))
+        if not fresh and entry is not None:
+            # 只是修改时间变化时按内容哈希判断
+            with open(file_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if digest == entry['sha256'] and os.path.exists(os.path.join(root_dir, entry['output'])):
+                entry = dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                fresh = True
+        if fresh:
+            stats['unchanged'] += 1
+        else:
+            entry = build_one(root_dir, rel_path, file_path, stat)
+            stats['built'] += 1
+        files[rel_path] = entry
+        stats['source_bytes'] += entry['size']
+        stats['output_bytes'] += entry['output_size']
+
+    # 删除不再使用的构建结果
+    used = {entry['output'] for entry in files.values()}
+    for entry in old_files.values():
+        if entry['output'] not in used:
+            try:
+                os.remove(os.path.join(root_dir, entry['output']))
+                stats['removed'] += 1
+            except OSError:
+                pass
+    write_manifest(root_dir, files)
+    return stats
+
+
+class AssetManifest:
+    """服务器使用的构建清单，清单文件更新后自动重新载入"""
+
+    def __init__(self, root_dir):
+        self.root_dir = os.path.abspath(root_dir)
+        self.path = os.path.join(self.root_dir, DIST_DIRNAME, MANIFEST_FILENAME)
+        self.version = None
+        self._lock = threading.Lock()
+        self._files = {}
+        # 原文件绝对路径 -> 清单记录
+        self._by_path = {}
+        # 构建结果的绝对路径
+        self._outputs = set()
+        self._last_check = 0
+
+    def _reload(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_check < RELOAD_INTERVAL:
+                return
+            self._last_check = now
+            try:
+                version = os.stat(self.path).st_mtime_ns
+            except OSError:
+                version = None
+            if version == self.version:
+                return
+            files = read_manifest(self.root_dir) if version is not None else {}
+            self._files = files
+            self._by_path = {os.path.join(self.root_dir, rel): entry for rel, entry in files.items()}
+            self._outputs = {os.path.join(self.root_dir, entry['output']) for entry in files.values()}
+            self.version = version
+
+    def check(self):
+        """返回清单的版本，清单变化时版本也会变化"""
+        self._reload()
+        return self.version
+
+    def is_immutable(self, file_path):
+        self._reload()
+        return os.path.abspath(file_path) in self._outputs
+
+    def built_path(self, file_path, stat):
+        """原文件对应的最新构建结果，没有构建或已过期时返回 None"""
+        self._reload()
+        entry = self._by_path.get(os.path.abspath(file_path))
+        if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            return None
+        return os.path.join(self.root_dir, entry['output'])
+
+    def href(self, rel_path, mtime_ns, size):
+        """课件目录中使用的地址，有最新构建结果时指向带哈希的文件"""
+        self._reload()
+        entry = self._files.get(rel_path)
+        if entry is None or entry['size'] != size or entry['mtime_ns'] != mtime_ns:
+            return rel_path
+        return entry['output']
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def get_asset_manifest(root_dir=None):
+    """每个课件目录共用一个 AssetManifest 实例"""
+    root_dir = os.path.abspath(root_dir or os.getcwd())
+    with _manifests_lock:
+        manifest = _manifests.get(root_dir)
+        if manifest is None:
+            manifest = AssetManifest(root_dir)
+            _manifests[root_dir] = manifest
+        return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='压缩课件HTML并生成带内容哈希的文件')
+    parser.add_argument('--root', default=os.getcwd(), help='课件目录 (默认: 当前目录)')
+    parser.add_argument('--force', action='store_true', help='忽略清单，全部重新构建')
+    args = parser.parse_args()
+    started = time.perf_counter()
+    stats = build(args.root, force=args.force)
+    elapsed = time.perf_counter() - started
+    saved = stats['source_bytes'] - stats['output_bytes']
+    ratio = saved / stats['source_bytes'] * 100 if stats['source_bytes'] else 0
+    print(f"构建完成: 重新构建 {stats['built']} 个, 未变化 {stats['unchanged']} 个, "
+          f"删除旧文件 {stats['removed']} 个, 用时 {elapsed:.2f} 秒")
+    print(f"总大小: {stats['source_bytes'] / 1024:.1f} KB -> {stats['output_bytes'] / 1024:.1f} KB, "
+          f"减少 {ratio:.1f}%")
+    print(f"清单: {os.path.join(DIST_DIRNAME, MANIFEST_FILENAME)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量上传
+一个请求上传一整个学期的课件：ZIP 压缩包，或者一个 multipart 请求中的多个文件。
+- ZIP 中的文件逐个按块解压到存储的临时文件，不会整个读入内存
+- 所有文件保存后在进程池中并行提取标题和作者
+- 返回每个文件的处理结果
+"""
+
+import os
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from html_metadata import extract_file_metadata
+from request_body import CHUNK_SIZE, MAX_UPLOAD_SIZE
+
+# 一次最多处理的文件数
+MAX_BATCH_FILES = 2000
+# 一次请求的总大小（压缩包大小，或者 multipart 请求体大小）
+MAX_BATCH_SIZE = 500 * 1024 * 1024
+# 解压后的总大小，防止压缩炸弹
+MAX_EXTRACTED_SIZE = 1024 * 1024 * 1024
+ZIP_CONTENT_TYPES = ('application/zip', 'application/x-zip-compressed')
+ACCEPTED_EXTENSIONS = ('.html', '.htm')
+# 文件数少于这个值时直接在当前进程中解析，启动进程池不划算
+PARALLEL_THRESHOLD = 8
+
+
+class BatchError(Exception):
+    """整个批次无法处理，带HTTP状态码"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class BatchEntry:
+    """批次中的一个文件，也作为 multipart 分段的 sink 使用"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.status = 'ok'
+        self.error = None
+        self.writer = None
+        self.saved_filename = None
+        self.path = None
+        self.digest = None
+        self.size = 0
+        self.meta = None
+
+    def fail(self, status, error):
+        self.status = status
+        self.error = error
+        self.abort()
+
+    def write(self, data):
+        """写入存储的临时文件，超过大小上限后丢弃剩余内容"""
+        if self.writer is None:
+            return
+        self.writer.write(data)
+        self.size = self.writer.size
+        if self.size > MAX_UPLOAD_SIZE:
+            self.fail('error', f'文件超过 {MAX_UPLOAD_SIZE // (1024 * 1024)}MB')
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.abort()
+            self.writer = None
+
+    def to_dict(self):
+        result = {'filename': self.filename, 'status': self.status}
+        if self.status == 'ok':
+            result.update({
+                'saved_filename': self.saved_filename,
+                'size': self.size,
+                'sha256': self.digest,
+            })
+            if self.meta:
+                result.update(title=self.meta.get('title'), author=self.meta.get('author'),
+                              category=self.meta.get('category'))
+        else:
+            result['error'] = self.error
+        return result
+
+
+def is_accepted_file(filename):
+    return filename.lower().endswith(ACCEPTED_EXTENSIONS)
+
+
+def is_zip_request(content_type):
+    return content_type.split(';', 1)[0].strip().lower() in ZIP_CONTENT_TYPES
+
+
+def zip_member_name(info):
+    """
+    压缩包中的文件名
+    Windows 自带的压缩工具不设置 UTF-8 标志，中文文件名实际是 GBK 编码
+    """
+    name = info.filename
+    if not info.flag_bits & 0x800:
+        try:
+            name = name.encode('cp437').decode('gbk')
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return name
+
+
+def extract_zip(archive_path, store):
+    """把压缩包中的课件逐个解压到存储的临时文件中，返回 BatchEntry 列表（尚未提交）"""
+    entries = []
+    extracted = 0
+    try:
+        archive = zipfile.ZipFile(archive_path)
+    except zipfile.BadZipFile:
+        raise BatchError(400, '不是有效的ZIP文件')
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            name = zip_member_name(info)
+            basename = os.path.basename(name.replace('\\', '/'))
+            # macOS 压缩时附带的资源文件
+            if name.startswith('__MACOSX/') or basename.startswith('._') or not basename:
+                continue
+            if len(entries) >= MAX_BATCH_FILES:
+                abort_entries(entries, store)
+                raise BatchError(413, f'文件数超过上限 {MAX_BATCH_FILES}')
+            entry = BatchEntry(name)
+            entries.append(entry)
+            if not is_accepted_file(basename):
+                entry.fail('skipped', '不是HTML课件')
+                continue
+            if info.file_size > MAX_UPLOAD_SIZE:
+                entry.fail('error', f'文件超过 {MAX_UPLOAD_SIZE // (1024 * 1024)}MB')
+                continue
+            entry.writer = store.open_writer()
+            try:
+                with archive.open(info) as member:
+                    # 压缩包中记录的大小可能是伪造的，按实际解压的字节数检查
+                    for data in iter(lambda: member.read(CHUNK_SIZE), b''):
+                        entry.write(data)
+                        extracted += len(data)
+                        if entry.writer is None:
+                            break
+                        if extracted > MAX_EXTRACTED_SIZE:
+                            abort_entries(entries, store)
+                            raise BatchError(413, '解压后的总大小超过上限')
+                entry.close()
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, RuntimeError, OSError) as e:
+                # RuntimeError: 加密的文件
+                entry.fail('error', str(e))
+    return entries
+
+
+def abort_entries(entries, store):
+    """删除尚未提交的临时文件，已经提交的文件名连同引用记录一起删除"""
+    for entry in entries:
+        entry.abort()
+        if entry.saved_filename is not None:
+            store.unlink(entry.saved_filename)
+            entry.saved_filename = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_metadata_pool():
+    """进程内共用一个解析进程池，第一次使用时创建"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 服务器是多线程的，fork 可能复制其他线程持有的锁，使用 spawn 启动子进程
+            _pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_metadata_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def parse_metadata_parallel(items):
+    """
+    items 为 [(文件路径, 原始文件名)]，返回对应的课件信息列表
+    文件较多时在进程池中并行解析
+    """
+    if len(items) < PARALLEL_THRESHOLD:
+        return [extract_file_metadata(path, filename) for path, filename in items]
+    paths = [path for path, _ in items]
+    filenames = [filename for _, filename in items]
+    try:
+        chunksize = max(1, len(items) // (4 * (os.cpu_count() or 1)))
+        return list(get_metadata_pool().map(extract_file_metadata, paths, filenames,
+                                            chunksize=chunksize))
+    except (BrokenProcessPool, OSError):
+        # 子进程异常退出时重建进程池，本次在当前进程中解析
+        _reset_metadata_pool()
+        return [extract_file_metadata(path, filename) for path, filename in items]
+
+
+def summarize(entries, elapsed):
+    """每个文件的处理结果"""
+    counts = {'ok': 0, 'skipped': 0, 'error': 0}
+    for entry in entries:
+        counts[entry.status] += 1
+    return {
+        'success': counts['error'] == 0,
+        'total': len(entries),
+        'saved': counts['ok'],
+        'skipped': counts['skipped'],
+        'failed': counts['error'],
+        'elapsed_ms': round(elapsed * 1000, 2),
+        'files': [entry.to_dict() for entry in entries],
+        'message': f"成功上传 {counts['ok']} 个文件"
+    }
@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传和下载的本地压力测试
+在临时目录中启动 server.py、upload_server.py 和 file_server.py（当前进程内或子进程），
+模拟一个班级同时访问，按文件大小和并发数组合测试：
+- get-page     打开主页（index.html，upload_server 的 /）
+- get-course   下载课件（server、file_server）
+- upload-json  JSON 上传（server、upload_server 的 /upload）
+- upload-multipart  multipart 上传（file_server 的 /upload，其余的 /batch）
+- mixed        按固定比例混合以上请求，大部分是下载
+
+每个组合记录吞吐量和 p50/p95/p99 延迟，结果写入 JSON。用 --compare 和上次的结果比较，
+延迟或吞吐量变差超过阈值时返回非零退出码，部署前可以发现性能退化。
+默认每个请求新建连接；--keep-alive 时每个模拟的客户端复用一个 HTTP/1.1 连接，和浏览器一样。
+
+    python bench.py --sizes 4k 64k 1m --concurrency 1 8 32 -o bench-results.json
+    python bench.py --compare bench-baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import importlib
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+from server_runtime import DEFAULT_MAX_QUEUE, DEFAULT_WORKERS, SERVER_MODES
+
+RESULT_VERSION = 1
+SERVERS = ('server', 'upload', 'file')
+SERVER_SCRIPTS = {'server': 'server.py', 'upload': 'upload_server.py', 'file': 'file_server.py'}
+# (模块, 请求处理器)，在当前进程中启动时使用
+SERVER_HANDLERS = {
+    'server': ('server', 'CoursewareHandler'),
+    'upload': ('upload_server', 'UploadHandler'),
+    'file': ('file_server', 'UploadHandler'),
+}
+# 启动时会打开浏览器的服务器
+BROWSER_SERVERS = ('server', 'upload')
+# 每个服务器支持的测试项目
+SERVER_WORKLOADS = {
+    'server': ('get-page', 'get-course', 'upload-json', 'upload-multipart', 'mixed'),
+    'upload': ('get-page', 'upload-json', 'upload-multipart', 'mixed'),
+    'file': ('get-page', 'get-course', 'upload-multipart', 'mixed'),
+}
+WORKLOADS = ('get-page', 'get-course', 'upload-json', 'upload-multipart', 'mixed')
+# 与文件大小无关的项目只在第一个大小下测试一次
+SIZELESS_WORKLOADS = ('get-page',)
+# mixed 中各类请求的比例：课堂上大部分请求是打开课件
+MIXED_WEIGHTS = (('get', 80), ('list', 10), ('upload', 10))
+
+DEFAULT_SIZES = ('4k', '64k', '1m')
+DEFAULT_CONCURRENCY = (1, 8, 32)
+DEFAULT_REQUESTS = 200
+DEFAULT_THRESHOLD = 0.2
+REQUEST_TIMEOUT = 30
+STARTUP_TIMEOUT = 15
+MULTIPART_BOUNDARY = 'benchboundary7d3f9a'
+SIZE_UNITS = {'k': 1024, 'm': 1024 * 1024}
+# 所有模拟的客户端都来自同一个地址，关闭按客户端的上传限制，只保留全局的限制
+ADMISSION_OPTIONS = {'uploads_per_client': 0, 'upload_rate': 0}
+ADMISSION_ARGUMENTS = ['--uploads-per-client', '0', '--upload-rate', '0']
+
+
+def parse_size(text):
+    """4k、64K、1m 或字节数"""
+    text = text.strip().lower()
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size):
+    if size is None:
+        return '-'
+    for unit, factor in (('m', 1024 * 1024), ('k', 1024)):
+        if size >= factor and size % factor == 0:
+            return f'{size // factor}{unit}'
+    return str(size)
+
+
+def percentile(sorted_values, p):
+    """最近秩法的百分位数，输入已排序"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def course_html(size, marker=''):
+    """指定大小的课件页面，marker 让每次上传的内容不同，不会被去重"""
+    head = (f'<!DOCTYPE html><html><head><meta charset="UTF-8">'
+            f'<title>压力测试课件{marker}（测试）</title></head><body>\n').encode('utf-8')
+    tail = b'\n</body></html>\n'
+    line = '<p>二次函数 y=ax^2+bx+c 的图像与性质</p>\n'.encode('utf-8')
+    body_size = max(0, size - len(head) - len(tail))
+    body = (line * (body_size // len(line) + 1))[:body_size]
+    return head + body + tail
+
+
+def course_filename(size):
+    return f'bench-{format_size(size)}.html'
+
+
+def prepare_workdir(workdir, sizes, source_dir):
+    """测试目录：主页和各个大小的课件，服务器的 uploads 也写在这里"""
+    os.makedirs(workdir, exist_ok=True)
+    index_path = os.path.join(source_dir, 'index.html')
+    if os.path.exists(index_path):
+        shutil.copy2(index_path, os.path.join(workdir, 'index.html'))
+    else:
+        with open(os.path.join(workdir, 'index.html'), 'wb') as f:
+            f.write(course_html(16 * 1024))
+    for size in sizes:
+        with open(os.path.join(workdir, course_filename(size)), 'wb') as f:
+            f.write(course_html(size))
+
+
+def free_port(host):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(host, port, timeout=STARTUP_TIMEOUT, process=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f'服务器进程已退出，退出码 {process.returncode}')
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f'服务器在 {timeout} 秒内没有启动: {host}:{port}')
+
+
+class InProcessServer:
+    """在当前进程的后台线程中运行服务器，工作目录切换到测试目录"""
+
+    def __init__(self, kind, workdir, host, mode, workers, max_queue):
+        self.kind = kind
+        self.workdir = workdir
+        self.host = host
+        self.mode = mode
+        self.workers = workers
+        self.max_queue = max_queue
+        self.server = None
+        self.port = None
+
+    def start(self):
+        # 服务器按 os.getcwd() 查找课件和 uploads 目录
+        os.chdir(self.workdir)
+        from access_log import configure_logging
+        from admission import configure_admission
+        from server_runtime import create_server
+        configure_logging(os.path.join(self.workdir, f'{self.kind}-server.log'))
+        configure_admission(**ADMISSION_OPTIONS)
+        module_name, handler_name = SERVER_HANDLERS[self.kind]
+        handler_class = getattr(importlib.import_module(module_name), handler_name)
+        self.server = create_server((self.host, 0), handler_class, mode=self.mode,
+                                    workers=self.workers, max_queue=self.max_queue)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        wait_for_port(self.host, self.port)
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+class SubprocessServer:
+    """在子进程中运行服务器脚本，压力测试客户端不会和服务器争用 GIL"""
+
+    def __init__(self, kind, workdir, host, mode, workers, max_queue):
+        self.kind = kind
+        self.workdir = workdir
+        self.host = host
+        self.mode = mode
+        self.workers = workers
+        self.max_queue = max_queue
+        self.process = None
+        self.port = None
+
+    def start(self):
+        self.port = free_port(self.host)
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), SERVER_SCRIPTS[self.kind])
+        command = [sys.executable, script, '--host', self.host, '--port', str(self.port),
+                   '--mode', self.mode, '--workers', str(self.workers),
+                   '--max-queue', str(self.max_queue),
+                   '--log-file', os.path.join(self.workdir, f'{self.kind}-server.log')]
+        command += ADMISSION_ARGUMENTS
+        if self.kind in BROWSER_SERVERS:
+            command.append('--no-browser')
+        self.process = subprocess.Popen(command, cwd=self.workdir, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(self.host, self.port, process=self.process)
+        except RuntimeError:
+            self.stop()
+            raise
+        return self
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+def multipart_body(filename, content):
+    head = (f'--{MULTIPART_BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+            f'Content-Type: text/html\r\n\r\n').encode('utf-8')
+    return head + content + f'\r\n--{MULTIPART_BOUNDARY}--\r\n'.encode('utf-8')
+
+
+class RequestFactory:
+    """按服务器、项目和大小生成第 i 个请求 (method, path, body, headers)"""
+
+    def __init__(self, kind, workload, size, seed=0):
+        self.kind = kind
+        self.workload = workload
+        self.size = size
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        if workload == 'mixed':
+            # 预先生成请求类型序列，每次运行完全相同
+            population = [name for name, weight in MIXED_WEIGHTS for _ in range(weight)]
+            self.sequence = [self.random.choice(population) for _ in range(1000)]
+
+    def page(self):
+        return ('GET', '/index.html' if self.kind == 'file' else '/', None, {})
+
+    def course(self):
+        if self.kind == 'upload':
+            # upload_server 没有课件下载，用分页文件列表代替
+            return ('GET', '/files?limit=50', None, {})
+        return ('GET', '/' + course_filename(self.size), None, {})
+
+    def listing(self):
+        if self.kind == 'upload':
+            return ('GET', '/files?limit=50', None, {})
+        return ('GET', '/api/courses', None, {})
+
+    def upload_json(self, i):
+        content = course_html(self.size, marker=f'-{i}').decode('utf-8', 'replace')
+        body = json.dumps({'filename': f'bench-{i}.html', 'content': content},
+                          ensure_ascii=False).encode('utf-8')
+        return ('POST', '/upload', body, {'Content-Type': 'application/json'})
+
+    def upload_multipart(self, i):
+        body = multipart_body(f'bench-{i}.html', course_html(self.size, marker=f'-{i}'))
+        path = '/upload' if self.kind == 'file' else '/batch'
+        return ('POST', path, body,
+                {'Content-Type': f'multipart/form-data; boundary={MULTIPART_BOUNDARY}'})
+
+    def upload(self, i):
+        if self.kind == 'upload':
+            return self.upload_json(i)
+        return self.upload_multipart(i)
+
+    def make(self, i):
+        if self.workload == 'get-page':
+            return self.page()
+        if self.workload == 'get-course':
+            return self.course()
+        if self.workload == 'upload-json':
+            return self.upload_json(i)
+        if self.workload == 'upload-multipart':
+            return self.upload_multipart(i)
+        kind = self.sequence[i % len(self.sequence)]
+        if kind == 'get':
+            return self.course()
+        if kind == 'list':
+            return self.listing()
+        return self.upload(i)
+
+
+def send_request(host, port, method, path, body, headers, connection=None):
+    """
+    发送一个请求并读完响应，返回 (状态码, 发送字节数, 接收字节数)
+    connection 为客户端复用的连接，服务器关闭连接后 http.client 会在下一个请求时重新连接
+    """
+    reuse = connection is not None
+    if not reuse:
+        connection = http.client.HTTPConnection(host, port, timeout=REQUEST_TIMEOUT)
+    try:
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        received = 0
+        while True:
+            data = response.read(64 * 1024)
+            if not data:
+                break
+            received += len(data)
+        return response.status, len(body or b''), received
+    except (OSError, http.client.HTTPException):
+        # 响应没有读完的连接不能再用
+        connection.close()
+        raise
+    finally:
+        if not reuse:
+            connection.close()
+
+
+def run_case(host, port, factory, requests, concurrency, warmup, keep_alive=False):
+    """
+    concurrency 个客户端线程共发送 requests 个请求，返回统计结果
+    预热请求不计入统计；keep_alive 为真时每个客户端线程复用一个连接
+    """
+    counter = iter(range(warmup + requests))
+    counter_lock = threading.Lock()
+    latencies = []
+    statuses = {}
+    totals = {'errors': 0, 'sent': 0, 'received': 0}
+    stats_lock = threading.Lock()
+    # 第一个正式请求发出的时间
+    started = [time.perf_counter()]
+
+    def client():
+        connection = None
+        if keep_alive:
+            connection = http.client.HTTPConnection(host, port, timeout=REQUEST_TIMEOUT)
+        try:
+            send_requests(connection)
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def send_requests(connection):
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+                if i is None:
+                    return
+                if i == warmup:
+                    started[0] = time.perf_counter()
+            method, path, body, headers = factory.make(i)
+            begin = time.perf_counter()
+            try:
+                status, sent, received = send_request(host, port, method, path, body, headers,
+                                                      connection)
+            except (OSError, http.client.HTTPException):
+                status, sent, received = None, 0, 0
+            elapsed = time.perf_counter() - begin
+            if i < warmup:
+                continue
+            with stats_lock:
+                latencies.append(elapsed)
+                key = str(status) if status is not None else 'error'
+                statuses[key] = statuses.get(key, 0) + 1
+                if status is None or status >= 400:
+                    totals['errors'] += 1
+                totals['sent'] += sent
+                totals['received'] += received
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bench-client') as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started[0]
+
+    latencies.sort()
+    latency_ms = {
+        'min': latencies[0] * 1000 if latencies else 0.0,
+        'mean': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'p50': percentile(latencies, 50) * 1000,
+        'p95': percentile(latencies, 95) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'max': latencies[-1] * 1000 if latencies else 0.0,
+    }
+    transferred = totals['sent'] + totals['received']
+    return {
+        'requests': len(latencies),
+        'errors': totals['errors'],
+        'status': dict(sorted(statuses.items())),
+        'elapsed_s': round(elapsed, 4),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'throughput_mbps': round(transferred / elapsed / (1024 * 1024), 3) if elapsed > 0 else 0.0,
+        'bytes_sent': totals['sent'],
+        'bytes_received': totals['received'],
+        'latency_ms': {key: round(value, 3) for key, value in latency_ms.items()},
+    }
+
+
+def case_key(result):
+    return (result['server'], result['workload'], result['size'], result['concurrency'])
+
+
+def iter_cases(servers, workloads, sizes, concurrency_levels):
+    for kind in servers:
+        for workload in workloads:
+            if workload not in SERVER_WORKLOADS[kind]:
+                continue
+            workload_sizes = sizes[:1] if workload in SIZELESS_WORKLOADS else sizes
+            for size in workload_sizes:
+                for concurrency in concurrency_levels:
+                    yield kind, workload, None if workload in SIZELESS_WORKLOADS else size, concurrency
+
+
+def run_benchmark(args, sizes, log=print):
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench-')
+    prepare_workdir(workdir, sizes, source_dir)
+    server_class = SubprocessServer if args.subprocess else InProcessServer
+    original_cwd = os.getcwd()
+    results = []
+    try:
+        for kind in args.servers:
+            cases = list(iter_cases([kind], args.workloads, sizes, args.concurrency))
+            if not cases:
+                continue
+            server = server_class(kind, workdir, args.host, args.mode, args.workers,
+                                  args.max_queue).start()
+            try:
+                for _, workload, size, concurrency in cases:
+                    factory = RequestFactory(kind, workload, size or sizes[0], seed=args.seed)
+                    stats = run_case(args.host, server.port, factory, args.requests,
+                                     concurrency, args.warmup, keep_alive=args.keep_alive)
+                    result = {'server': kind, 'workload': workload, 'size': size,
+                              'concurrency': concurrency}
+                    result.update(stats)
+                    results.append(result)
+                    log(format_result(result))
+            finally:
+                server.stop()
+    finally:
+        os.chdir(original_cwd)
+        if not args.workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def format_result(result):
+    latency = result['latency_ms']
+    return (f"  {result['server']:<6} {result['workload']:<16} {format_size(result['size']):>5} "
+            f"c={result['concurrency']:<3} {result['throughput_rps']:>9.1f} req/s "
+            f"{result['throughput_mbps']:>8.2f} MB/s  p50 {latency['p50']:>8.2f} "
+            f"p95 {latency['p95']:>8.2f} p99 {latency['p99']:>8.2f} ms"
+            + (f"  错误 {result['errors']}" if result['errors'] else ''))
+
+
+def environment(args):
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'process': 'subprocess' if args.subprocess else 'in-process',
+        'mode': args.mode,
+        'workers': args.workers,
+        'max_queue': args.max_queue,
+        'requests': args.requests,
+        'warmup': args.warmup,
+        'keep_alive': args.keep_alive,
+        'seed': args.seed,
+    }
+
+
+def compare_results(baseline, results, threshold):
+    """
+    和上次的结果比较相同的组合，返回 [(结果, 上次结果, 说明)] 中变差超过阈值的项
+    p95 延迟增加或吞吐量下降超过 threshold（比例）算作退化
+    """
+    previous = {case_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        reasons = []
+        old_p95, new_p95 = old['latency_ms']['p95'], result['latency_ms']['p95']
+        if old_p95 > 0 and new_p95 > old_p95 * (1 + threshold):
+            reasons.append(f'p95 {old_p95:.2f} -> {new_p95:.2f} ms')
+        old_rps, new_rps = old['throughput_rps'], result['throughput_rps']
+        if old_rps > 0 and new_rps < old_rps * (1 - threshold):
+            reasons.append(f'吞吐量 {old_rps:.1f} -> {new_rps:.1f} req/s')
+        if result['errors'] > old['errors']:
+            reasons.append(f"错误 {old['errors']} -> {result['errors']}")
+        if reasons:
+            regressions.append((result, old, '，'.join(reasons)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='上传和下载的本地压力测试')
+    parser.add_argument('--servers', nargs='+', default=list(SERVERS), metavar='server',
+                        help=f"要测试的服务器: {', '.join(SERVERS)} (默认: 全部)")
+    parser.add_argument('--workloads', nargs='+', default=list(WORKLOADS), metavar='workload',
+                        help=f"测试项目: {', '.join(WORKLOADS)} (默认: 全部)")
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES), metavar='size',
+                        help=f"课件大小，如 4k 64k 1m (默认: {' '.join(DEFAULT_SIZES)})")
+    parser.add_argument('--concurrency', nargs='+', type=int, default=list(DEFAULT_CONCURRENCY),
+                        metavar='n', help='并发客户端数 (默认: 1 8 32)')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS,
+                        help=f'每个组合的请求数 (默认: {DEFAULT_REQUESTS})')
+    parser.add_argument('--warmup', type=int, default=10, help='每个组合的预热请求数 (默认: 10)')
+    parser.add_argument('--subprocess', action='store_true',
+                        help='在子进程中启动服务器（默认在当前进程中）')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址 (默认: 127.0.0.1)')
+    parser.add_argument('--mode', choices=SERVER_MODES, default='threadpool',
+                        help='服务器并发模式 (默认: threadpool)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'服务器工作线程数 (默认: {DEFAULT_WORKERS})')
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help=f'服务器排队上限 (默认: {DEFAULT_MAX_QUEUE})')
+    parser.add_argument('--keep-alive', action='store_true',
+                        help='每个客户端复用一个连接（默认每个请求新建连接）')
+    parser.add_argument('--seed', type=int, default=0, help='mixed 请求序列的随机种子 (默认: 0)')
+    parser.add_argument('--workdir', help='测试目录 (默认: 临时目录，测试后删除)')
+    parser.add_argument('--keep', action='store_true', help='保留临时测试目录')
+    parser.add_argument('-o', '--output', default='bench-results.json',
+                        help='结果文件 (默认: bench-results.json)')
+    parser.add_argument('--compare', metavar='baseline.json', help='与之前的结果比较')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'判定为退化的变化比例 (默认: {DEFAULT_THRESHOLD})')
+    args = parser.parse_args()
+    for name in args.servers:
+        if name not in SERVERS:
+            parser.error(f'未知的服务器: {name}')
+    for name in args.workloads:
+        if name not in WORKLOADS:
+            parser.error(f'未知的测试项目: {name}')
+    try:
+        sizes = [parse_size(size) for size in args.sizes]
+    except ValueError:
+        parser.error(f"无效的大小: {' '.join(args.sizes)}")
+    if args.requests <= 0 or min(args.concurrency) <= 0:
+        parser.error('请求数和并发数必须大于 0')
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    output = os.path.abspath(args.output)
+
+    print(f"压力测试: {', '.join(args.servers)} | 每个组合 {args.requests} 个请求 | "
+          f"{'子进程' if args.subprocess else '当前进程'}")
+    started = time.perf_counter()
+    results = run_benchmark(args, sizes)
+    report = {
+        'version': RESULT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(args),
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f"完成 {len(results)} 个组合，用时 {time.perf_counter() - started:.1f} 秒，"
+          f"结果已保存到 {output}")
+
+    if baseline is not None:
+        previous = baseline.get('environment', {})
+        if any(previous.get(key) != report['environment'][key] for key in ('process', 'keep_alive')):
+            print('⚠️  与基准结果的运行方式不同，比较结果仅供参考')
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"发现 {len(regressions)} 项性能退化（阈值 {args.threshold:.0%}）:")
+            for result, _, reason in regressions:
+                print(f"  {result['server']} {result['workload']} {format_size(result['size'])} "
+                      f"c={result['concurrency']}: {reason}")
+            raise SystemExit(1)
+        print(f"与 {args.compare} 相比没有性能退化（阈值 {args.threshold:.0%}）")
+
+
+if __name__ == '__main__':
+    main()
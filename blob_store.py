@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按内容寻址的上传存储
+上传内容在写入的同时计算 SHA-256，相同内容只保存一份（uploads/.blobs/<摘要>），
+uploads 目录下的文件名通过硬链接指向对应的内容，名称和摘要的对应关系
+记录在 uploads/.blobs/refs.jsonl 中（只追加，删除的名称写入一条 deleted 记录）。
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+import uuid
+
+BLOBS_DIRNAME = '.blobs'
+REFS_FILENAME = 'refs.jsonl'
+
+
+def is_valid_digest(digest):
+    """检查是否为合法的 SHA-256 十六进制摘要"""
+    return len(digest) == 64 and all(c in '0123456789abcdef' for c in digest)
+
+
+class BlobWriter:
+    """边写入边计算摘要的临时文件，调用 commit() 后才会进入存储"""
+
+    def __init__(self, store):
+        self.store = store
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.temp_path = os.path.join(store.tmp_dir, uuid.uuid4().hex)
+        self.file = open(self.temp_path, 'wb')
+        self.digest = None
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.size += len(data)
+        self.file.write(data)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def abort(self):
+        """放弃写入并删除临时文件"""
+        self.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def commit(self, name):
+        """把内容存入存储并以 name 的名字出现在上传目录中，返回完整路径"""
+        self.close()
+        self.digest = self.hasher.hexdigest()
+        self.store.adopt_temp(self.temp_path, self.digest)
+        return self.store.link(self.digest, name)
+
+
+class BlobStore:
+    """内容寻址存储，所有方法都是线程安全的"""
+
+    def __init__(self, uploads_dir):
+        self.uploads_dir = uploads_dir
+        self.blobs_dir = os.path.join(uploads_dir, BLOBS_DIRNAME)
+        self.tmp_dir = os.path.join(self.blobs_dir, 'tmp')
+        self.refs_path = os.path.join(self.blobs_dir, REFS_FILENAME)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._refs = self._load_refs()
+
+    def _load_refs(self):
+        refs = {}
+        if os.path.exists(self.refs_path):
+            with open(self.refs_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 写入中断留下的半行
+                        continue
+                    if entry.get('deleted'):
+                        refs.pop(entry['name'], None)
+                    else:
+                        refs[entry['name']] = entry
+        return refs
+
+    def blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    def has_blob(self, digest):
+        return is_valid_digest(digest) and os.path.exists(self.blob_path(digest))
+
+    def blob_size(self, digest):
+        """返回内容大小，不存在时返回 None"""
+        if not is_valid_digest(digest):
+            return None
+        try:
+            return os.path.getsize(self.blob_path(digest))
+        except OSError:
+            return None
+
+    def get_ref(self, name):
+        with self._lock:
+            return self._refs.get(name)
+
+    def referenced_digests(self):
+        """上传目录中仍然存在的文件所指向的全部内容摘要"""
+        with self._lock:
+            refs = list(self._refs.values())
+        return {entry['digest'] for entry in refs
+                if os.path.exists(os.path.join(self.uploads_dir, entry['name']))}
+
+    def open_writer(self):
+        return BlobWriter(self)
+
+    def adopt_temp(self, temp_path, digest):
+        """
+        把已经计算好摘要的临时文件移入存储（临时文件会被移走或删除）
+        临时文件必须与上传目录在同一文件系统上，例如在 tmp_dir 中
+        """
+        path = self.blob_path(digest)
+        with self._lock:
+            if os.path.exists(path):
+                # 相同内容已经存在，丢弃这一份
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+
+    def link(self, digest, name):
+        """让上传目录中的 name 指向已有内容，返回完整路径"""
+        blob = self.blob_path(digest)
+        target = os.path.join(self.uploads_dir, name)
+        with self._lock:
+            if not os.path.exists(blob):
+                raise FileNotFoundError(digest)
+            if os.path.exists(target):
+                os.remove(target)
+            try:
+                os.link(blob, target)
+            except OSError:
+                # 文件系统不支持硬链接时退回到复制
+                shutil.copyfile(blob, target)
+            entry = {
+                'name': name,
+                'digest': digest,
+                'size': os.path.getsize(blob),
+                'created': time.time()
+            }
+            self._refs[name] = entry
+            with open(self.refs_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return target
+
+    def unlink(self, name):
+        """
+        删除上传目录中的 name 和它的引用记录（例如上传失败时撤销已提交的文件），
+        没有其他名称指向的内容也一起删除，不再被当作已有内容
+        """
+        target = os.path.join(self.uploads_dir, name)
+        with self._lock:
+            if os.path.exists(target):
+                os.remove(target)
+            entry = self._refs.pop(name, None)
+            if entry is None:
+                return
+            with open(self.refs_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'name': name, 'deleted': True}, ensure_ascii=False) + '\n')
+            digest = entry['digest']
+            if not any(ref['digest'] == digest for ref in self._refs.values()):
+                blob = self.blob_path(digest)
+                if os.path.exists(blob):
+                    os.remove(blob)
+
+    def save_stream(self, name, chunks):
+        """把数据块写入存储，返回 (完整路径, 摘要, 字节数)"""
+        writer = self.open_writer()
+        try:
+            for data in chunks:
+                writer.write(data)
+            path = writer.commit(name)
+        except BaseException:
+            writer.abort()
+            raise
+        return path, writer.digest, writer.size
+
+    def save_bytes(self, name, data):
+        return self.save_stream(name, [data])
+
+    def save_file(self, name, source_path, chunk_size=64 * 1024):
+        """
+        把已经在磁盘上的文件移入存储（源文件会被移走或删除）
+        源文件必须与上传目录在同一文件系统上，返回 (完整路径, 摘要, 字节数)
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        with open(source_path, 'rb') as f:
+            for data in iter(lambda: f.read(chunk_size), b''):
+                hasher.update(data)
+                size += len(data)
+        digest = hasher.hexdigest()
+        self.adopt_temp(source_path, digest)
+        return self.link(digest, name), digest, size
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_blob_store(uploads_dir):
+    """每个上传目录共用一个 BlobStore 实例"""
+    uploads_dir = os.path.abspath(uploads_dir)
+    with _stores_lock:
+        store = _stores.get(uploads_dir)
+        if store is None:
+            store = BlobStore(uploads_dir)
+            _stores[uploads_dir] = store
+        return store
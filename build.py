@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+一次生成所有由课件目录派生的文件
+- assets   dist/ 中压缩后带内容哈希的课件（asset_build.py）
+- courses  courses.js，课件目录的静态快照，服务器不可用时（静态托管或直接打开文件）主页使用，
+           随仓库提交，链接指向原课件
+- md       课件统计表格.md，自动编号
+- xlsx     课件统计表格.xlsx，由 .md 转换
+- docx     课件制作指南
+
+每个输出记录其输入的内容哈希（保存在 dist/build-state.json），只重新生成输入变化的输出；
+输出文件被删除或手动修改后也会重新生成。课件的内容哈希按 (大小, 修改时间) 缓存，
+没有变化的课件不会重新读取。
+
+    python build.py [assets courses md xlsx docx] [--force]
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+
+from asset_build import DIST_DIRNAME, build as build_assets
+from course_catalog import get_course_catalog
+from html_metadata import DEFAULT_AUTHOR
+from metadata_cache import get_metadata_cache
+
+try:
+    from markdown_to_excel import convert as markdown_to_excel
+except ImportError:
+    markdown_to_excel = None
+
+try:
+    import generate_guide
+except ImportError:
+    generate_guide = None
+
+STATE_FILENAME = 'build-state.json'
+STATE_VERSION = 1
+TARGETS = ('assets', 'courses', 'md', 'xlsx', 'docx')
+
+COURSES_JS = 'courses.js'
+CATALOG_MD = '课件统计表格.md'
+CATALOG_XLSX = '课件统计表格.xlsx'
+CATALOG_TITLE = '初中数学动态课件统计表格'
+CATALOG_COLUMNS = ('序号', '年级', '册数', '章节', '课件名称', '作者')
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(256 * 1024), b''):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+def sha256_json(value):
+    return sha256_bytes(json.dumps(value, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+
+def write_atomic(path, data):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+class BuildState:
+    """上次构建的记录：课件的内容哈希，以及每个输出的输入哈希和输出哈希"""
+
+    def __init__(self, root_dir):
+        self.path = os.path.join(root_dir, DIST_DIRNAME, STATE_FILENAME)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if state.get('version') != STATE_VERSION:
+            state = {}
+        # 相对路径 -> [大小, 修改时间, sha256]
+        self.files = state.get('files', {})
+        # 输出 -> {'input': 输入哈希, 'output': 输出哈希}
+        self.outputs = state.get('outputs', {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = json.dumps({'version': STATE_VERSION, 'files': self.files, 'outputs': self.outputs},
+                          ensure_ascii=False, indent=1, sort_keys=True)
+        write_atomic(self.path, data.encode('utf-8'))
+
+
+class Builder:
+    def __init__(self, root_dir, force=False):
+        self.root_dir = os.path.abspath(root_dir)
+        self.force = force
+        self.state = BuildState(self.root_dir)
+        self.metadata = get_metadata_cache(os.path.join(self.root_dir, 'uploads'))
+        self.results = []
+
+    def path(self, rel_path):
+        return os.path.join(self.root_dir, rel_path)
+
+    def file_digest(self, rel_path):
+        """课件的内容哈希，大小和修改时间没有变化时使用上次的结果"""
+        stat = os.stat(self.path(rel_path))
+        cached = self.state.files.get(rel_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = sha256_file(self.path(rel_path))
+        self.state.files[rel_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def is_fresh(self, output, input_hash):
+        """输出存在、没有被修改，并且输入没有变化"""
+        if self.force:
+            return False
+        record = self.state.outputs.get(output)
+        if record is None or record['input'] != input_hash:
+            return False
+        try:
+            return sha256_file(self.path(output)) == record['output']
+        except OSError:
+            return False
+
+    def target(self, output, input_hash, generate):
+        """输入变化时调用 generate() 重新生成 output"""
+        if self.is_fresh(output, input_hash):
+            self.results.append((output, '未变化'))
+            return False
+        message = generate()
+        if message:
+            # 无法生成（缺少依赖等），不记录状态，下次再试
+            self.results.append((output, message))
+            return False
+        self.record(output, input_hash)
+        return True
+
+    def record(self, output, input_hash):
+        self.state.outputs[output] = {'input': input_hash,
+                                      'output': sha256_file(self.path(output))}
+        self.results.append((output, '已生成'))
+
+    def courses(self):
+        """课件目录中的课件，附带内容哈希"""
+        catalog = get_course_catalog(self.root_dir, self.metadata.get)
+        catalog.refresh(force=True)
+        courses = catalog.courses()
+        present = set()
+        for course in courses:
+            course['sha256'] = self.file_digest(course['file'])
+            present.add(course['file'])
+        # 已经删除的课件不再保留哈希
+        for rel_path in set(self.state.files) - present:
+            del self.state.files[rel_path]
+        return courses
+
+    # 各个输出
+
+    def build_assets(self):
+        stats = build_assets(self.root_dir, force=self.force)
+        self.results.append((DIST_DIRNAME + '/', f"重新构建 {stats['built']} 个, "
+                                                f"未变化 {stats['unchanged']} 个"))
+
+    def build_courses_js(self, courses):
+        # dist/ 不随仓库提交，快照中的链接指向原课件
+        payload = [dict({key: course[key] for key in
+                         ('id', 'title', 'description', 'category', 'author', 'file')},
+                        href=course['file'])
+                   for course in courses]
+
+        def generate():
+            data = json.dumps(payload, ensure_ascii=False, indent=1)
+            script = f'// 由 build.py 生成，不要手动编辑\nwindow.COURSE_CATALOG = {data};\n'
+            write_atomic(self.path(COURSES_JS), script.encode('utf-8'))
+
+        self.target(COURSES_JS, sha256_json(payload), generate)
+
+    def build_markdown(self, courses):
+        rows = catalog_rows(courses)
+
+        def generate():
+            write_atomic(self.path(CATALOG_MD), render_markdown(rows).encode('utf-8'))
+
+        self.target(CATALOG_MD, sha256_json(rows), generate)
+
+    def build_excel(self):
+        if not os.path.exists(self.path(CATALOG_MD)):
+            self.results.append((CATALOG_XLSX, f'跳过（没有 {CATALOG_MD}）'))
+            return
+
+        def generate():
+            if markdown_to_excel is None:
+                return '跳过（未安装 openpyxl）'
+            markdown_to_excel(self.path(CATALOG_MD), self.path(CATALOG_XLSX))
+
+        self.target(CATALOG_XLSX, sha256_file(self.path(CATALOG_MD)), generate)
+
+    def build_guides(self):
+        if generate_guide is None:
+            self.results.append(('*.docx', '跳过（未安装 python-docx）'))
+            return
+        # 模板和样式都在 generate_guide.py 中，脚本变化时所有版本都重新生成
+        template_hash = sha256_file(generate_guide.__file__)
+        stale = []
+        for variant in generate_guide.DEFAULT_VARIANTS:
+            output = variant['output']
+            input_hash = sha256_json([template_hash, variant])
+            if self.is_fresh(output, input_hash):
+                self.results.append((output, '未变化'))
+            else:
+                stale.append((output, input_hash, dict(variant, output=self.path(output))))
+        generate_guide.render_variants([variant for _, _, variant in stale])
+        for output, input_hash, _ in stale:
+            self.record(output, input_hash)
+
+    def run(self, targets=TARGETS):
+        os.makedirs(self.path(DIST_DIRNAME), exist_ok=True)
+        # 课件地址依赖压缩结果，先构建 assets
+        if 'assets' in targets:
+            self.build_assets()
+        if 'courses' in targets or 'md' in targets:
+            courses = self.courses()
+            if 'courses' in targets:
+                self.build_courses_js(courses)
+            if 'md' in targets:
+                self.build_markdown(courses)
+        if 'xlsx' in targets:
+            self.build_excel()
+        if 'docx' in targets:
+            self.build_guides()
+        self.state.save()
+        return self.results
+
+
+def catalog_rows(courses):
+    """
+    统计表格的行：[年级, 册数, 章节, 课件名称, 作者]
+    内容相同的课件（如上传的副本）只列一次
+    """
+    rows = []
+    # 内容哈希 -> 行号
+    seen = {}
+    for course in courses:
+        if course['sha256'] in seen:
+            # 副本的文件名中有作者时使用副本的作者
+            row = rows[seen[course['sha256']]]
+            if row[-1] == DEFAULT_AUTHOR:
+                row[-1] = course['author']
+            continue
+        seen[course['sha256']] = len(rows)
+        title = course['title']
+        category = course['category']
+        chapter = ''
+        if title.startswith(course['description']) and course['description'] != category:
+            # 七年级上册第一章正方体截面动态演示
+            chapter = course['description'][len(category):]
+            title = title[len(course['description']):]
+        elif title.startswith(category):
+            title = title[len(category):]
+        if category == '中考复习':
+            grade, volume = '中考', '复习'
+        else:
+            grade, volume = category[:3], category[3:]
+        rows.append([grade, volume, chapter, title.strip() or course['title'], course['author']])
+    return rows
+
+
+def escape_cell(text):
+    return str(text).replace('|', '\\|')
+
+
+def render_markdown(rows):
+    lines = [f'# {CATALOG_TITLE}', '',
+             '| ' + ' | '.join(CATALOG_COLUMNS) + ' |',
+             '|' + '|'.join('------' for _ in CATALOG_COLUMNS) + '|']
+    for number, row in enumerate(rows, 1):
+        cells = [str(number)] + [escape_cell(cell) for cell in row]
+        lines.append(('| ' + ' | '.join(cells) + ' |').replace('|  |', '| |'))
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成课件目录派生的所有文件，只重新生成输入变化的部分')
+    parser.add_argument('targets', nargs='*', metavar='target',
+                        help=f"要生成的内容: {', '.join(TARGETS)} (默认: 全部)")
+    parser.add_argument('--root', default=os.getcwd(), help='课件目录 (默认: 当前目录)')
+    parser.add_argument('--force', action='store_true', help='忽略上次构建的记录，全部重新生成')
+    args = parser.parse_args()
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"未知的内容: {', '.join(sorted(unknown))}")
+    targets = args.targets or TARGETS
+
+    started = time.perf_counter()
+    results = Builder(args.root, force=args.force).run(targets)
+    elapsed = time.perf_counter() - started
+    for output, message in results:
+        print(f"  {output}: {message}")
+    print(f"构建完成，用时 {elapsed:.2f} 秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预压缩文件缓存
+课件页面中的内联 JS/CSS 压缩率很高。每个文件只压缩一次，gzip 版本（安装了
+brotli 时还有 br 版本）保存在 uploads/.variants/ 中，压缩文件的修改时间与原文件
+保持一致，原文件修改后自动重新压缩。发送时按 Accept-Encoding 选择版本。
+
+离线预压缩：
+    python compressed_variants.py [目录 ...]
+"""
+
+import os
+import gzip
+import zlib
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+VARIANTS_DIRNAME = '.variants'
+# 小于这个大小的文件压缩意义不大
+MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json',
+                      'application/xml', 'image/svg+xml')
+COMPRESSIBLE_EXTENSIONS = ('.html', '.htm', '.css', '.js', '.json', '.md', '.txt', '.svg')
+# 优先顺序，br 通常比 gzip 小 15-20%
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def is_compressible(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    # mtime=0 使同样的内容总是得到同样的压缩结果
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def accepted_encodings(header):
+    """解析 Accept-Encoding，按服务器的优先顺序返回客户端接受的编码"""
+    if not header:
+        return []
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    result = []
+    for encoding in ENCODINGS:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0:
+            result.append(encoding)
+    return result
+
+
+def candidate_encodings(handler, content_type, stat):
+    """这个文件可以使用的压缩编码，按优先顺序排列"""
+    if not is_compressible(content_type) or stat.st_size < MIN_SIZE:
+        return []
+    return accepted_encodings(handler.headers.get('Accept-Encoding'))
+
+
+class VariantCache:
+    """磁盘上的压缩版本缓存，所有方法都是线程安全的"""
+
+    def __init__(self, uploads_dir):
+        self.variants_dir = os.path.join(uploads_dir, VARIANTS_DIRNAME)
+        os.makedirs(self.variants_dir, exist_ok=True)
+        self.hits = 0
+        self.builds = 0
+        self._lock = threading.Lock()
+        # 正在压缩的文件，同一个文件同时只压缩一次
+        self._building = {}
+
+    def variant_path(self, file_path, encoding):
+        key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.variants_dir, key[:2], key + SUFFIXES[encoding])
+
+    def get(self, file_path, encoding, stat=None):
+        """
+        返回压缩版本的路径，压缩后没有变小时返回 None
+        压缩版本不存在或已过期时先生成
+        """
+        stat = stat or os.stat(file_path)
+        path = self.variant_path(file_path, encoding)
+        try:
+            variant = os.stat(path)
+            if variant.st_mtime_ns == stat.st_mtime_ns:
+                self.hits += 1
+                return path if variant.st_size < stat.st_size else None
+        except OSError:
+            pass
+        return self.build(file_path, encoding, stat)
+
+    def build(self, file_path, encoding, stat=None):
+        stat = stat or os.stat(file_path)
+        path = self.variant_path(file_path, encoding)
+        with self._lock:
+            event = self._building.get(path)
+            owner = event is None
+            if owner:
+                event = self._building[path] = threading.Event()
+        if not owner:
+            event.wait()
+            try:
+                variant = os.stat(path)
+            except OSError:
+                return None
+            return path if variant.st_size < stat.st_size else None
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            compressed = compress(data, encoding)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(compressed)
+            # 修改时间与原文件一致，用来判断是否过期
+            os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(temp_path, path)
+            self.builds += 1
+            return path if len(compressed) < stat.st_size else None
+        finally:
+            with self._lock:
+                del self._building[path]
+            event.set()
+
+    def select(self, handler, file_path, content_type, stat=None):
+        """按请求头选择要发送的文件，返回 (文件路径, 编码)；不压缩时编码为 None"""
+        stat = stat or os.stat(file_path)
+        for encoding in candidate_encodings(handler, content_type, stat):
+            try:
+                path = self.get(file_path, encoding, stat)
+            except (OSError, zlib.error):
+                continue
+            if path is not None:
+                return path, encoding
+        return file_path, None
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_variant_cache(uploads_dir=None):
+    """每个 uploads 目录共用一个 VariantCache 实例"""
+    uploads_dir = os.path.abspath(uploads_dir or os.path.join(os.getcwd(), 'uploads'))
+    with _caches_lock:
+        cache = _caches.get(uploads_dir)
+        if cache is None:
+            cache = VariantCache(uploads_dir)
+            _caches[uploads_dir] = cache
+        return cache
+
+
+_memory_variants = {}
+_memory_lock = threading.Lock()
+
+
+def send_compressed_bytes(handler, body, content_type):
+    """发送内存中的页面，压缩结果按内容缓存"""
+    encoding = None
+    if len(body) >= MIN_SIZE and is_compressible(content_type):
+        for candidate in accepted_encodings(handler.headers.get('Accept-Encoding')):
+            key = (hashlib.sha1(body).hexdigest(), candidate)
+            with _memory_lock:
+                compressed = _memory_variants.get(key)
+            if compressed is None:
+                compressed = compress(body, candidate)
+                with _memory_lock:
+                    _memory_variants[key] = compressed
+            if len(compressed) < len(body):
+                body, encoding = compressed, candidate
+                break
+    handler.send_response(200)
+    handler.send_header('Content-type', content_type)
+    handler.send_header('Content-Length', str(len(body)))
+    if is_compressible(content_type):
+        handler.send_header('Vary', 'Accept-Encoding')
+    if encoding:
+        handler.send_header('Content-Encoding', encoding)
+    handler.end_headers()
+    if handler.command != 'HEAD':
+        handler.wfile.write(body)
+
+
+def iter_compressible_files(directories):
+    for directory in directories:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if (entry.name.lower().endswith(COMPRESSIBLE_EXTENSIONS) and entry.is_file()
+                    and entry.stat().st_size >= MIN_SIZE):
+                yield entry.path
+
+
+def precompress(root_dir, directories=None, workers=None):
+    """预先生成所有可压缩文件的压缩版本，返回 (文件数, 原始字节数, 压缩后字节数)"""
+    cache = get_variant_cache(os.path.join(root_dir, 'uploads'))
+    directories = directories or [root_dir, os.path.join(root_dir, 'uploads'),
+                                  os.path.join(root_dir, 'dist'), os.path.join(root_dir, 'dist', 'uploads')]
+    files = list(iter_compressible_files(directories))
+
+    def work(file_path):
+        stat = os.stat(file_path)
+        sizes = {}
+        for encoding in ENCODINGS:
+            path = cache.get(file_path, encoding, stat)
+            sizes[encoding] = os.path.getsize(path) if path else stat.st_size
+        return stat.st_size, sizes[ENCODINGS[-1]]
+
+    original = compressed = 0
+    # zlib 和 brotli 压缩时会释放 GIL，用线程池即可
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for size, gzip_size in executor.map(work, files):
+            original += size
+            compressed += gzip_size
+    return len(files), original, compressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='预先生成课件的 gzip/brotli 压缩版本')
+    parser.add_argument('directories', nargs='*', help='要处理的目录，默认是当前目录、uploads 目录和 dist 目录')
+    parser.add_argument('--workers', type=int, default=None, help='并行压缩的线程数')
+    args = parser.parse_args()
+    count, original, compressed = precompress(os.getcwd(), args.directories, args.workers)
+    ratio = (1 - compressed / original) * 100 if original else 0
+    print(f"已处理 {count} 个文件: {original / 1024:.1f} KB -> {compressed / 1024:.1f} KB (gzip), "
+          f"减少 {ratio:.1f}%")
+    print(f"可用编码: {', '.join(ENCODINGS)}")
+
+
+if __name__ == '__main__':
+    main()
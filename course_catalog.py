@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课件目录接口 /api/courses
+扫描课件目录和 uploads 目录生成课件列表，结果缓存在内存中，
+只有大小或修改时间发生变化的文件才会重新解析。
+响应带 ETag，浏览器重复加载时只需要一个 304。
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+from asset_build import get_asset_manifest
+from html_metadata import CATEGORIES, DEFAULT_AUTHOR, DEFAULT_CATEGORY
+
+COURSEWARE_EXTENSIONS = ('.html', '.htm')
+# 不属于课件的页面
+EXCLUDED_FILES = ('index.html',)
+# 两次扫描目录之间的最短间隔（秒），全班同时打开页面时只扫描一次
+SCAN_INTERVAL = 1.0
+
+# 上传时添加的 "时间戳_哈希_" 前缀
+UPLOAD_PREFIX_RE = re.compile(r'^(\d{10,}_[0-9a-z-]+_)+')
+# 文件名末尾括号中的作者，如 "（雷新风）" 或 "(郭娜)"
+AUTHOR_RE = re.compile(r'\s*[-－]?\s*[（(]([^（()）]+)[)）]\s*$')
+# 年级册数和章节，如 "七年级上册第一章"
+CHAPTER_RE = re.compile(r'^((?:七|八|九)年级(?:上|下)册)(第[一二三四五六七八九十]+章)?')
+
+
+def parse_courseware_filename(filename):
+    """从课件文件名中提取标题、作者、分类和章节"""
+    stem = os.path.splitext(UPLOAD_PREFIX_RE.sub('', filename))[0]
+    author = None
+    match = AUTHOR_RE.search(stem)
+    if match:
+        author = match.group(1).strip()
+        stem = stem[:match.start()]
+    title = stem.strip()
+    category = None
+    description = None
+    match = CHAPTER_RE.match(title)
+    if match:
+        category = match.group(1)
+        description = match.group(0)
+    elif title.startswith('中考复习'):
+        category = description = '中考复习'
+    return {'title': title, 'author': author, 'category': category,
+            'description': description}
+
+
+def describe_courseware(file_path, filename, parse_meta):
+    """
+    生成一条课件记录
+    课件文件名按 "年级册数+章节+名称（作者）" 命名，优先使用文件名中的信息，
+    文件名中没有的再使用页面内容解析出的信息
+    """
+    meta = parse_meta(file_path, filename) or {}
+    info = parse_courseware_filename(filename)
+    category = info['category'] or meta.get('category') or DEFAULT_CATEGORY
+    return {
+        'title': info['title'] or meta.get('title'),
+        'description': info['description'] or category,
+        'category': category,
+        'author': info['author'] or meta.get('author') or DEFAULT_AUTHOR,
+    }
+
+
+class CourseCatalog:
+    """课件目录缓存，按 (修改时间, 大小) 增量更新"""
+
+    def __init__(self, root_dir, parse_meta, uploads_dirname='uploads'):
+        self.root_dir = root_dir
+        self.uploads_dirname = uploads_dirname
+        self.parse_meta = parse_meta
+        self._lock = threading.Lock()
+        # 相对路径 -> (mtime_ns, size, 课件记录)
+        self._entries = {}
+        self._payload = None
+        self._etag = None
+        self._last_scan = 0
+        # 构建清单变化时课件地址也会变化
+        self._assets = get_asset_manifest(root_dir)
+        self._assets_version = None
+        # 目录变化时需要通知的对象，需提供 update(键, 文件路径, 记录) 和 remove(键)
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """注册目录变化的监听者，已有的课件会立即通知一遍"""
+        with self._lock:
+            self.refresh()
+            self._listeners.append(listener)
+            for rel_path, (_, _, entry) in self._entries.items():
+                listener.update(rel_path, os.path.join(self.root_dir, rel_path), entry)
+
+    def _scan_dir(self, directory, prefix):
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            name = entry.name
+            if not name.lower().endswith(COURSEWARE_EXTENSIONS) or name in EXCLUDED_FILES:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            yield prefix + name, entry.path, name, stat
+
+    def refresh(self, force=False):
+        """扫描目录，只解析发生变化的文件，返回目录是否有变化"""
+        now = time.monotonic()
+        if not force and self._payload is not None and now - self._last_scan < SCAN_INTERVAL:
+            return False
+        self._last_scan = now
+
+        changed = False
+        seen = set()
+        sources = (
+            (self.root_dir, ''),
+            (os.path.join(self.root_dir, self.uploads_dirname), self.uploads_dirname + '/'),
+        )
+        for directory, prefix in sources:
+            for rel_path, file_path, name, stat in self._scan_dir(directory, prefix):
+                seen.add(rel_path)
+                cached = self._entries.get(rel_path)
+                if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                    continue
+                entry = describe_courseware(file_path, name, self.parse_meta)
+                entry['file'] = rel_path
+                entry['size'] = stat.st_size
+                entry['modified'] = stat.st_mtime
+                self._entries[rel_path] = (stat.st_mtime_ns, stat.st_size, entry)
+                for listener in self._listeners:
+                    listener.update(rel_path, file_path, entry)
+                changed = True
+        for rel_path in set(self._entries) - seen:
+            del self._entries[rel_path]
+            for listener in self._listeners:
+                listener.remove(rel_path)
+            changed = True
+        assets_version = self._assets.check()
+        if assets_version != self._assets_version:
+            self._assets_version = assets_version
+            changed = True
+        if changed or self._payload is None:
+            self._build_payload()
+        return changed
+
+    def _sort_key(self, entry):
+        category = entry['category']
+        order = CATEGORIES.index(category) if category in CATEGORIES else len(CATEGORIES)
+        return (order, entry['file'].startswith(self.uploads_dirname + '/'), entry['file'])
+
+    def _build_payload(self):
+        # href 是打开课件时使用的地址，有最新构建结果时指向压缩后带哈希的文件
+        courses = sorted(
+            (dict(entry, href=self._assets.href(rel_path, mtime_ns, size))
+             for rel_path, (mtime_ns, size, entry) in self._entries.items()),
+            key=self._sort_key)
+        courses = [dict(entry, id=i) for i, entry in enumerate(courses, 1)]
+        self._payload = json.dumps(courses, ensure_ascii=False).encode('utf-8')
+        self._etag = '"' + hashlib.sha256(self._payload).hexdigest()[:32] + '"'
+
+    def get(self):
+        """返回 (JSON字节, ETag)"""
+        with self._lock:
+            self.refresh()
+            return self._payload, self._etag
+
+    def courses(self):
+        payload, _ = self.get()
+        return json.loads(payload)
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_course_catalog(root_dir, parse_meta):
+    """每个课件目录共用一个 CourseCatalog 实例"""
+    root_dir = os.path.abspath(root_dir)
+    with _catalogs_lock:
+        catalog = _catalogs.get(root_dir)
+        if catalog is None:
+            catalog = CourseCatalog(root_dir, parse_meta)
+            _catalogs[root_dir] = catalog
+        return catalog
+
+
+def etag_matches(if_none_match, etag):
+    """检查 If-None-Match 请求头是否包含当前 ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return etag in tags or 'W/' + etag in tags
+
+
+def send_catalog(handler, catalog):
+    """发送课件目录，ETag 未变化时返回 304"""
+    payload, etag = catalog.get()
+    if etag_matches(handler.headers.get('If-None-Match'), etag):
+        handler.send_response(304)
+        handler.send_header('ETag', etag)
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+        return
+    handler.send_response(200)
+    handler.send_header('Content-type', 'application/json; charset=utf-8')
+    handler.send_header('Content-Length', str(len(payload)))
+    handler.send_header('ETag', etag)
+    handler.send_header('Cache-Control', 'no-cache')
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.end_headers()
+    handler.wfile.write(payload)
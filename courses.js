@@ -0,0 +1,381 @@
+// 由 build.py 生成，不要手动编辑
+window.COURSE_CATALOG = [
+ {
+  "id": 1,
+  "title": "七年级上册第一章正方体截面动态演示",
+  "description": "七年级上册第一章",
+  "category": "七年级上册",
+  "author": "雷新风",
+  "file": "七年级上册第一章正方体截面动态演示（雷新风）.html",
+  "href": "七年级上册第一章正方体截面动态演示（雷新风）.html"
+ },
+ {
+  "id": 2,
+  "title": "七年级上册第三章同类项消消乐",
+  "description": "七年级上册第三章",
+  "category": "七年级上册",
+  "author": "陈依群",
+  "file": "七年级上册第三章同类项消消乐(陈依群）.HTML",
+  "href": "七年级上册第三章同类项消消乐(陈依群）.HTML"
+ },
+ {
+  "id": 3,
+  "title": "七年级上册第三章识别同类项",
+  "description": "七年级上册第三章",
+  "category": "七年级上册",
+  "author": "李娟茹",
+  "file": "七年级上册第三章识别同类项（李娟茹）.html",
+  "href": "七年级上册第三章识别同类项（李娟茹）.html"
+ },
+ {
+  "id": 4,
+  "title": "七年级上册第二章相反数消消乐",
+  "description": "七年级上册第二章",
+  "category": "七年级上册",
+  "author": "袁媛",
+  "file": "七年级上册第二章相反数消消乐 （袁媛）.HTML",
+  "href": "七年级上册第二章相反数消消乐 （袁媛）.HTML"
+ },
+ {
+  "id": 5,
+  "title": "七年级上册第四章线段运动演示",
+  "description": "七年级上册第四章",
+  "category": "七年级上册",
+  "author": "袁媛",
+  "file": "七年级上册第四章线段运动演示（袁媛）.html",
+  "href": "七年级上册第四章线段运动演示（袁媛）.html"
+ },
+ {
+  "id": 6,
+  "title": "七年级上册第四章角的和差课本习题",
+  "description": "七年级上册第四章",
+  "category": "七年级上册",
+  "author": "黄权锋",
+  "file": "七年级上册第四章角的和差课本习题（黄权锋）.html",
+  "href": "七年级上册第四章角的和差课本习题（黄权锋）.html"
+ },
+ {
+  "id": 7,
+  "title": "七年级下册第二章平行线性质定理",
+  "description": "七年级下册第二章",
+  "category": "七年级下册",
+  "author": "郭娜",
+  "file": "七年级下册第二章平行线性质定理(郭娜).html",
+  "href": "七年级下册第二章平行线性质定理(郭娜).html"
+ },
+ {
+  "id": 8,
+  "title": "七年级下册第五章将军饮马动态演示课件",
+  "description": "七年级下册第五章",
+  "category": "七年级下册",
+  "author": "赫林娟",
+  "file": "七年级下册第五章将军饮马动态演示课件（赫林娟）.html",
+  "href": "七年级下册第五章将军饮马动态演示课件（赫林娟）.html"
+ },
+ {
+  "id": 9,
+  "title": "八年级上册第二章无理数在数轴上表示",
+  "description": "八年级上册第二章",
+  "category": "八年级上册",
+  "author": "黄权锋",
+  "file": "八年级上册第二章无理数在数轴上表示（黄权锋）.html",
+  "href": "八年级上册第二章无理数在数轴上表示（黄权锋）.html"
+ },
+ {
+  "id": 10,
+  "title": "八年级上册第五章二元一次方程与一次函数",
+  "description": "八年级上册第五章",
+  "category": "八年级上册",
+  "author": "陈依群",
+  "file": "八年级上册第五章二元一次方程与一次函数（陈依群）.html",
+  "href": "八年级上册第五章二元一次方程与一次函数（陈依群）.html"
+ },
+ {
+  "id": 11,
+  "title": "八年级上册第五章二元一次方程组与一次函数图象交点的关系",
+  "description": "八年级上册第五章",
+  "category": "八年级上册",
+  "author": "张梦婕",
+  "file": "八年级上册第五章二元一次方程组与一次函数图象交点的关系（张梦婕）.html",
+  "href": "八年级上册第五章二元一次方程组与一次函数图象交点的关系（张梦婕）.html"
+ },
+ {
+  "id": 12,
+  "title": "八年级上册第五章二元一次方程组与一次函数应用",
+  "description": "八年级上册第五章",
+  "category": "八年级上册",
+  "author": "林鹏程",
+  "file": "八年级上册第五章二元一次方程组与一次函数应用（林鹏程）.html",
+  "href": "八年级上册第五章二元一次方程组与一次函数应用（林鹏程）.html"
+ },
+ {
+  "id": 13,
+  "title": "八年级上册第六章加权平均数",
+  "description": "八年级上册第六章",
+  "category": "八年级上册",
+  "author": "康娟呢",
+  "file": "八年级上册第六章加权平均数（康娟呢）.html",
+  "href": "八年级上册第六章加权平均数（康娟呢）.html"
+ },
+ {
+  "id": 14,
+  "title": "八年级上册第四章一次函数中k，b值对一次函数图象的影响",
+  "description": "八年级上册第四章",
+  "category": "八年级上册",
+  "author": "张梦婕",
+  "file": "八年级上册第四章一次函数中k，b值对一次函数图象的影响（张梦婕）.html",
+  "href": "八年级上册第四章一次函数中k，b值对一次函数图象的影响（张梦婕）.html"
+ },
+ {
+  "id": 15,
+  "title": "九年级上册第一章菱形性质探究",
+  "description": "九年级上册第一章",
+  "category": "九年级上册",
+  "author": "郭娜",
+  "file": "九年级上册第一章菱形性质探究（郭娜）.html",
+  "href": "九年级上册第一章菱形性质探究（郭娜）.html"
+ },
+ {
+  "id": 16,
+  "title": "九年级上册第六章反比例函数K的几何意义",
+  "description": "九年级上册第六章",
+  "category": "九年级上册",
+  "author": "康娟妮",
+  "file": "九年级上册第六章反比例函数K的几何意义（康娟妮）.html",
+  "href": "九年级上册第六章反比例函数K的几何意义（康娟妮）.html"
+ },
+ {
+  "id": 17,
+  "title": "九年级上册第四章平行线分线段成比例",
+  "description": "九年级上册第四章",
+  "category": "九年级上册",
+  "author": "李亚萍",
+  "file": "九年级上册第四章平行线分线段成比例（李亚萍）.HTML",
+  "href": "九年级上册第四章平行线分线段成比例（李亚萍）.HTML"
+ },
+ {
+  "id": 18,
+  "title": "九年级下册第一章三角函数特殊值消消乐",
+  "description": "九年级下册第一章",
+  "category": "九年级下册",
+  "author": "李娟茹",
+  "file": "九年级下册第一章三角函数特殊值消消乐（李娟茹）.html",
+  "href": "九年级下册第一章三角函数特殊值消消乐（李娟茹）.html"
+ },
+ {
+  "id": 19,
+  "title": "九年级下册第一章特殊角三角函数闯关训练",
+  "description": "九年级下册第一章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第一章特殊角三角函数闯关训练-（雷新风）.html",
+  "href": "九年级下册第一章特殊角三角函数闯关训练-（雷新风）.html"
+ },
+ {
+  "id": 20,
+  "title": "九年级下册第一章锐角三角函数速查",
+  "description": "九年级下册第一章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第一章锐角三角函数速查（雷新风）.html",
+  "href": "九年级下册第一章锐角三角函数速查（雷新风）.html"
+ },
+ {
+  "id": 21,
+  "title": "九年级下册第三章圆周角定理",
+  "description": "九年级下册第三章",
+  "category": "九年级下册",
+  "author": "牟艳艳",
+  "file": "九年级下册第三章圆周角定理(牟艳艳).html",
+  "href": "九年级下册第三章圆周角定理(牟艳艳).html"
+ },
+ {
+  "id": 22,
+  "title": "九年级下册第三章圆周角定理及其推论",
+  "description": "九年级下册第三章",
+  "category": "九年级下册",
+  "author": "康娟妮",
+  "file": "九年级下册第三章圆周角定理及其推论（康娟妮）.html",
+  "href": "九年级下册第三章圆周角定理及其推论（康娟妮）.html"
+ },
+ {
+  "id": 23,
+  "title": "九年级下册第三章圆定边定角隐形圆",
+  "description": "九年级下册第三章",
+  "category": "九年级下册",
+  "author": "曹甲",
+  "file": "九年级下册第三章圆定边定角隐形圆(曹甲).HTML",
+  "href": "九年级下册第三章圆定边定角隐形圆(曹甲).HTML"
+ },
+ {
+  "id": 24,
+  "title": "九年级下册第三章圆心角性质定理",
+  "description": "九年级下册第三章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第三章圆心角性质定理（雷新风）.HTML",
+  "href": "九年级下册第三章圆心角性质定理（雷新风）.HTML"
+ },
+ {
+  "id": 25,
+  "title": "九年级下册第三章圆的对称性",
+  "description": "九年级下册第三章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第三章圆的对称性（雷新风）.HTML",
+  "href": "九年级下册第三章圆的对称性（雷新风）.HTML"
+ },
+ {
+  "id": 26,
+  "title": "九年级下册第三章圆的生成过程",
+  "description": "九年级下册第三章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第三章圆的生成过程（雷新风）.html",
+  "href": "九年级下册第三章圆的生成过程（雷新风）.html"
+ },
+ {
+  "id": 27,
+  "title": "九年级下册第三章圆的相关概念",
+  "description": "九年级下册第三章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第三章圆的相关概念（雷新风）.html",
+  "href": "九年级下册第三章圆的相关概念（雷新风）.html"
+ },
+ {
+  "id": 28,
+  "title": "九年级下册第三章定边定角隐形圆",
+  "description": "九年级下册第三章",
+  "category": "九年级下册",
+  "author": "曹甲",
+  "file": "九年级下册第三章定边定角隐形圆（曹甲）.html",
+  "href": "九年级下册第三章定边定角隐形圆（曹甲）.html"
+ },
+ {
+  "id": 29,
+  "title": "九年级下册第三章点和圆的位置关系",
+  "description": "九年级下册第三章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第三章点和圆的位置关系（雷新风）.html",
+  "href": "九年级下册第三章点和圆的位置关系（雷新风）.html"
+ },
+ {
+  "id": 30,
+  "title": "九年级下册第二章二次函数y=x^2的图像",
+  "description": "九年级下册第二章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第二章二次函数y=x^2的图像（雷新风）.html",
+  "href": "九年级下册第二章二次函数y=x^2的图像（雷新风）.html"
+ },
+ {
+  "id": 31,
+  "title": "九年级下册第二章二次函数各项系数对抛物线的影响",
+  "description": "九年级下册第二章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第二章二次函数各项系数对抛物线的影响（雷新风）.html",
+  "href": "九年级下册第二章二次函数各项系数对抛物线的影响（雷新风）.html"
+ },
+ {
+  "id": 32,
+  "title": "九年级下册第二章二次函数图象性质",
+  "description": "九年级下册第二章",
+  "category": "九年级下册",
+  "author": "牟艳艳",
+  "file": "九年级下册第二章二次函数图象性质（牟艳艳）.html",
+  "href": "九年级下册第二章二次函数图象性质（牟艳艳）.html"
+ },
+ {
+  "id": 33,
+  "title": "九年级下册第二章二次函数篮球投篮动画",
+  "description": "九年级下册第二章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第二章二次函数篮球投篮动画.html",
+  "href": "九年级下册第二章二次函数篮球投篮动画.html"
+ },
+ {
+  "id": 34,
+  "title": "九年级下册第二章二次函数闯关对战",
+  "description": "九年级下册第二章",
+  "category": "九年级下册",
+  "author": "李娟茹",
+  "file": "九年级下册第二章二次函数闯关对战(李娟茹).html",
+  "href": "九年级下册第二章二次函数闯关对战(李娟茹).html"
+ },
+ {
+  "id": 35,
+  "title": "九年级下册第二章二次函数顶点式ahk对抛物线的影响",
+  "description": "九年级下册第二章",
+  "category": "九年级下册",
+  "author": "雷新风",
+  "file": "九年级下册第二章二次函数顶点式ahk对抛物线的影响（雷新风）.html",
+  "href": "九年级下册第二章二次函数顶点式ahk对抛物线的影响（雷新风）.html"
+ },
+ {
+  "id": 36,
+  "title": "九年级下册第二章二次函数",
+  "description": "九年级下册第二章",
+  "category": "九年级下册",
+  "author": "康娟妮",
+  "file": "九年级下册第二章二次函数（康娟妮）.html",
+  "href": "九年级下册第二章二次函数（康娟妮）.html"
+ },
+ {
+  "id": 37,
+  "title": "中考复习2022陕西中考副题13题",
+  "description": "中考复习",
+  "category": "中考复习",
+  "author": "雷新风",
+  "file": "中考复习2022陕西中考副题13题（雷新风).html",
+  "href": "中考复习2022陕西中考副题13题（雷新风).html"
+ },
+ {
+  "id": 38,
+  "title": "中考复习将军饮马原理讲解",
+  "description": "中考复习",
+  "category": "中考复习",
+  "author": "雷新风",
+  "file": "中考复习将军饮马原理讲解（雷新风）.html",
+  "href": "中考复习将军饮马原理讲解（雷新风）.html"
+ },
+ {
+  "id": 39,
+  "title": "中考复习旋转法求最值",
+  "description": "中考复习",
+  "category": "中考复习",
+  "author": "雷新风",
+  "file": "中考复习旋转法求最值（雷新风）.html",
+  "href": "中考复习旋转法求最值（雷新风）.html"
+ },
+ {
+  "id": 40,
+  "title": "中考复习点圆最值",
+  "description": "中考复习",
+  "category": "中考复习",
+  "author": "雷新风",
+  "file": "中考复习点圆最值（雷新风）.html",
+  "href": "中考复习点圆最值（雷新风）.html"
+ },
+ {
+  "id": 41,
+  "title": "中考复习线圆最值问题",
+  "description": "中考复习",
+  "category": "中考复习",
+  "author": "未知作者",
+  "file": "中考复习线圆最值问题.html",
+  "href": "中考复习线圆最值问题.html"
+ },
+ {
+  "id": 42,
+  "title": "中考复习线圆最值问题",
+  "description": "中考复习",
+  "category": "中考复习",
+  "author": "雷新风",
+  "file": "中考复习线圆最值问题（雷新风）.html",
+  "href": "中考复习线圆最值问题（雷新风）.html"
+ }
+];
@@ -8,191 +8,223 @@
 import os
 import json
 import uuid
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import argparse
+from http.server import SimpleHTTPRequestHandler
+import urllib.parse
 from urllib.parse import parse_qs
-import cgi
-import shutil
 from pathlib import Path
 
-class UploadHandler(SimpleHTTPRequestHandler):
+from access_log import add_logging_arguments, configure_logging_from_args
+from admission import AdmissionHandlerMixin, add_admission_arguments, configure_admission_from_args
+from blob_store import get_blob_store
+from course_catalog import get_course_catalog
+from hot_file_cache import configure_hot_file_cache
+from keep_alive import KeepAliveHandlerMixin, add_keep_alive_arguments, configure_keep_alive_from_args
+from html_metadata import HtmlMetadataExtractor, extract_metadata
+from metadata_cache import cached_file_metadata, get_metadata_cache, warm_metadata_cache
+from multipart_stream import MultipartStreamParser
+from routing import RouterMixin, metrics_routes, send_course_catalog, send_course_search
+from search_index import get_search_index
+from server_metrics import MetricsHandlerMixin, observe_upload, send_metrics
+from server_runtime import add_server_arguments, create_server
+from static_files import content_disposition, is_hidden_path, send_file
+from upload_index import get_upload_index
+from upload_server import BatchUploadMixin
+
+class UploadHandler(MetricsHandlerMixin, AdmissionHandlerMixin, KeepAliveHandlerMixin, RouterMixin,
+                    BatchUploadMixin, SimpleHTTPRequestHandler):
+    ROUTES = (
+        ('POST', '/upload', 'handle_multipart_upload'),
+        # 主页的上传使用批量上传接口（与 upload_server.py 相同）
+        ('POST', '/batch', 'handle_batch_upload'),
+        ('GET', '/api/courses', send_course_catalog),
+        ('GET', '/api/search', send_course_search),
+        ('GET', '/metrics', send_metrics),
+        # uploads目录下的文件
+        ('GET', '/download/', 'send_download'),
+        ('HEAD', '/download/', 'send_download'),
+        # 其余请求都是静态文件
+        ('GET', '*', 'send_static'),
+        ('HEAD', '*', 'send_static'),
+    )
+    # /metrics 中的路由
+    METRICS_ROUTES = metrics_routes(ROUTES)
+    METRICS_DEFAULT_ROUTE = 'static'
+    # /upload 和 /batch 一次可以上传多个文件，使用批量上传大小上限
+    ADMISSION_BATCH_ROUTES = ('/upload', '/batch')
+
     def __init__(self, *args, **kwargs):
         self.upload_dir = os.path.join(os.getcwd(), "uploads")
         super().__init__(*args, **kwargs)
     
-    def do_POST(self):
-        """处理文件上传请求"""
-        if self.path == '/upload':
-            try:
-                # 解析multipart form data
-                content_type = self.headers['content-type']
-                if not content_type.startswith('multipart/form-data'):
-                    self.send_error(400, "Invalid content type")
-                    return
-                
-                # 解析表单数据
-                form = cgi.FieldStorage(
-                    fp=self.rfile,
-                    headers=self.headers,
-                    environ={
-                        'REQUEST_METHOD': 'POST',
-                        'CONTENT_TYPE': self.headers['Content-Type'],
-                    }
-                )
-                
-                uploaded_files = []
-                
-                # 处理文件字段
-                if 'files' in form:
-                    files = form['files']
-                    if not isinstance(files, list):
-                        files = [files]
-                    
-                    for file_item in files:
-                        if file_item.filename:
-                            # 获取文件内容
-                            file_content = file_item.file.read()
-                            filename = file_item.filename
-                            
-                            # 生成唯一文件名避免冲突
-                            file_ext = Path(filename).suffix
-                            unique_filename = f"{uuid.uuid4().hex}{file_ext}"
-                            
-                            # 保存文件
-                            file_path = os.path.join(self.upload_dir, unique_filename)
-                            os.makedirs(self.upload_dir, exist_ok=True)
-                            
-                            with open(file_path, 'wb') as f:
-                                f.write(file_content)
-                            
-                            # 解析文件内容获取信息
-                            file_info = self.parse_html_file(file_content, filename)
-                            file_info['saved_filename'] = unique_filename
-                            file_info['original_filename'] = filename
-                            
-                            uploaded_files.append(file_info)
-                
-                # 返回成功响应
-                response = {
-                    'success': True,
-                    'files': uploaded_files,
-                    'message': f'成功上传 {len(uploaded_files)} 个文件'
-                }
-                
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json; charset=utf-8')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
-                
-            except Exception as e:
-                error_response = {
-                    'success': False,
-                    'message': f'上传失败: {str(e)}'
-                }
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json; charset=utf-8')
-                self.end_headers()
-                self.wfile.write(json.dumps(error_response, ensure_ascii=False).encode('utf-8'))
-        else:
-            self.send_error(404)
-    
-    def parse_html_file(self, content, original_filename):
-        """解析HTML文件提取信息"""
+    def handle_multipart_upload(self):
+        """POST /upload  multipart/form-data，files 字段可以有多个文件"""
+        saved_names = []
         try:
-            # 将字节内容转换为字符串
-            html_content = content.decode('utf-8', errors='ignore')
+            # 解析multipart form data
+            content_type = self.headers.get('Content-Type', '')
+            if not content_type.startswith('multipart/form-data'):
+                self.send_error(400, "Invalid content type")
+                return
+            if self.headers.get('Content-Length') is None:
+                self.send_error(411, "Content-Length required")
+                return
+            content_length = int(self.headers['Content-Length'])
+            os.makedirs(self.upload_dir, exist_ok=True)
             
-            # 提取标题
-            title = original_filename.replace('.html', '').replace('.HTML', '')
-            import re
+            store = get_blob_store(self.upload_dir)
             
-            # 查找h1标签
-            h1_match = re.search(r'<h1[^>]*>([^<]+)</h1>', html_content, re.IGNORECASE)
-            if h1_match:
-                title = h1_match.group(1).strip()
+            def open_part(part):
+                """文件分段开始时创建临时文件，写入时同时计算摘要"""
+                if part.name != 'files':
+                    return None
+                # 写入磁盘的同时提取标题和作者
+                part.extractor = HtmlMetadataExtractor(part.filename)
+                return store.open_writer()
             
-            # 提取作者信息
-            author = "未知作者"
-            author_patterns = [
-                r'作者[：:]\s*([^\n\r<]+)',
-                r'制作者[：:]\s*([^\n\r<]+)',
-                r'制作者[：:]\s*([^\n\r<]+)'
-            ]
+            def close_part(part):
+                """分段接收完整后存入存储，相同内容只保存一份"""
+                # 生成唯一文件名避免冲突
+                file_ext = Path(part.filename).suffix
+                part.saved_filename = f"{uuid.uuid4().hex}{file_ext}"
+                part.saved_path = part.sink.commit(part.saved_filename)
+                saved_names.append(part.saved_filename)
             
-            for pattern in author_patterns:
-                match = re.search(pattern, html_content, re.IGNORECASE)
-                if match:
-                    author = match.group(1).strip()
-                    break
+            # 边接收边分块写入磁盘
+            parser = MultipartStreamParser(self.rfile, content_type, content_length,
+                                           open_part, close_part)
+            parts = parser.parse()
+            
+            uploaded_files = []
+            for part in parts:
+                if part.name != 'files' or not part.filename:
+                    continue
+                # 使用接收时提取到的信息
+                file_info = part.extractor.close()
+                file_info['saved_filename'] = part.saved_filename
+                file_info['original_filename'] = part.filename
+                file_info['size'] = part.size
+                file_info['sha256'] = part.sink.digest
+                file_info['elapsed_ms'] = round(part.elapsed * 1000, 2)
+                uploaded_files.append(file_info)
+                observe_upload(part.size)
+                # 课件目录重建时不需要再解析这个文件
+                get_metadata_cache().put(part.saved_path, part.extractor.result(),
+                                         digest=part.sink.digest)
             
-            # 自动判断分类
-            category = "九年级下册"  # 默认分类
-            if '七年级上册' in title:
-                category = "七年级上册"
-            elif '七年级下册' in title:
-                category = "七年级下册"
-            elif '八年级上册' in title:
-                category = "八年级上册"
-            elif '八年级下册' in title:
-                category = "八年级下册"
-            elif '九年级上册' in title:
-                category = "九年级上册"
-            elif '九年级下册' in title:
-                category = "九年级下册"
-            elif '中考复习' in title:
-                category = "中考复习"
+            # 在一个事务中把本次上传的文件写入索引
+            get_upload_index(self.upload_dir).record_many([{
+                'name': info['saved_filename'],
+                'size': info['size'],
+                'digest': info['sha256'],
+                'uploader_ip': self.client_address[0],
+                'meta': info
+            } for info in uploaded_files])
             
-            return {
-                'title': title,
-                'author': author,
-                'category': category,
-                'description': category
+            # 返回成功响应
+            response = {
+                'success': True,
+                'files': uploaded_files,
+                'message': f'成功上传 {len(uploaded_files)} 个文件'
             }
             
+            
         except Exception as e:
-            print(f"解析HTML文件时出错: {e}")
-            return {
-                'title': original_filename.replace('.html', '').replace('.HTML', ''),
-                'author': "未知作者",
-                'category': "九年级下册",
-                'description': "九年级下册"
+            # 撤销已经存入的文件，内容和引用记录一起删除
+            for name in saved_names:
+                get_blob_store(self.upload_dir).unlink(name)
+            error_response = {
+                'success': False,
+                'message': f'上传失败: {str(e)}'
             }
-    
-    def do_OPTIONS(self):
-        """处理预检请求"""
+            body = json.dumps(error_response, ensure_ascii=False).encode('utf-8')
+            self.send_response(500)
+            self.send_header('Content-type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        
+        body = json.dumps(response, ensure_ascii=False).encode('utf-8')
         self.send_response(200)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
+        self.wfile.write(body)
     
-    def do_GET(self):
-        """处理GET请求 - 提供课件文件下载"""
-        # 如果请求的是uploads目录下的文件，提供下载
-        if self.path.startswith('/download/'):
-            filename = self.path[10:]  # 移除 '/download/'
-            file_path = os.path.join(self.upload_dir, filename)
-            
-            if os.path.exists(file_path):
-                self.send_response(200)
-                self.send_header('Content-type', 'text/html; charset=utf-8')
-                self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
-                self.end_headers()
-                
-                with open(file_path, 'rb') as f:
-                    shutil.copyfileobj(f, self.wfile)
+    @staticmethod
+    def parse_html_file(content, original_filename):
+        """解析HTML文件提取信息"""
+        return extract_metadata(content, original_filename)
+    
+    def send_static(self):
+        """其他GET请求：文件用 sendfile 发送，目录使用默认处理（目录列表、重定向、404）"""
+        if is_hidden_path(self.path):
+            self.send_error(404, "File not found")
+        elif self.command == 'HEAD':
+            if not self.send_static_file(head_only=True):
+                SimpleHTTPRequestHandler.do_HEAD(self)
+        elif not self.send_static_file():
+            SimpleHTTPRequestHandler.do_GET(self)
+    
+    def send_download(self):
+        """下载uploads目录下的文件，支持 Range 和条件请求"""
+        head_only = self.command == 'HEAD'
+        path = urllib.parse.urlsplit(self.path).path
+        # 只取文件名部分，防止 ../ 访问上传目录以外的文件
+        filename = os.path.basename(urllib.parse.unquote(path[len('/download/'):]))
+        file_path = os.path.join(self.upload_dir, filename)
+        status = None
+        if filename and not filename.startswith('.') and os.path.isfile(file_path):
+            status = send_file(self, file_path, 'text/html; charset=utf-8',
+                               {'Content-Disposition': content_disposition(filename)},
+                               head_only=head_only, prefer_built=False)
+        if status is None:
+            self.send_error(404, "File not found")
+    
+    def send_static_file(self, head_only=False):
+        """发送课件等静态文件，返回 False 表示交给默认处理（目录列表、重定向、404）"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith('/'):
+                return False
+            for index in ('index.html', 'index.htm'):
+                if os.path.isfile(os.path.join(path, index)):
+                    path = os.path.join(path, index)
+                    break
             else:
-                self.send_error(404, "File not found")
-        else:
-            # 其他GET请求使用默认处理
-            super().do_GET()
+                return False
+        elif path.endswith('/') or not os.path.isfile(path):
+            return False
+        return send_file(self, path, self.guess_type(path), head_only=head_only) is not None
 
 def main():
-    port = 8001
-    server_address = ('', port)
-    httpd = HTTPServer(server_address, UploadHandler)
+    parser = argparse.ArgumentParser(description='简单的文件上传服务器')
+    add_server_arguments(parser, default_port=8001)
+    parser.add_argument('--hot-cache-mb', type=int, default=64,
+                        help='热点文件内存缓存上限（MB），0 表示不缓存 (默认: 64)')
+    add_admission_arguments(parser)
+    add_keep_alive_arguments(parser)
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    configure_logging_from_args(args)
+    configure_admission_from_args(args)
+    configure_keep_alive_from_args(args)
+    port = args.port
+    server_address = (args.host, port)
+    # 启动时预热课件信息缓存，并建立搜索索引
+    warm_metadata_cache(os.getcwd())
+    get_search_index(get_course_catalog(os.getcwd(), cached_file_metadata))
+    configure_hot_file_cache(args.hot_cache_mb * 1024 * 1024)
+    httpd = create_server(server_address, UploadHandler, mode=args.mode,
+                          workers=args.workers, max_queue=args.max_queue)
     
     print(f"文件上传服务器启动在端口 {port}")
+    print(f"并发模式: {args.mode} | 工作线程: {args.workers} | 排队上限: {args.max_queue}")
+    print(f"热点文件缓存: {args.hot_cache_mb} MB")
+    print(f"上传上限: {args.max_batch_mb} MB | 同时接收: {args.max_inflight_mb or '不限'} MB")
+    print(f"持久连接: 空闲 {args.keep_alive_timeout} 秒 | 每个连接最多 {args.keep_alive_max or '不限'} 个请求")
     print(f"上传目录: {os.path.join(os.getcwd(), 'uploads')}")
     print(f"上传端点: http://localhost:{port}/upload")
     print("按 Ctrl+C 停止服务器")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热点文件内存缓存
+老师让全班打开同一个课件时，几十台设备会在几秒内请求同一个文件。
+文件内容（以及压缩版本）和发送时用到的 ETag、Last-Modified 缓存在内存中，
+总大小有上限，按 LRU 淘汰；每次请求用 stat 检查文件是否被修改。
+多个请求同时未命中时只读取一次磁盘。
+"""
+
+import os
+import email.utils
+import threading
+from collections import OrderedDict
+
+# 默认内存上限
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# 超过这个大小的文件不缓存，直接用 sendfile 发送
+DEFAULT_MAX_FILE_SIZE = 4 * 1024 * 1024
+
+
+class CachedFile:
+    """缓存的文件内容和响应头"""
+
+    __slots__ = ('data', 'encoding', 'mtime_ns', 'size', 'etag', 'last_modified')
+
+    def __init__(self, data, encoding, stat, etag):
+        self.data = data
+        self.encoding = encoding
+        # 原文件的状态，用来判断缓存是否过期
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.etag = etag
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+    def is_fresh(self, stat):
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+class HotFileCache:
+    """按字节数限制大小的 LRU 缓存，所有方法都是线程安全的"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_file_size=DEFAULT_MAX_FILE_SIZE):
+        self.max_bytes = max_bytes
+        self.max_file_size = min(max_file_size, max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 正在读取的文件，同一个文件同时只读取一次
+        self._loading = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key, stat):
+        """返回未过期的缓存，stat 是原文件的当前状态"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.is_fresh(stat):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self._discard_locked(key)
+        return None
+
+    def load(self, key, encoding, send_path, stat, etag):
+        """
+        读取 send_path（原文件或压缩版本）的内容放入缓存，文件太大时返回 None
+        其他线程正在读取同一个文件时等待其结果
+        """
+        if self.max_file_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.is_fresh(stat):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            event = self._loading.get(key)
+            owner = event is None
+            if owner:
+                event = self._loading[key] = threading.Event()
+                self.misses += 1
+        if not owner:
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None or not entry.is_fresh(stat):
+                    # 文件太大没有缓存，或者读取失败
+                    return None
+                self.hits += 1
+                return entry
+        try:
+            with open(send_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size > self.max_file_size:
+                    return None
+                data = f.read(self.max_file_size + 1)
+            if len(data) > self.max_file_size:
+                return None
+            entry = CachedFile(data, encoding, stat, etag)
+            with self._lock:
+                self._discard_locked(key)
+                self._entries[key] = entry
+                self.bytes += len(data)
+                while self.bytes > self.max_bytes:
+                    oldest = next(iter(self._entries))
+                    self._discard_locked(oldest)
+                    self.evictions += 1
+            return entry
+        finally:
+            with self._lock:
+                del self._loading[key]
+            event.set()
+
+    def _discard_locked(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry.data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_hot_file_cache():
+    """进程内共用一个热点文件缓存"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HotFileCache()
+        return _cache
+
+
+def configure_hot_file_cache(max_bytes=DEFAULT_MAX_BYTES, max_file_size=DEFAULT_MAX_FILE_SIZE):
+    """按启动参数重新创建缓存，max_bytes 为 0 时不缓存"""
+    global _cache
+    with _cache_lock:
+        _cache = HotFileCache(max_bytes, max_file_size)
+        return _cache
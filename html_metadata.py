@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课件HTML信息提取
+直接在字节流上增量扫描 <h1> 标题和 "作者："/"制作者：" 字段，两项都找到后
+立即停止，上传时可以边写入磁盘边提取，耗时只与页面开头部分的长度有关。
+"""
+
+import re
+
+# 查找h1标签
+H1_RE = re.compile(rb'<h1[^>]*>([^<]+)</h1>', re.IGNORECASE)
+# 作者信息，"作者：" 同时匹配 "制作者："
+AUTHOR_RE = re.compile(rb'\xe4\xbd\x9c\xe8\x80\x85(?::|\xef\xbc\x9a)\s*([^\n\r<]+)')
+# 未匹配时保留的尾部长度，保证跨块的标签和字段不会被截断
+OVERLAP = 4096
+READ_SIZE = 16 * 1024
+
+DEFAULT_AUTHOR = "未知作者"
+DEFAULT_CATEGORY = "九年级下册"
+CATEGORIES = ('七年级上册', '七年级下册', '八年级上册', '八年级下册',
+              '九年级上册', '九年级下册', '中考复习')
+
+
+def default_title(original_filename):
+    return original_filename.replace('.html', '').replace('.HTML', '')
+
+
+def categorize(title):
+    """根据标题自动判断分类"""
+    for category in CATEGORIES:
+        if category in title:
+            return category
+    return DEFAULT_CATEGORY
+
+
+def build_metadata(title, author):
+    category = categorize(title)
+    return {
+        'title': title,
+        'author': author,
+        'category': category,
+        'description': category
+    }
+
+
+class HtmlMetadataExtractor:
+    """增量提取课件信息，feed() 返回 True 表示已经找到全部字段"""
+
+    def __init__(self, original_filename):
+        self.original_filename = original_filename
+        self.title = None
+        self.author = None
+        self.done = False
+        self.scanned = 0
+        self._buffer = b''
+
+    def feed(self, data):
+        if self.done or not data:
+            return self.done
+        self.scanned += len(data)
+        self._buffer += data
+        self._scan(final=False)
+        return self.done
+
+    def close(self):
+        """输入结束，处理缓冲区中剩余的数据"""
+        if not self.done:
+            self._scan(final=True)
+            self.done = True
+        self._buffer = b''
+        return self.result()
+
+    def _scan(self, final):
+        buffer = self._buffer
+        keep_from = max(0, len(buffer) - OVERLAP)
+        if self.title is None:
+            match = H1_RE.search(buffer)
+            if match:
+                self.title = match.group(1).decode('utf-8', errors='ignore').strip()
+            else:
+                # 保留最后一个未闭合的 <h1，或者可能是标签开头的最后一个 <
+                start = max(buffer.rfind(b'<h1', keep_from), buffer.rfind(b'<H1', keep_from))
+                if start < 0:
+                    start = buffer.rfind(b'<', keep_from)
+                if start >= 0:
+                    keep_from = start
+        if self.author is None:
+            match = AUTHOR_RE.search(buffer)
+            # 匹配到缓冲区末尾时作者名可能还没有接收完整
+            if match and (final or match.end() < len(buffer)):
+                self.author = match.group(1).decode('utf-8', errors='ignore').strip()
+            elif match:
+                keep_from = min(keep_from, match.start())
+        if self.title is not None and self.author is not None:
+            self.done = True
+            self._buffer = b''
+        else:
+            self._buffer = buffer[keep_from:]
+
+    def result(self):
+        title = self.title or default_title(self.original_filename)
+        return build_metadata(title, self.author or DEFAULT_AUTHOR)
+
+
+def extract_metadata(content, original_filename):
+    """从完整的页面内容（str 或 bytes）中提取信息"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    extractor = HtmlMetadataExtractor(original_filename)
+    extractor.feed(content)
+    return extractor.close()
+
+
+def extract_file_metadata(file_path, original_filename, read_size=READ_SIZE):
+    """按块读取文件，找到全部字段后立即停止"""
+    extractor = HtmlMetadataExtractor(original_filename)
+    try:
+        with open(file_path, 'rb') as f:
+            while True:
+                data = f.read(read_size)
+                if not data or extractor.feed(data):
+                    break
+    except OSError:
+        pass
+    return extractor.close()
+
+
+def tee_metadata(chunks, extractor):
+    """在数据块写入磁盘的同时提取信息"""
+    for data in chunks:
+        extractor.feed(data)
+        yield data
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课件HTML压缩
+去掉注释和多余空白，包括内联的 <style> 和 <script>。
+只做不改变语义的变换：字符串、模板字符串和正则表达式原样保留，
+JavaScript 中可能触发自动分号插入的换行不会删除。
+"""
+
+import re
+
+# 原样保留或单独处理的块
+BLOCK_RE = re.compile(
+    r'<!--.*?-->|<(script|style|pre|textarea)\b([^>]*)>(.*?)</\1\s*>',
+    re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]*>')
+# 不包括不间断空格，它在页面中是有意义的
+WHITESPACE_RE = re.compile(r'[ \t\r\n\f]+')
+TYPE_RE = re.compile(r'''\btype\s*=\s*["']?([^"'\s>]+)''', re.IGNORECASE)
+SRC_RE = re.compile(r'\bsrc\s*=', re.IGNORECASE)
+JS_TYPES = ('text/javascript', 'application/javascript', 'module')
+
+WHITESPACE = ' \t\r\n\f\v'
+WORD_CHARS = re.compile(r'[A-Za-z0-9_$\\\u0080-\uffff]')
+# 这些符号两侧的空格可以删除
+JS_PUNCT = set('{}()[];,:=<>!&|?*%^~')
+# 这些符号后面的换行可以删除，不会影响自动分号插入
+JS_NEWLINE_AFTER = set('{([,;:=&|?!<>')
+# 这些符号前面的换行可以删除
+JS_NEWLINE_BEFORE = set(')]},;:?=')
+# 后面的 / 是正则表达式而不是除号
+JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+                     'delete', 'void', 'throw', 'yield', 'await', 'instanceof')
+CSS_SPACE_BEFORE = set('{};,')
+CSS_SPACE_AFTER = set('{};,:')
+
+
+def collapse_whitespace(text):
+    """连续空白合并为一个，包含换行时保留换行"""
+    return WHITESPACE_RE.sub(lambda m: '\n' if '\n' in m.group() else ' ', text)
+
+
+def _scan_string(source, i):
+    """返回从 i 开始的字符串字面量的结束位置"""
+    quote = source[i]
+    j = i + 1
+    n = len(source)
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        j += 1
+        if c == quote or c == '\n':
+            break
+    return min(j, n)
+
+
+def _scan_template(source, i):
+    """
+    从模板字符串内部的 i 开始扫描，返回 (结束位置, 是否遇到 ${)
+    """
+    n = len(source)
+    j = i
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+        elif c == '`':
+            return j + 1, False
+        elif c == '$' and source.startswith('${', j):
+            return j + 2, True
+        else:
+            j += 1
+    return n, False
+
+
+def _scan_regex(source, i):
+    """返回从 i 开始的正则表达式字面量（不含标志）的结束位置"""
+    n = len(source)
+    j = i + 1
+    in_class = False
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            break
+        j += 1
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            break
+    return min(j, n)
+
+
+def _js_separator(prev, nxt, whitespace):
+    """两个记号之间需要保留的空白"""
+    if not prev:
+        return ''
+    if whitespace == '\n':
+        if prev in JS_NEWLINE_AFTER or nxt in JS_NEWLINE_BEFORE:
+            return ''
+        return '\n'
+    if prev == '<' and nxt == '!':
+        # 避免拼出 <!-- 注释
+        return ' '
+    if prev in JS_PUNCT or nxt in JS_PUNCT:
+        return ''
+    if (prev in '+-') != (nxt in '+-'):
+        return ''
+    return ' '
+
+
+def minify_js(source):
+    """删除注释和多余空白"""
+    out = []
+    n = len(source)
+    i = 0
+    # 上一个记号，用来判断 / 是除号还是正则表达式
+    last = ''
+    whitespace = None
+    # 模板字符串中每层 ${ 内部的花括号深度
+    template_depths = []
+
+    def emit(token, kind=None):
+        nonlocal whitespace, last
+        if whitespace is not None and out:
+            separator = _js_separator(out[-1][-1], token[0], whitespace)
+            if separator:
+                out.append(separator)
+        whitespace = None
+        out.append(token)
+        last = kind if kind is not None else token
+
+    while i < n:
+        c = source[i]
+        if c in WHITESPACE:
+            j = i
+            while j < n and source[j] in WHITESPACE:
+                j += 1
+            if '\n' in source[i:j] or whitespace == '\n':
+                whitespace = '\n'
+            else:
+                whitespace = ' '
+            i = j
+        elif source.startswith('//', i):
+            j = source.find('\n', i)
+            i = n if j < 0 else j
+            whitespace = whitespace or ' '
+        elif source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            j = n if j < 0 else j + 2
+            if '\n' in source[i:j] or whitespace == '\n':
+                whitespace = '\n'
+            else:
+                whitespace = ' '
+            i = j
+        elif c in '\'"':
+            j = _scan_string(source, i)
+            emit(source[i:j], '""')
+            i = j
+        elif c == '`':
+            j, interpolation = _scan_template(source, i + 1)
+            emit(source[i:j], '``')
+            if interpolation:
+                template_depths.append(0)
+                last = '{'
+            i = j
+        elif c == '/' and (last in JS_REGEX_AFTER or last in JS_REGEX_KEYWORDS or not last):
+            j = _scan_regex(source, i)
+            emit(source[i:j], '/re/')
+            i = j
+        elif WORD_CHARS.match(c):
+            j = i + 1
+            while j < n and WORD_CHARS.match(source[j]):
+                if source[j] == '\\':
+                    j += 1
+                j += 1
+            # 数字中的小数点和指数，如 1.5e-3
+            if c.isdigit():
+                m = re.match(r'[0-9a-fA-FxXoObB_n]*(?:\.[0-9_]*)?(?:[eE][+-]?[0-9_]+)?', source[i:])
+                j = max(j, i + m.end())
+            emit(source[i:j])
+            i = j
+        elif c == '.' and i + 1 < n and source[i + 1].isdigit():
+            m = re.match(r'\.[0-9_]+(?:[eE][+-]?[0-9_]+)?', source[i:])
+            emit(m.group(), '0')
+            i += m.end()
+        else:
+            if c == '{' and template_depths:
+                template_depths[-1] += 1
+            elif c == '}' and template_depths:
+                if template_depths[-1] == 0:
+                    # 模板字符串中 ${ } 结束，继续扫描模板
+                    template_depths.pop()
+                    j, interpolation = _scan_template(source, i + 1)
+                    emit(source[i:j], '``')
+                    if interpolation:
+                        template_depths.append(0)
+                        last = '{'
+                    i = j
+                    continue
+                template_depths[-1] -= 1
+            emit(c)
+            i += 1
+    return ''.join(out).strip()
+
+
+def minify_css(source):
+    """删除注释和多余空白，字符串原样保留"""
+    out = []
+    n = len(source)
+    i = 0
+    whitespace = False
+    while i < n:
+        c = source[i]
+        if c in WHITESPACE:
+            whitespace = True
+            i += 1
+        elif source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            i = n if j < 0 else j + 2
+            whitespace = True
+        elif c in '\'"':
+            j = _scan_string(source, i)
+            if whitespace and out and out[-1][-1] not in CSS_SPACE_AFTER:
+                out.append(' ')
+            whitespace = False
+            out.append(source[i:j])
+            i = j
+        else:
+            if c in CSS_SPACE_BEFORE:
+                if out and out[-1] == ' ':
+                    out.pop()
+                if c == '}' and out and out[-1] == ';':
+                    # 最后一条声明后面的分号可以省略
+                    out.pop()
+            elif whitespace and out and out[-1][-1] not in CSS_SPACE_AFTER:
+                out.append(' ')
+            whitespace = False
+            out.append(c)
+            i += 1
+    return ''.join(out).strip()
+
+
+def _minify_text(text):
+    """标签之间的文字合并空白，标签本身原样保留"""
+    parts = []
+    last = 0
+    for match in TAG_RE.finditer(text):
+        parts.append(collapse_whitespace(text[last:match.start()]))
+        parts.append(match.group())
+        last = match.end()
+    parts.append(collapse_whitespace(text[last:]))
+    return ''.join(parts)
+
+
+def _is_javascript(attrs):
+    match = TYPE_RE.search(attrs)
+    return match is None or match.group(1).lower() in JS_TYPES
+
+
+def minify_html(html):
+    """压缩整个页面"""
+    parts = []
+    # 注释删除后，前后的文字要合在一起再合并空白
+    text = []
+    last = 0
+    for match in BLOCK_RE.finditer(html):
+        text.append(html[last:match.start()])
+        last = match.end()
+        block = match.group()
+        tag = match.group(1)
+        if tag is None and not block.startswith(('<!--[if', '<!--<![endif')):
+            continue
+        parts.append(_minify_text(''.join(text)))
+        text = []
+        if tag is None:
+            # 保留条件注释
+            parts.append(block)
+            continue
+        attrs, body = match.group(2), match.group(3)
+        tag_lower = tag.lower()
+        if tag_lower == 'style':
+            body = minify_css(body)
+        elif tag_lower == 'script' and not SRC_RE.search(attrs) and _is_javascript(attrs):
+            body = minify_js(body)
+        elif tag_lower == 'script' and not body.strip():
+            body = ''
+        else:
+            parts.append(block)
+            continue
+        close = block[block.rfind('</'):]
+        parts.append(f'<{tag}{collapse_whitespace(attrs)}>{body}{close}')
+    text.append(html[last:])
+    parts.append(_minify_text(''.join(text)))
+    return ''.join(parts).strip() + '\n'
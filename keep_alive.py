@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP/1.1 持久连接
+平板打开主页时的页面、课件目录和搜索请求复用同一个 TCP 连接：
+- 每个响应都必须有 Content-Length（或 chunked），否则发送 Connection: close 并关闭连接
+- 请求体没有读完（如出错时提前返回）的连接不能再读取下一个请求，同样关闭
+- 空闲连接超过 idle_timeout 秒后关闭；一个连接最多处理 max_requests 个请求
+- 响应发送到一半出错时不再发送第二个响应，直接关闭连接
+
+每个连接在等待下一个请求时仍然占用一个工作线程，所以有连接在排队等待工作线程时，
+当前响应发送后就关闭连接，把线程让给排队的连接；single 模式下不保持连接。
+"""
+
+import traceback
+
+from access_log import log_event
+
+DEFAULT_IDLE_TIMEOUT = 5
+# 请求开始后读取请求头和请求体时，两次收到数据之间的最长等待时间
+DEFAULT_REQUEST_TIMEOUT = 60
+DEFAULT_MAX_REQUESTS = 100
+# 没有响应体的状态码
+BODYLESS_STATUSES = (204, 304)
+
+
+class KeepAliveSettings:
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, request_timeout=DEFAULT_REQUEST_TIMEOUT,
+                 max_requests=DEFAULT_MAX_REQUESTS):
+        # idle_timeout 为 0 时每个响应后都关闭连接
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout or None
+        self.max_requests = max_requests
+
+
+_settings = KeepAliveSettings()
+
+
+def configure_keep_alive(idle_timeout=DEFAULT_IDLE_TIMEOUT, request_timeout=DEFAULT_REQUEST_TIMEOUT,
+                         max_requests=DEFAULT_MAX_REQUESTS):
+    global _settings
+    _settings = KeepAliveSettings(idle_timeout, request_timeout, max_requests)
+    return _settings
+
+
+def get_keep_alive_settings():
+    return _settings
+
+
+class ResponseAlreadyStarted(Exception):
+    """响应头已经发送后又要发送另一个响应，只能关闭连接"""
+
+
+class KeepAliveHandlerMixin:
+    """放在 BaseHTTPRequestHandler 子类的基类列表中 BaseHTTPRequestHandler 之前"""
+
+    protocol_version = 'HTTP/1.1'
+    # 响应头和响应体分两次写入，不关闭 Nagle 算法时持久连接上每个响应可能多等待 40ms
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self._requests_handled = 0
+
+    def handle_one_request(self):
+        settings = get_keep_alive_settings()
+        self._waiting = True
+        self._request_parsed = False
+        self._sending_error = False
+        self._response_status = None
+        self._response_headers = set()
+        self._request_body = None
+        # 连接上的第一个请求按请求超时等待，之后按空闲超时等待
+        if self._requests_handled:
+            self.connection.settimeout(settings.idle_timeout or None)
+        else:
+            self.connection.settimeout(settings.request_timeout)
+        try:
+            super().handle_one_request()
+        except ResponseAlreadyStarted:
+            self.close_connection = True
+        except (ConnectionError, TimeoutError):
+            # 客户端已经断开或者长时间没有发送数据
+            self.close_connection = True
+        except Exception as e:
+            self.close_connection = True
+            log_event('request_failed', client=self.client_address[0],
+                      method=getattr(self, 'command', None), path=getattr(self, 'path', None),
+                      error=repr(e), traceback=traceback.format_exc())
+            if self._response_status is None and not self._waiting:
+                try:
+                    self.send_error(500)
+                except OSError:
+                    pass
+
+    def parse_request(self):
+        self._waiting = False
+        if not super().parse_request():
+            return False
+        settings = get_keep_alive_settings()
+        self.connection.settimeout(settings.request_timeout)
+        self._requests_handled += 1
+        if settings.max_requests and self._requests_handled >= settings.max_requests:
+            self.close_connection = True
+        # 记录请求体的长度和开始位置，发送响应时检查是否读完（-1 表示 chunked）
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            length = -1
+        else:
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                # 无法确定请求体在哪里结束
+                self.close_connection = True
+        if length:
+            self._request_body = (length, getattr(self.rfile, 'count', None))
+        self._request_parsed = True
+        return True
+
+    def send_response_only(self, code, message=None):
+        if code >= 200:
+            if self._response_status is not None:
+                raise ResponseAlreadyStarted(f'{self._response_status} -> {code}')
+            self._response_status = code
+            self._response_headers = set()
+        super().send_response_only(code, message)
+
+    def send_error(self, code, message=None, explain=None):
+        # BaseHTTPRequestHandler.send_error 总是关闭连接；请求已经完整解析时（如 404）
+        # 错误页面有 Content-Length，由 end_headers 按请求体是否读完决定是否保持连接
+        self._sending_error = self._request_parsed
+        try:
+            super().send_error(code, message, explain)
+        finally:
+            self._sending_error = False
+
+    def send_header(self, keyword, value):
+        if self._sending_error and keyword.lower() == 'connection':
+            return
+        self._response_headers.add(keyword.lower())
+        super().send_header(keyword, value)
+
+    def end_headers(self):
+        self._sending_error = False
+        status = self._response_status
+        if status is not None and self.request_version != 'HTTP/0.9':
+            if not self.close_connection and (self.response_unframed(status)
+                                              or self.request_body_unread(status)
+                                              or self.server_busy()):
+                self.close_connection = True
+            if 'connection' not in self._response_headers:
+                if self.close_connection:
+                    self.send_header('Connection', 'close')
+                else:
+                    settings = get_keep_alive_settings()
+                    self.send_header('Connection', 'keep-alive')
+                    remaining = ''
+                    if settings.max_requests:
+                        remaining = f', max={settings.max_requests - self._requests_handled}'
+                    self.send_header('Keep-Alive', f'timeout={settings.idle_timeout}{remaining}')
+        super().end_headers()
+
+    def response_unframed(self, status):
+        """响应有响应体，但客户端无法知道它在哪里结束"""
+        if self.command == 'HEAD' or status in BODYLESS_STATUSES:
+            return False
+        return not self._response_headers & {'content-length', 'transfer-encoding'}
+
+    def request_body_unread(self, status):
+        """请求体没有读完时，剩余的数据会被当成下一个请求"""
+        if self._request_body is None:
+            return False
+        length, start = self._request_body
+        if length < 0 or start is None:
+            # chunked 或无法统计读取量：出错的响应按未读完处理
+            return status >= 400
+        return self.rfile.count - start < length
+
+    def server_busy(self):
+        """没有空闲的工作线程时不保持连接；不支持的服务器（single 模式）总是不保持"""
+        if not get_keep_alive_settings().idle_timeout:
+            return True
+        connections_waiting = getattr(self.server, 'connections_waiting', None)
+        return connections_waiting is None or connections_waiting() > 0
+
+    def log_error(self, format, *args):
+        # 空闲连接超时是正常的关闭，不记录
+        if self._waiting and format.startswith('Request timed out'):
+            return
+        super().log_error(format, *args)
+
+
+def add_keep_alive_arguments(parser):
+    """为命令行解析器添加持久连接参数"""
+    parser.add_argument('--keep-alive-timeout', type=int, default=DEFAULT_IDLE_TIMEOUT,
+                        help=f'空闲连接保持的秒数，0 表示不保持连接 (默认: {DEFAULT_IDLE_TIMEOUT})')
+    parser.add_argument('--keep-alive-max', type=int, default=DEFAULT_MAX_REQUESTS,
+                        help=f'每个连接最多处理的请求数，0 表示不限制 (默认: {DEFAULT_MAX_REQUESTS})')
+    parser.add_argument('--request-timeout', type=int, default=DEFAULT_REQUEST_TIMEOUT,
+                        help=f'接收请求时等待数据的最长秒数，0 表示不限制 (默认: {DEFAULT_REQUEST_TIMEOUT})')
+    return parser
+
+
+def configure_keep_alive_from_args(args):
+    return configure_keep_alive(idle_timeout=args.keep_alive_timeout,
+                                request_timeout=args.request_timeout,
+                                max_requests=args.keep_alive_max)
@@ -1,42 +1,195 @@
-import pandas as pd
-
-# 读取Markdown文件
-with open('课件统计表格.md', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
-
-# 找到表格开始的位置
-start_index = None
-for i, line in enumerate(lines):
-    if '| 序号 | 年级 | 册数 | 章节 | 课件名称 | 作者 |' in line:
-        start_index = i
-        break
-
-if start_index is None:
-    print("未找到表格")
-    exit()
-
-# 提取表格数据
-header = lines[start_index].strip().split('|')[1:-1]  # 去除首尾空字符串
-header = [h.strip() for h in header]
-
-data = []
-for line in lines[start_index + 2:]:  # 跳过表头和分隔线
-    if line.strip() and '|' in line:
-        cells = line.strip().split('|')[1:-1]  # 去除首尾空字符串
-        cells = [c.strip() for c in cells]
-        data.append(cells)
-
-# 创建DataFrame
-df = pd.DataFrame(data, columns=header)
-
-# 保存为Excel文件
-with pd.ExcelWriter('课件统计表格.xlsx', engine='openpyxl') as writer:
-    df.to_excel(writer, index=False)
-    
-    # 获取工作表
-    worksheet = writer.sheets['Sheet1']
-    
-    # 设置列宽：22个汉字，每个汉字大约需要2个宽度单位
-    worksheet.column_dimensions['E'].width = 22 * 2
-
-print('转换完成！Excel文件已保存为：课件统计表格.xlsx')
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markdown 表格转 Excel
+逐行解析 Markdown 中的表格，用 openpyxl 的只写模式写入，不把整个文件读入内存。
+- 文件中的每个表格写入一个工作表，工作表名称取表格前面最近的标题
+- 列宽按内容计算，汉字按两个字符宽度计
+- 纯数字的单元格写成数字
+
+    python markdown_to_excel.py [课件统计表格.md] [-o 课件统计表格.xlsx]
+"""
+
+import os
+import re
+import time
+import argparse
+import unicodedata
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+DEFAULT_INPUT = '课件统计表格.md'
+# 列宽范围（字符宽度）
+MIN_COLUMN_WIDTH = 6
+MAX_COLUMN_WIDTH = 60
+COLUMN_PADDING = 2
+# Excel 工作表名称的限制
+MAX_SHEET_TITLE = 31
+INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+SEPARATOR_CELL = re.compile(r'^\s*:?-+:?\s*$')
+HEADING = re.compile(r'^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$')
+NUMBER = re.compile(r'^-?(0|[1-9]\d*)(\.\d+)?$')
+
+
+def split_row(line):
+    """把表格行拆成单元格，支持 \\| 转义的竖线"""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    cells = re.split(r'(?<!\\)\|', line)
+    return [cell.strip().replace('\\|', '|') for cell in cells]
+
+
+def is_table_line(line):
+    return '|' in line and line.strip() != ''
+
+
+def is_separator(cells):
+    return bool(cells) and all(SEPARATOR_CELL.match(cell) for cell in cells)
+
+
+def iter_tables(path):
+    """
+    逐行读取 Markdown 文件，依次返回 (标题, 表头, 行迭代器)
+    必须先读完一个表格的行迭代器再取下一个表格
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        title = None
+        pending = None
+        for line in f:
+            match = HEADING.match(line)
+            if match:
+                title = match.group(1)
+                pending = None
+                continue
+            if not is_table_line(line):
+                pending = None
+                continue
+            cells = split_row(line)
+            if pending is None or not is_separator(cells):
+                pending = cells
+                continue
+            header, pending = pending, None
+            rows, next_line = _table_rows(f, len(header))
+            yield title, header, rows
+            # 表格结束的那一行可能是下一个表格前的标题
+            rows.close()
+            if next_line and HEADING.match(next_line[0]):
+                title = HEADING.match(next_line[0]).group(1)
+
+
+def _table_rows(f, columns):
+    """读取表格的数据行，直到空行或不是表格的行；结束行保存在 next_line 中"""
+    next_line = []
+
+    def rows():
+        for line in f:
+            if not is_table_line(line):
+                next_line.append(line)
+                return
+            cells = split_row(line)
+            # 和表头对齐：多余的单元格丢弃，缺少的补空
+            yield (cells + [''] * columns)[:columns]
+
+    return rows(), next_line
+
+
+def text_width(text):
+    """显示宽度，全角字符（汉字、全角标点）按2计算"""
+    return sum(2 if unicodedata.east_asian_width(ch) in 'WF' else 1 for ch in text)
+
+
+def cell_value(text):
+    if NUMBER.match(text):
+        return float(text) if '.' in text else int(text)
+    return text
+
+
+def sheet_title(title, index, used):
+    """合法且不重复的工作表名称"""
+    title = INVALID_SHEET_CHARS.sub('', title or '').strip()[:MAX_SHEET_TITLE] or f'Sheet{index}'
+    candidate = title
+    n = 2
+    while candidate.lower() in used:
+        suffix = f' ({n})'
+        candidate = title[:MAX_SHEET_TITLE - len(suffix)] + suffix
+        n += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def measure_tables(path):
+    """第一遍：每个表格各列的最大显示宽度，只保存宽度不保存内容"""
+    widths = []
+    for _, header, rows in iter_tables(path):
+        column_widths = [text_width(cell) for cell in header]
+        for row in rows:
+            for i, cell in enumerate(row):
+                width = text_width(cell)
+                if width > column_widths[i]:
+                    column_widths[i] = width
+        widths.append(column_widths)
+    return widths
+
+
+def convert(input_path, output_path):
+    """
+    把 Markdown 文件中的所有表格写入 Excel，返回 [(工作表名称, 行数)]
+    读取两遍文件：第一遍计算列宽（只写模式下列宽必须在写入行之前设置），第二遍写入
+    """
+    widths = measure_tables(input_path)
+    workbook = Workbook(write_only=True)
+    sheets = []
+    used = set()
+    header_font = Font(bold=True)
+    for index, (title, header, rows) in enumerate(iter_tables(input_path), 1):
+        sheet = workbook.create_sheet(sheet_title(title, index, used))
+        for i, width in enumerate(widths[index - 1], 1):
+            width = min(max(width + COLUMN_PADDING, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH)
+            sheet.column_dimensions[get_column_letter(i)].width = width
+        header_cells = []
+        for text in header:
+            cell = WriteOnlyCell(sheet, value=text)
+            cell.font = header_font
+            header_cells.append(cell)
+        sheet.append(header_cells)
+        count = 0
+        for row in rows:
+            sheet.append([cell_value(text) for text in row])
+            count += 1
+        sheets.append((sheet.title, count))
+    if not sheets:
+        return sheets
+    temp_path = output_path + '.tmp'
+    workbook.save(temp_path)
+    os.replace(temp_path, output_path)
+    return sheets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把 Markdown 文件中的表格转换为 Excel')
+    parser.add_argument('input', nargs='?', default=DEFAULT_INPUT,
+                        help=f'Markdown 文件 (默认: {DEFAULT_INPUT})')
+    parser.add_argument('-o', '--output', help='Excel 文件 (默认: 与输入文件同名的 .xlsx)')
+    args = parser.parse_args()
+    output = args.output or os.path.splitext(args.input)[0] + '.xlsx'
+
+    started = time.perf_counter()
+    sheets = convert(args.input, output)
+    if not sheets:
+        print("未找到表格")
+        raise SystemExit(1)
+    elapsed = time.perf_counter() - started
+    for title, count in sheets:
+        print(f"  {title}: {count} 行")
+    print(f'转换完成！Excel文件已保存为：{output}（用时 {elapsed:.2f} 秒）')
+
+
+if __name__ == '__main__':
+    main()
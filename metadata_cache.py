@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课件信息缓存
+解析结果按 (路径, 大小, 修改时间, 可选摘要) 保存在 uploads/.metadata_cache.sqlite3，
+前面再加一层有上限的内存 LRU。服务器启动和重建课件目录时，
+只有内容发生变化的文件才需要重新解析。
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from html_metadata import extract_file_metadata
+
+CACHE_FILENAME = '.metadata_cache.sqlite3'
+# 内存中最多保留的条目数
+DEFAULT_MAX_ENTRIES = 4096
+COURSEWARE_EXTENSIONS = ('.html', '.htm')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT,
+    meta TEXT NOT NULL
+);
+"""
+
+
+class MetadataCache:
+    """磁盘缓存 + 内存 LRU，所有方法都是线程安全的"""
+
+    def __init__(self, cache_dir, max_entries=DEFAULT_MAX_ENTRIES, parse=extract_file_metadata):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, CACHE_FILENAME)
+        self.max_entries = max_entries
+        self.parse = parse
+        self.hits = 0
+        self.misses = 0
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._db_lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._db_lock:
+            self._conn.close()
+
+    def _remember(self, path, entry):
+        with self._lock:
+            self._lru[path] = entry
+            self._lru.move_to_end(path)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _lookup(self, path):
+        with self._lock:
+            entry = self._lru.get(path)
+            if entry is not None:
+                self._lru.move_to_end(path)
+                return entry
+        with self._db_lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, digest, meta FROM metadata WHERE path = ?',
+                (path,)).fetchone()
+        if row is None:
+            return None
+        entry = (row[0], row[1], row[2], json.loads(row[3]))
+        self._remember(path, entry)
+        return entry
+
+    def put(self, file_path, meta, digest=None, stat=None):
+        """保存一条解析结果，stat 为空时读取文件当前状态"""
+        path = os.path.abspath(file_path)
+        stat = stat or os.stat(path)
+        entry = (stat.st_size, stat.st_mtime_ns, digest, meta)
+        self._remember(path, entry)
+        with self._db_lock:
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO metadata (path, size, mtime_ns, digest, meta) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (path, entry[0], entry[1], digest, json.dumps(meta, ensure_ascii=False)))
+
+    def put_many(self, items):
+        """在一个事务中保存多条解析结果，items 为 [(文件路径, 信息, 摘要)]"""
+        rows = []
+        for file_path, meta, digest in items:
+            path = os.path.abspath(file_path)
+            stat = os.stat(path)
+            self._remember(path, (stat.st_size, stat.st_mtime_ns, digest, meta))
+            rows.append((path, stat.st_size, stat.st_mtime_ns, digest,
+                         json.dumps(meta, ensure_ascii=False)))
+        with self._db_lock:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO metadata (path, size, mtime_ns, digest, meta) '
+                    'VALUES (?, ?, ?, ?, ?)', rows)
+
+    def get(self, file_path, original_filename, digest=None, stat=None):
+        """返回文件的课件信息，缓存失效时重新解析"""
+        path = os.path.abspath(file_path)
+        try:
+            stat = stat or os.stat(path)
+        except OSError:
+            return self.parse(path, original_filename)
+        entry = self._lookup(path)
+        if (entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns
+                and (digest is None or entry[2] in (None, digest))):
+            self.hits += 1
+            return entry[3]
+        self.misses += 1
+        meta = self.parse(path, original_filename)
+        self.put(path, meta, digest=digest, stat=stat)
+        return meta
+
+    def warm(self, directories):
+        """
+        启动时预热：一次性载入这些目录下文件的缓存记录，
+        并重新解析发生变化的文件，返回 (命中数, 重新解析数)
+        """
+        prefixes = [os.path.abspath(d) + os.sep for d in directories]
+        with self._db_lock:
+            rows = self._conn.execute(
+                'SELECT path, size, mtime_ns, digest, meta FROM metadata').fetchall()
+        for path, size, mtime_ns, digest, meta in rows:
+            if any(path.startswith(p) for p in prefixes):
+                self._remember(path, (size, mtime_ns, digest, json.loads(meta)))
+
+        hits, misses = self.hits, self.misses
+        for directory in directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.lower().endswith(COURSEWARE_EXTENSIONS) and entry.is_file():
+                    self.get(entry.path, entry.name, stat=entry.stat())
+        return self.hits - hits, self.misses - misses
+
+    def prune(self):
+        """删除已不存在的文件的缓存记录"""
+        with self._db_lock:
+            paths = [row[0] for row in self._conn.execute('SELECT path FROM metadata')]
+        missing = [(path,) for path in paths if not os.path.exists(path)]
+        if missing:
+            with self._db_lock:
+                with self._conn:
+                    self._conn.executemany('DELETE FROM metadata WHERE path = ?', missing)
+            with self._lock:
+                for (path,) in missing:
+                    self._lru.pop(path, None)
+        return len(missing)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_metadata_cache(cache_dir=None):
+    """每个缓存目录共用一个 MetadataCache 实例，默认放在 uploads 目录中"""
+    cache_dir = os.path.abspath(cache_dir or os.path.join(os.getcwd(), 'uploads'))
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = MetadataCache(cache_dir)
+            _caches[cache_dir] = cache
+        return cache
+
+
+def cached_file_metadata(file_path, original_filename):
+    """与 extract_file_metadata 用法相同，但优先使用缓存"""
+    return get_metadata_cache().get(file_path, original_filename)
+
+
+def warm_metadata_cache(root_dir):
+    """启动时预热课件目录和 uploads 目录的缓存"""
+    cache = get_metadata_cache(os.path.join(root_dir, 'uploads'))
+    cache.prune()
+    hits, parsed = cache.warm([root_dir, os.path.join(root_dir, 'uploads')])
+    print(f"课件信息缓存已预热: 命中 {hits} 个, 重新解析 {parsed} 个")
+    return hits, parsed
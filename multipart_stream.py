@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式 multipart/form-data 解析器
+替代已弃用的 cgi.FieldStorage：边接收边把每个文件分块写入磁盘，
+内存占用只和分块大小有关，与文件大小和文件数量无关。
+"""
+
+import os
+import time
+from email.parser import HeaderParser
+
+# 每次从网络读取、写入磁盘的块大小
+CHUNK_SIZE = 64 * 1024
+# 单个分段头部的最大长度，防止恶意请求占用内存
+MAX_HEADER_SIZE = 16 * 1024
+# 普通表单字段（非文件）的最大长度
+MAX_FIELD_SIZE = 64 * 1024
+
+
+class MultipartError(ValueError):
+    """multipart 请求格式错误"""
+
+
+def get_boundary(content_type):
+    """从 Content-Type 头中取出 boundary"""
+    if not content_type or not content_type.startswith('multipart/form-data'):
+        raise MultipartError("Invalid content type")
+    msg = HeaderParser().parsestr(f'Content-Type: {content_type}\r\n\r\n')
+    boundary = msg.get_param('boundary')
+    if not boundary:
+        raise MultipartError("Missing boundary")
+    if len(boundary) > 200:
+        raise MultipartError("Boundary too long")
+    return boundary.encode('latin-1')
+
+
+def parse_part_headers(raw_headers):
+    """解析分段头部，返回 (字段名, 文件名, 内容类型)"""
+    # 浏览器会直接用 UTF-8 发送中文文件名
+    text = raw_headers.decode('utf-8', errors='replace')
+    msg = HeaderParser().parsestr(text + '\r\n\r\n')
+    name = msg.get_param('name', header='content-disposition')
+    filename = msg.get_param('filename', header='content-disposition')
+    if isinstance(filename, tuple):
+        # RFC 2231 编码的文件名
+        filename = filename[2]
+    if filename is not None:
+        # 旧版浏览器会发送完整路径，只保留文件名部分
+        filename = os.path.basename(filename.replace('\\', '/'))
+    return name, filename, msg.get_content_type()
+
+
+class MultipartPart:
+    """一个已经接收完毕的分段"""
+
+    def __init__(self, name, filename, content_type):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        # 可选的信息提取器，分段内容写入时同时交给它扫描
+        self.extractor = None
+        self.value = None
+        self.sink = None
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'filename': self.filename,
+            'size': self.size,
+            'elapsed_ms': round(self.elapsed * 1000, 2)
+        }
+
+
+class MultipartStreamParser:
+    """
+    按块读取请求体并拆分 multipart 分段
+
+    open_part(part) 在每个文件分段开始时调用，返回一个可写的文件对象
+    (返回 None 表示丢弃该分段)；close_part(part) 在分段完整接收后调用。
+    分段不完整时会调用文件对象的 abort()（没有时调用 close()）。
+    """
+
+    def __init__(self, fp, content_type, content_length, open_part, close_part=None,
+                 chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.boundary = get_boundary(content_type)
+        self.remaining = content_length
+        self.open_part = open_part
+        self.close_part = close_part
+        self.chunk_size = chunk_size
+        self.delimiter = b'\r\n--' + self.boundary
+        # 在开头补一个换行，使第一个分隔符和后续分隔符格式一致
+        self.buffer = b'\r\n'
+        self.eof = False
+
+    def _fill(self):
+        """从请求体中再读取一块数据，返回是否读到了数据"""
+        if self.remaining <= 0:
+            self.eof = True
+            return False
+        data = self.fp.read(min(self.chunk_size, self.remaining))
+        if not data:
+            self.eof = True
+            return False
+        self.remaining -= len(data)
+        self.buffer += data
+        return True
+
+    def _skip_preamble(self):
+        while True:
+            index = self.buffer.find(self.delimiter)
+            if index >= 0:
+                self.buffer = self.buffer[index + len(self.delimiter):]
+                return
+            # 保留可能包含半个分隔符的尾部
+            self.buffer = self.buffer[-len(self.delimiter):]
+            if not self._fill():
+                raise MultipartError("Missing initial boundary")
+
+    def _read_after_delimiter(self):
+        """读取分隔符后的两个字节，返回是否还有下一个分段"""
+        while len(self.buffer) < 2:
+            if not self._fill():
+                raise MultipartError("Unexpected end of body")
+        marker = self.buffer[:2]
+        if marker == b'--':
+            return False
+        # 忽略分隔符后的空白
+        line_end = self.buffer.find(b'\r\n')
+        while line_end < 0:
+            if len(self.buffer) > MAX_HEADER_SIZE or not self._fill():
+                raise MultipartError("Malformed boundary line")
+            line_end = self.buffer.find(b'\r\n')
+        self.buffer = self.buffer[line_end + 2:]
+        return True
+
+    def _read_headers(self):
+        while True:
+            index = self.buffer.find(b'\r\n\r\n')
+            if index >= 0:
+                raw = self.buffer[:index]
+                self.buffer = self.buffer[index + 4:]
+                return raw
+            if len(self.buffer) > MAX_HEADER_SIZE:
+                raise MultipartError("Part headers too large")
+            if not self._fill():
+                raise MultipartError("Unexpected end of part headers")
+
+    def _write(self, part, data):
+        if not data:
+            return
+        part.size += len(data)
+        if part.extractor is not None:
+            part.extractor.feed(data)
+        if part.sink is not None:
+            part.sink.write(data)
+        elif part.filename is None:
+            if part.size > MAX_FIELD_SIZE:
+                raise MultipartError("Form field too large")
+            part.value += data
+
+    def _read_body(self, part):
+        """把分段内容写入 sink，直到遇到下一个分隔符"""
+        keep = len(self.delimiter) - 1
+        while True:
+            index = self.buffer.find(self.delimiter)
+            if index >= 0:
+                self._write(part, self.buffer[:index])
+                self.buffer = self.buffer[index + len(self.delimiter):]
+                return
+            if len(self.buffer) > keep:
+                self._write(part, self.buffer[:-keep])
+                self.buffer = self.buffer[-keep:]
+            if not self._fill():
+                raise MultipartError("Unexpected end of part body")
+
+    def parse(self):
+        """解析整个请求体，返回 MultipartPart 列表"""
+        parts = []
+        self._skip_preamble()
+        while self._read_after_delimiter():
+            name, filename, content_type = parse_part_headers(self._read_headers())
+            part = MultipartPart(name, filename, content_type)
+            if filename is not None:
+                part.sink = self.open_part(part) if filename else None
+            else:
+                part.value = b''
+            try:
+                self._read_body(part)
+            except BaseException:
+                # 分段没有接收完整，丢弃已写入的内容
+                if part.sink is not None:
+                    getattr(part.sink, 'abort', part.sink.close)()
+                raise
+            part.elapsed = time.perf_counter() - part.started
+            if part.sink is not None and self.close_part is not None:
+                self.close_part(part)
+            parts.append(part)
+        # 丢弃结束分隔符之后剩余的数据
+        while self._fill():
+            self.buffer = b''
+        return parts
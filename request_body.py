@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求体流式读取工具
+支持 Content-Length 和 chunked 传输编码，按块读取并限制总大小，
+上传内容可以直接写入磁盘而不需要整体读入内存。
+"""
+
+# 每次读取的块大小
+CHUNK_SIZE = 64 * 1024
+# 单个上传文件的默认大小上限
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+# chunked 编码中每行（块大小行、trailer 行）的最大长度
+MAX_LINE_SIZE = 8 * 1024
+
+
+class RequestBodyError(Exception):
+    """请求体无法读取，status 为应返回给客户端的状态码"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _read_line(rfile):
+    line = rfile.readline(MAX_LINE_SIZE + 1)
+    if len(line) > MAX_LINE_SIZE:
+        raise RequestBodyError(400, "Chunk line too long")
+    if not line:
+        raise RequestBodyError(400, "Unexpected end of chunked body")
+    return line
+
+
+def _iter_chunked(rfile, max_size, chunk_size):
+    total = 0
+    while True:
+        size_line = _read_line(rfile).split(b';', 1)[0].strip()
+        try:
+            size = int(size_line, 16)
+        except ValueError:
+            raise RequestBodyError(400, "Invalid chunk size")
+        if size < 0:
+            raise RequestBodyError(400, "Invalid chunk size")
+        if size == 0:
+            # 跳过 trailer 直到空行
+            while _read_line(rfile) not in (b'\r\n', b'\n'):
+                pass
+            return
+        total += size
+        if total > max_size:
+            raise RequestBodyError(413, "Request body too large")
+        while size > 0:
+            data = rfile.read(min(chunk_size, size))
+            if not data:
+                raise RequestBodyError(400, "Unexpected end of chunked body")
+            size -= len(data)
+            yield data
+        if _read_line(rfile) not in (b'\r\n', b'\n'):
+            raise RequestBodyError(400, "Missing chunk terminator")
+
+
+def _iter_fixed(rfile, length, chunk_size):
+    remaining = length
+    while remaining > 0:
+        data = rfile.read(min(chunk_size, remaining))
+        if not data:
+            raise RequestBodyError(400, "Unexpected end of request body")
+        remaining -= len(data)
+        yield data
+
+
+def iter_request_body(handler, max_size=MAX_UPLOAD_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    按块迭代请求体
+    在读取任何数据之前检查 Content-Length，超过 max_size 时直接抛出 413。
+    """
+    transfer_encoding = handler.headers.get('Transfer-Encoding', '').lower()
+    if 'chunked' in transfer_encoding:
+        return _iter_chunked(handler.rfile, max_size, chunk_size)
+    content_length = handler.headers.get('Content-Length')
+    if content_length is None:
+        raise RequestBodyError(411, "Content-Length required")
+    try:
+        length = int(content_length)
+    except ValueError:
+        raise RequestBodyError(400, "Invalid Content-Length")
+    if length < 0:
+        raise RequestBodyError(400, "Invalid Content-Length")
+    if length > max_size:
+        raise RequestBodyError(413, "Request body too large")
+    return _iter_fixed(handler.rfile, length, chunk_size)
+
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可续传的分块上传
+网络中断后客户端只需查询服务器已收到的字节数，从该位置继续发送：
+- POST  /sessions                  创建上传会话
+- PATCH /sessions/<id>             按 Upload-Offset 追加一块数据
+- HEAD  /sessions/<id>             查询当前偏移量（Upload-Offset 响应头）
+- POST  /sessions/<id>/complete    完成上传，文件进入 uploads 目录
+已接收的数据保存在 uploads/.sessions/ 中，长时间没有更新的会话会被清理。
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+
+from access_log import log_event
+from blob_store import get_blob_store
+from request_body import MAX_UPLOAD_SIZE
+
+SESSIONS_DIRNAME = '.sessions'
+# 会话超过这个时间没有更新就会被清理（秒）
+SESSION_TTL = 24 * 3600
+# 两次清理之间的最短间隔（秒）
+GC_INTERVAL = 600
+
+
+class UploadSessionError(Exception):
+    """会话操作失败，status 为应返回给客户端的状态码"""
+
+    def __init__(self, status, message, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.offset = offset
+
+
+class ResumableUploadManager:
+    """管理所有上传会话，会话状态全部保存在磁盘上，服务器重启后仍可续传"""
+
+    def __init__(self, uploads_dir, ttl=SESSION_TTL, max_size=MAX_UPLOAD_SIZE):
+        self.uploads_dir = uploads_dir
+        self.sessions_dir = os.path.join(uploads_dir, SESSIONS_DIRNAME)
+        self.ttl = ttl
+        self.max_size = max_size
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._session_locks = {}
+        self._last_gc = 0
+
+    def _meta_path(self, session_id):
+        return os.path.join(self.sessions_dir, session_id + '.json')
+
+    def _data_path(self, session_id):
+        return os.path.join(self.sessions_dir, session_id + '.part')
+
+    def _session_lock(self, session_id):
+        with self._lock:
+            lock = self._session_locks.get(session_id)
+            if lock is None:
+                lock = threading.Lock()
+                self._session_locks[session_id] = lock
+            return lock
+
+    def _load(self, session_id):
+        # 会话ID只能是create()生成的十六进制字符串
+        if not session_id or not all(c in '0123456789abcdef' for c in session_id):
+            raise UploadSessionError(404, "Upload session not found")
+        try:
+            with open(self._meta_path(session_id), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise UploadSessionError(404, "Upload session not found")
+        # 以磁盘上实际保存的数据长度为准
+        try:
+            meta['offset'] = os.path.getsize(self._data_path(session_id))
+        except OSError:
+            meta['offset'] = 0
+        return meta
+
+    def _save(self, meta):
+        path = self._meta_path(meta['id'])
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({k: v for k, v in meta.items() if k != 'offset'}, f,
+                      ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def _remove(self, session_id):
+        for path in (self._meta_path(session_id), self._data_path(session_id)):
+            if os.path.exists(path):
+                os.remove(path)
+        with self._lock:
+            self._session_locks.pop(session_id, None)
+
+    def create(self, filename, size):
+        """创建上传会话，返回会话信息"""
+        if size < 0:
+            raise UploadSessionError(400, "Invalid upload size")
+        if size > self.max_size:
+            raise UploadSessionError(413, "Upload too large")
+        self.maybe_gc()
+        now = time.time()
+        meta = {
+            'id': uuid.uuid4().hex,
+            'filename': filename,
+            'size': size,
+            'created': now,
+            'updated': now
+        }
+        open(self._data_path(meta['id']), 'wb').close()
+        self._save(meta)
+        meta['offset'] = 0
+        return self.describe(meta)
+
+    def describe(self, meta):
+        return {
+            'id': meta['id'],
+            'filename': meta['filename'],
+            'size': meta['size'],
+            'offset': meta['offset'],
+            'expires': meta['updated'] + self.ttl
+        }
+
+    def status(self, session_id):
+        return self.describe(self._load(session_id))
+
+    def append(self, session_id, offset, chunks):
+        """
+        从 offset 处追加数据
+        offset 必须等于服务器当前已收到的字节数，否则抛出 409 并带上正确的偏移量
+        """
+        with self._session_lock(session_id):
+            meta = self._load(session_id)
+            if offset != meta['offset']:
+                raise UploadSessionError(409, "Offset mismatch", meta['offset'])
+            written = 0
+            try:
+                with open(self._data_path(session_id), 'ab') as f:
+                    for data in chunks:
+                        if meta['offset'] + written + len(data) > meta['size']:
+                            raise UploadSessionError(413, "Chunk exceeds declared size")
+                        f.write(data)
+                        written += len(data)
+            finally:
+                # 即使连接中途断开，已写入的数据也会保留，客户端可以从新的偏移量继续
+                meta['updated'] = time.time()
+                self._save(meta)
+            meta['offset'] += written
+            return self.describe(meta)
+
+    def complete(self, session_id, name):
+        """
+        完成上传，把数据存入上传目录
+        返回 (完整路径, 摘要, 字节数)
+        """
+        with self._session_lock(session_id):
+            meta = self._load(session_id)
+            if meta['offset'] != meta['size']:
+                raise UploadSessionError(409, "Upload incomplete", meta['offset'])
+            store = get_blob_store(self.uploads_dir)
+            path, digest, size = store.save_file(name, self._data_path(session_id))
+            self._remove(session_id)
+            return path, digest, size
+
+    def maybe_gc(self):
+        """距离上次清理超过 GC_INTERVAL 时清理过期会话"""
+        now = time.time()
+        with self._lock:
+            if now - self._last_gc < GC_INTERVAL:
+                return 0
+            self._last_gc = now
+        return self.gc_expired(now)
+
+    def gc_expired(self, now=None):
+        """删除超过 ttl 没有更新的会话，返回删除的数量"""
+        now = now or time.time()
+        removed = 0
+        for entry in os.listdir(self.sessions_dir):
+            if not entry.endswith('.json'):
+                continue
+            session_id = entry[:-len('.json')]
+            try:
+                with open(self._meta_path(session_id), 'r', encoding='utf-8') as f:
+                    updated = json.load(f).get('updated', 0)
+            except (OSError, ValueError):
+                updated = 0
+            if now - updated > self.ttl:
+                with self._session_lock(session_id):
+                    self._remove(session_id)
+                removed += 1
+        if removed:
+            log_event('upload_sessions_expired', removed=removed)
+        return removed
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_upload_manager(uploads_dir, max_size=None):
+    """
+    每个上传目录共用一个 ResumableUploadManager 实例
+    max_size 为启动参数配置的单个文件上限，不为 None 时更新实例的上限
+    """
+    uploads_dir = os.path.abspath(uploads_dir)
+    with _managers_lock:
+        manager = _managers.get(uploads_dir)
+        if manager is None:
+            manager = ResumableUploadManager(uploads_dir)
+            _managers[uploads_dir] = manager
+        if max_size is not None:
+            manager.max_size = max_size
+        return manager
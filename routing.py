@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按路由表分发请求
+处理器的 ROUTES 中每一项为 (方法, 路径, 处理方法)：
+- 路径以 / 结尾（根路径除外）时按前缀匹配，含 * 时按通配符匹配，其余按完整路径匹配，都不含查询参数
+- 处理方法是处理器的方法名，或者只接收请求处理器一个参数的函数（多个服务器共用的路由）
+- 按顺序匹配，第一个匹配的路由处理请求
+
+路径匹配但方法不匹配时返回 405，都不匹配时返回 404。OPTIONS 请求按路由表回答跨域预检。
+"""
+
+import os
+import fnmatch
+import urllib.parse
+
+from course_catalog import get_course_catalog, send_catalog
+from metadata_cache import cached_file_metadata
+from search_index import send_search_results
+
+CORS_ALLOW_HEADERS = 'Content-Type, Upload-Offset'
+
+
+def match_path(pattern, path):
+    if '*' in pattern:
+        return fnmatch.fnmatchcase(path, pattern)
+    if len(pattern) > 1 and pattern.endswith('/'):
+        return path.startswith(pattern)
+    return path == pattern
+
+
+def metrics_routes(routes):
+    """由路由表生成 /metrics 的路由名：每个不含通配符的路径一个"""
+    seen = []
+    for _, pattern, _ in routes:
+        if '*' not in pattern and pattern not in seen:
+            seen.append(pattern)
+    return tuple((pattern, pattern) for pattern in seen)
+
+
+class RouterMixin:
+    """放在 BaseHTTPRequestHandler 子类的基类列表中 BaseHTTPRequestHandler 之前"""
+
+    ROUTES = ()
+
+    def request_path(self):
+        return urllib.parse.urlsplit(self.path).path
+
+    def find_route(self, method):
+        """返回 (处理方法, 路径匹配的其他方法)，没有匹配的处理方法时为 None"""
+        path = self.request_path()
+        allowed = []
+        for route_method, pattern, target in self.ROUTES:
+            if not match_path(pattern, path):
+                continue
+            if route_method == method:
+                return target, allowed
+            if route_method not in allowed:
+                allowed.append(route_method)
+        return None, allowed
+
+    def dispatch(self):
+        target, allowed = self.find_route(self.command)
+        if isinstance(target, str):
+            getattr(self, target)()
+        elif target is not None:
+            target(self)
+        elif allowed:
+            self.send_response(405)
+            self.send_header('Allow', ', '.join(allowed + ['OPTIONS']))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self.send_error(404)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = dispatch
+
+    def do_OPTIONS(self):
+        """处理跨域预检请求"""
+        _, allowed = self.find_route('OPTIONS')
+        if not allowed:
+            allowed = []
+            for method, _, _ in self.ROUTES:
+                if method not in allowed:
+                    allowed.append(method)
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', ', '.join(allowed + ['OPTIONS']))
+        self.send_header('Access-Control-Allow-Headers', CORS_ALLOW_HEADERS)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+# 两个服务器共用的路由
+
+def send_course_catalog(handler):
+    """课件目录，内容未变化时返回 304"""
+    send_catalog(handler, get_course_catalog(os.getcwd(), cached_file_metadata))
+
+
+def send_course_search(handler):
+    """课件全文搜索"""
+    send_search_results(handler, get_course_catalog(os.getcwd(), cached_file_metadata),
+                        urllib.parse.urlsplit(handler.path).query)
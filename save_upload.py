@@ -2,34 +2,65 @@
 # -*- coding: utf-8 -*-
 """
 简单的文件保存脚本
+
+    python save_upload.py                 列出已上传的文件
+    python save_upload.py import <目录>    把目录（包括子目录）中的课件导入uploads目录
 """
 
 import os
+import sys
 import json
 import time
+import uuid
 import hashlib
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_upload import ACCEPTED_EXTENSIONS
+from blob_store import get_blob_store
+from html_metadata import HtmlMetadataExtractor, extract_metadata
+from metadata_cache import cached_file_metadata, get_metadata_cache
+from upload_index import MAX_LIMIT, get_upload_index
+
+# 导入时写入的临时文件前缀，中断后再次导入时清理
+IMPORT_TEMP_PREFIX = 'import-'
+# 每导入这么多个文件提交一次索引
+IMPORT_COMMIT_EVERY = 200
+IMPORT_CHUNK_SIZE = 256 * 1024
+# 进度刷新间隔（秒）
+PROGRESS_INTERVAL = 0.2
+
+def get_uploads_dir():
+    uploads_dir = os.path.join(os.getcwd(), "uploads")
+    if not os.path.exists(uploads_dir):
+        os.makedirs(uploads_dir)
+        print(f"创建上传目录: {uploads_dir}")
+    return uploads_dir
+
+def make_unique_filename(filename):
+    """生成唯一文件名避免冲突"""
+    timestamp = str(int(time.time()))
+    random_suffix = uuid.uuid4().hex[:6]
+    return f"{timestamp}_{random_suffix}_{filename}"
 
 def save_file(filename, content):
     """保存文件到uploads目录"""
     try:
         # 创建uploads目录
-        uploads_dir = os.path.join(os.getcwd(), "uploads")
-        if not os.path.exists(uploads_dir):
-            os.makedirs(uploads_dir)
-            print(f"创建上传目录: {uploads_dir}")
+        uploads_dir = get_uploads_dir()
         
         # 生成唯一文件名避免冲突
-        timestamp = str(int(time.time()))
-        random_suffix = hashlib.md5(filename.encode()).hexdigest()[:6]
-        unique_filename = f"{timestamp}_{random_suffix}_{filename}"
+        unique_filename = make_unique_filename(filename)
         
         # 完整的文件路径
         file_path = os.path.join(uploads_dir, unique_filename)
         
-        # 保存文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # 保存文件，相同内容只保存一份
+        _, digest, size = get_blob_store(uploads_dir).save_bytes(unique_filename,
+                                                                 content.encode('utf-8'))
+        get_upload_index(uploads_dir).record(unique_filename, size, digest=digest,
+                                             meta=extract_metadata(content, filename))
         
         print(f"✅ 文件已保存到: {file_path}")
         return unique_filename, file_path
@@ -46,25 +77,143 @@ def list_uploaded_files():
             print("uploads目录不存在")
             return []
         
+        # 从索引中读取，索引缺少的文件会先补充进去
+        index = get_upload_index(uploads_dir)
+        index.ensure_synced(cached_file_metadata)
+        
         files = []
-        for filename in os.listdir(uploads_dir):
-            if filename.endswith(('.html', '.htm')):
-                file_path = os.path.join(uploads_dir, filename)
-                stat = os.stat(file_path)
-                
+        cursor = None
+        while True:
+            rows, cursor = index.query(sort='name', order='asc', limit=MAX_LIMIT, cursor=cursor)
+            for row in rows:
                 files.append({
-                    'name': filename,
-                    'path': file_path,
-                    'size': stat.st_size,
-                    'modified': time.ctime(stat.st_mtime)
+                    'name': row['name'],
+                    'path': os.path.join(uploads_dir, row['name']),
+                    'size': row['size'],
+                    'modified': time.ctime(row['modified'])
                 })
+            if cursor is None:
+                break
         
         return files
     except Exception as e:
         print(f"列出文件时出错: {e}")
         return []
 
-if __name__ == '__main__':
+def iter_courseware(source_dir):
+    """遍历目录树中的课件文件，跳过隐藏目录"""
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.lower().endswith(ACCEPTED_EXTENSIONS) and not name.startswith('.'):
+                yield os.path.join(root, name)
+
+def copy_for_import(source_path, tmp_dir):
+    """
+    在子进程中运行：把文件复制到存储的临时目录，读取一遍的同时计算摘要并提取课件信息
+    返回 (源文件, 临时文件, 摘要, 字节数, 课件信息, 错误)
+    """
+    temp_path = os.path.join(tmp_dir, IMPORT_TEMP_PREFIX + uuid.uuid4().hex)
+    hasher = hashlib.sha256()
+    extractor = HtmlMetadataExtractor(os.path.basename(source_path))
+    size = 0
+    try:
+        with open(source_path, 'rb') as src, open(temp_path, 'wb') as dst:
+            for data in iter(lambda: src.read(IMPORT_CHUNK_SIZE), b''):
+                hasher.update(data)
+                extractor.feed(data)
+                dst.write(data)
+                size += len(data)
+    except OSError as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return source_path, None, None, 0, None, str(e)
+    return source_path, temp_path, hasher.hexdigest(), size, extractor.close(), None
+
+def import_directory(source_dir, workers=None):
+    """
+    把目录树中的课件导入uploads目录
+    内容已经存在的文件会跳过，所以重复导入或中断后重新导入都是安全的
+    返回统计信息
+    """
+    uploads_dir = get_uploads_dir()
+    store = get_blob_store(uploads_dir)
+    index = get_upload_index(uploads_dir)
+    index.ensure_synced(cached_file_metadata)
+    cache = get_metadata_cache(uploads_dir)
+    
+    # 清理上次中断留下的临时文件
+    for name in os.listdir(store.tmp_dir):
+        if name.startswith(IMPORT_TEMP_PREFIX):
+            os.remove(os.path.join(store.tmp_dir, name))
+    
+    known = store.referenced_digests() | index.digests()
+    sources = list(iter_courseware(source_dir))
+    stats = {'found': len(sources), 'imported': 0, 'skipped': 0, 'failed': 0, 'bytes': 0}
+    pending = []
+    
+    def commit():
+        # 文件名已经登记到 refs.jsonl，这里只是批量更新索引和信息缓存
+        if not pending:
+            return
+        cache.put_many([(path, meta, digest) for _, path, digest, _, meta in pending])
+        index.record_many([{'name': name, 'size': size, 'digest': digest, 'meta': meta}
+                           for name, _, digest, size, meta in pending])
+        pending.clear()
+    
+    started = last_progress = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        chunksize = max(1, min(16, len(sources) // (workers * 4) or 1))
+        results = executor.map(copy_for_import, sources,
+                               [store.tmp_dir] * len(sources), chunksize=chunksize)
+        for done, (source, temp_path, digest, size, meta, error) in enumerate(results, 1):
+            if error:
+                stats['failed'] += 1
+                print(f"\n❌ {source}: {error}")
+            elif digest in known:
+                os.remove(temp_path)
+                stats['skipped'] += 1
+                stats['bytes'] += size
+            else:
+                store.adopt_temp(temp_path, digest)
+                name = make_unique_filename(os.path.basename(source))
+                path = store.link(digest, name)
+                known.add(digest)
+                pending.append((name, path, digest, size, meta))
+                stats['imported'] += 1
+                stats['bytes'] += size
+                if len(pending) >= IMPORT_COMMIT_EVERY:
+                    commit()
+            now = time.perf_counter()
+            if now - last_progress >= PROGRESS_INTERVAL or done == len(sources):
+                last_progress = now
+                print(f"\r⏳ {done}/{len(sources)}  导入 {stats['imported']}  "
+                      f"跳过 {stats['skipped']}  {done / (now - started):.1f} 个/秒",
+                      end='', flush=True)
+    except KeyboardInterrupt:
+        executor.shutdown(wait=True, cancel_futures=True)
+        print("\n⏹️  导入已中断，再次运行同一命令会从中断处继续")
+        stats['interrupted'] = True
+    finally:
+        executor.shutdown(wait=True)
+        commit()
+        # 被取消的任务可能已经写了临时文件
+        for name in os.listdir(store.tmp_dir):
+            if name.startswith(IMPORT_TEMP_PREFIX):
+                os.remove(os.path.join(store.tmp_dir, name))
+    print()
+    
+    elapsed = time.perf_counter() - started
+    stats['elapsed'] = elapsed
+    # 中断时只有一部分文件处理过，按实际处理的数量计算速度
+    processed = stats['imported'] + stats['skipped'] + stats['failed']
+    stats['files_per_second'] = processed / elapsed if elapsed else 0
+    stats['mb_per_second'] = stats['bytes'] / (1024 * 1024) / elapsed if elapsed else 0
+    return stats
+
+def show_uploaded_files():
     print("📁 文件保存工具")
     print("=" * 40)
     
@@ -78,4 +227,32 @@ if __name__ == '__main__':
     print("\n💡 使用说明:")
     print("1. 在网页端使用文件上传功能")
     print("2. 文件将被自动保存到uploads目录")
-    print("3. 文件名会添加时间戳和哈希后缀避免冲突")
\ No newline at end of file
+    print("3. 文件名会添加时间戳和哈希后缀避免冲突")
+    print("4. 整个目录可以用 python save_upload.py import <目录> 导入")
+
+def main():
+    parser = argparse.ArgumentParser(description='文件保存工具')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('list', help='列出已上传的文件（默认）')
+    import_parser = subparsers.add_parser('import', help='导入目录（包括子目录）中的课件')
+    import_parser.add_argument('directory', help='课件目录')
+    import_parser.add_argument('--workers', type=int, default=None,
+                               help=f'并行处理的进程数 (默认: CPU核数 {os.cpu_count()})')
+    args = parser.parse_args()
+    
+    if args.command != 'import':
+        show_uploaded_files()
+        return
+    
+    if not os.path.isdir(args.directory):
+        print(f"❌ 目录不存在: {args.directory}")
+        sys.exit(1)
+    print(f"📥 正在导入: {os.path.abspath(args.directory)}")
+    stats = import_directory(args.directory, workers=args.workers)
+    print(f"✅ 找到 {stats['found']} 个课件: 导入 {stats['imported']} 个, "
+          f"跳过已存在 {stats['skipped']} 个, 失败 {stats['failed']} 个")
+    print(f"⏱️  用时 {stats['elapsed']:.2f} 秒, {stats['files_per_second']:.1f} 个/秒, "
+          f"{stats['mb_per_second']:.2f} MB/秒")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
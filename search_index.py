@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课件全文搜索 /api/search?q=
+对每个课件的标题、作者、分类和页面可见文字建立倒排索引。
+中文按单字和相邻两字（bigram）切分，英文和数字按整词切分，使用 BM25 排序。
+课件目录发生变化时只更新变化的课件。
+"""
+
+import re
+import json
+import math
+import time
+import heapq
+import threading
+import urllib.parse
+from html.parser import HTMLParser
+
+# 各字段的权重，标题命中比正文命中更重要
+FIELD_WEIGHTS = {'title': 3.0, 'author': 2.0, 'category': 1.0, 'text': 1.0}
+# 每个课件最多索引的正文字符数
+MAX_TEXT_CHARS = 200000
+DEFAULT_TOP_K = 20
+MAX_TOP_K = 100
+# BM25 参数
+K1 = 1.2
+B = 0.75
+
+CJK_RE = re.compile(r'[\u3400-\u9fff\uf900-\ufaff]+')
+WORD_RE = re.compile(r'[0-9a-z]+')
+
+
+class VisibleTextParser(HTMLParser):
+    """提取页面中用户可见的文字，跳过 <script> 和 <style>"""
+
+    SKIP_TAGS = ('script', 'style', 'noscript', 'template')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.length = 0
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if self._skip or self.length >= MAX_TEXT_CHARS:
+            return
+        data = data.strip()
+        if data:
+            self.parts.append(data)
+            self.length += len(data)
+
+
+def extract_visible_text(file_path):
+    """读取HTML文件并返回可见文字"""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    except OSError:
+        return ''
+    parser = VisibleTextParser()
+    try:
+        parser.feed(content)
+        parser.close()
+    except Exception:
+        pass
+    return ' '.join(parser.parts)[:MAX_TEXT_CHARS]
+
+
+def tokenize(text):
+    """切分文字：中文单字 + bigram，英文和数字整词"""
+    text = text.lower()
+    tokens = []
+    for run in CJK_RE.findall(text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    tokens.extend(WORD_RE.findall(text))
+    return tokens
+
+
+def tokenize_query(query):
+    """
+    查询切分：中文只用 bigram（单字查询时用单字），避免单字匹配把结果冲淡
+    """
+    query = query.lower()
+    tokens = []
+    for run in CJK_RE.findall(query):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    tokens.extend(WORD_RE.findall(query))
+    # 去重但保留顺序
+    return list(dict.fromkeys(tokens))
+
+
+class SearchIndex:
+    """内存倒排索引，所有方法都是线程安全的"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 词 -> {课件键: 加权词频}
+        self._postings = {}
+        # 课件键 -> (课件记录, 加权长度, 词列表)
+        self._docs = {}
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def update(self, key, file_path, entry):
+        """新增或更新一个课件"""
+        fields = {
+            'title': entry.get('title') or '',
+            'author': entry.get('author') or '',
+            'category': entry.get('category') or '',
+            'text': extract_visible_text(file_path),
+        }
+        weights = {}
+        length = 0.0
+        for field, value in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(value):
+                weights[token] = weights.get(token, 0.0) + weight
+                length += weight
+        with self._lock:
+            self._remove_locked(key)
+            for token, tf in weights.items():
+                self._postings.setdefault(token, {})[key] = tf
+            self._docs[key] = (dict(entry), length, tuple(weights))
+            self._total_length += length
+
+    def remove(self, key):
+        with self._lock:
+            self._remove_locked(key)
+
+    def _remove_locked(self, key):
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        _, length, tokens = doc
+        self._total_length -= length
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        """返回 (得分最高的 k 个课件, 命中的课件总数)"""
+        tokens = tokenize_query(query)
+        if not tokens:
+            return [], 0
+        with self._lock:
+            n = len(self._docs)
+            if n == 0:
+                return [], 0
+            avgdl = self._total_length / n or 1.0
+            scores = {}
+            for token in tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = max(0.0, _idf(n, df))
+                for key, tf in postings.items():
+                    dl = self._docs[key][1]
+                    score = idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+                    scores[key] = scores.get(key, 0.0) + score
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            results = [dict(self._docs[key][0], score=round(score, 4)) for key, score in top]
+        return results, len(scores)
+
+
+def _idf(n, df):
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(catalog):
+    """每个课件目录共用一个搜索索引，课件目录变化时自动更新"""
+    with _indexes_lock:
+        index = _indexes.get(id(catalog))
+        if index is None:
+            index = SearchIndex()
+            catalog.add_listener(index)
+            _indexes[id(catalog)] = index
+        return index
+
+
+def send_search_results(handler, catalog, query_string):
+    """处理 /api/search?q=关键词&k=条数"""
+    params = urllib.parse.parse_qs(query_string)
+    query = params.get('q', [''])[0]
+    try:
+        k = max(1, min(int(params.get('k', [DEFAULT_TOP_K])[0]), MAX_TOP_K))
+    except ValueError:
+        k = DEFAULT_TOP_K
+    started = time.perf_counter()
+    index = get_search_index(catalog)
+    # 先同步课件目录，新上传的课件会在这里增量加入索引
+    catalog.get()
+    results, total = index.search(query, k)
+    body = json.dumps({
+        'query': query,
+        'total': total,
+        'took_ms': round((time.perf_counter() - started) * 1000, 2),
+        'results': results
+    }, ensure_ascii=False).encode('utf-8')
+    handler.send_response(200)
+    handler.send_header('Content-type', 'application/json; charset=utf-8')
+    handler.send_header('Content-Length', str(len(body)))
+    handler.send_header('Cache-Control', 'no-cache')
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.end_headers()
+    handler.wfile.write(body)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课件服务器
+一个进程同时提供主页、课件、上传、下载和 API，代替分别运行 file_server.py 和 upload_server.py：
+- 主页和上传接口同源，上传不再需要跨域预检
+- 课件信息缓存、热点文件缓存、压缩版本缓存、线程池和准入控制只有一份
+
+    python server.py [--port 8080]
+"""
+
+import os
+import argparse
+import webbrowser
+
+from access_log import add_logging_arguments, configure_logging_from_args
+from admission import add_admission_arguments, configure_admission_from_args
+from course_catalog import get_course_catalog
+from file_server import UploadHandler as FileHandler
+from hot_file_cache import configure_hot_file_cache
+from keep_alive import add_keep_alive_arguments, configure_keep_alive_from_args
+from metadata_cache import cached_file_metadata, warm_metadata_cache
+from routing import metrics_routes, send_course_catalog, send_course_search
+from search_index import get_search_index
+from server_metrics import send_metrics
+from server_runtime import add_server_arguments, create_server
+from upload_server import UploadHandler as UploadServerHandler, get_index
+
+DEFAULT_PORT = 8080
+MULTIPART_CONTENT_TYPE = 'multipart/form-data'
+
+
+class CoursewareHandler(UploadServerHandler, FileHandler):
+    """上传和下载两部分的处理方法都来自原来的两个服务器，这里只合并路由表"""
+
+    ROUTES = (
+        ('GET', '/api/courses', send_course_catalog),
+        ('GET', '/api/search', send_course_search),
+        ('GET', '/metrics', send_metrics),
+        ('GET', '/files', 'send_file_list'),
+        # 上传页面（原 upload_server.py 的主页）
+        ('GET', '/upload', 'send_upload_page'),
+        ('POST', '/upload', 'handle_upload'),
+        ('POST', '/upload/', 'handle_raw_upload'),
+        ('PUT', '/upload/', 'handle_raw_upload'),
+        ('POST', '/batch', 'handle_batch_upload'),
+        ('POST', '/sessions', 'handle_session_create'),
+        ('POST', '/sessions/*/complete', 'handle_session_complete'),
+        ('GET', '/sessions/', 'handle_session_status'),
+        ('HEAD', '/sessions/', 'handle_session_status'),
+        ('PATCH', '/sessions/', 'handle_session_append'),
+        ('HEAD', '/blobs/', 'send_blob_status'),
+        ('POST', '/blobs/', 'handle_blob_link'),
+        ('GET', '/download/', 'send_download'),
+        ('HEAD', '/download/', 'send_download'),
+        # 其余请求都是静态文件，/ 为 index.html
+        ('GET', '*', 'send_static'),
+        ('HEAD', '*', 'send_static'),
+    )
+    METRICS_ROUTES = (('/', '/'),) + metrics_routes(ROUTES)
+    METRICS_DEFAULT_ROUTE = 'static'
+    ADMISSION_BATCH_ROUTES = ('/batch',)
+
+    def is_multipart(self):
+        return self.headers.get('Content-Type', '').startswith(MULTIPART_CONTENT_TYPE)
+
+    def handle_upload(self):
+        """POST /upload  multipart 表单（原 file_server.py）或 JSON（原 upload_server.py）"""
+        if self.is_multipart():
+            self.handle_multipart_upload()
+        else:
+            self.handle_json_upload()
+
+    def is_batch_request(self):
+        # multipart 的 /upload 一次可以上传多个文件；JSON 上传整体读入内存，使用单个文件的上限
+        return super().is_batch_request() or (self.path.split('?', 1)[0] == '/upload'
+                                              and self.is_multipart())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='课件服务器：主页、课件、上传和下载')
+    add_server_arguments(parser, default_port=DEFAULT_PORT)
+    parser.add_argument('--hot-cache-mb', type=int, default=64,
+                        help='热点文件内存缓存上限（MB），0 表示不缓存 (默认: 64)')
+    parser.add_argument('--no-browser', action='store_true', help='启动后不自动打开浏览器')
+    add_admission_arguments(parser)
+    add_keep_alive_arguments(parser)
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    configure_logging_from_args(args)
+    admission = configure_admission_from_args(args)
+    configure_keep_alive_from_args(args)
+    port = args.port
+
+    # 启动时预热课件信息缓存，把已有文件补充到索引中，并建立搜索索引
+    warm_metadata_cache(os.getcwd())
+    get_index()
+    get_search_index(get_course_catalog(os.getcwd(), cached_file_metadata))
+    configure_hot_file_cache(args.hot_cache_mb * 1024 * 1024)
+    server = create_server((args.host, port), CoursewareHandler, mode=args.mode,
+                           workers=args.workers, max_queue=args.max_queue)
+
+    print("=" * 50)
+    print("📚 课件服务器已启动")
+    print("=" * 50)
+    print(f"🌐 本地访问: http://localhost:{port}")
+    print(f"🌐 网络访问: http://[您的IP地址]:{port}")
+    print(f"📤 上传页面: http://localhost:{port}/upload")
+    print(f"📁 上传目录: {os.path.join(os.getcwd(), 'uploads')}")
+    print(f"⚙️  并发模式: {args.mode} | 工作线程: {args.workers} | 排队上限: {args.max_queue}")
+    print(f"🗄️  热点文件缓存: {args.hot_cache_mb} MB")
+    print(f"📦 上传上限: {args.max_body_mb} MB（批量 {args.max_batch_mb} MB） | "
+          f"每个设备同时上传: {admission.uploads_per_client or '不限'} | "
+          f"同时接收: {args.max_inflight_mb or '不限'} MB")
+    print(f"🔗 持久连接: 空闲 {args.keep_alive_timeout} 秒 | 每个连接最多 {args.keep_alive_max or '不限'} 个请求")
+    print("⏹️  按 Ctrl+C 停止服务器")
+    print("=" * 50)
+
+    try:
+        if not args.no_browser:
+            webbrowser.open(f'http://localhost:{port}')
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 服务器已停止")
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
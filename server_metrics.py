@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务器运行指标 /metrics（Prometheus 文本格式）
+- 每个路由的请求数（按方法和状态码）、耗时直方图、接收和发送的字节数
+- 上传文件大小分布
+- 正在处理的请求数
+- 热点文件缓存、压缩版本缓存、课件信息缓存的命中率
+- 准入控制拒绝的上传请求数和正在接收的字节数
+
+每个工作线程把数据记录在自己的分片中，处理请求时不需要加锁；
+只有线程第一次记录和 /metrics 汇总时才会用到锁。
+"""
+
+import time
+import bisect
+import threading
+
+from access_log import get_log_writer, log_access, log_event
+from admission import get_admission_controller
+from compressed_variants import get_variant_cache
+from hot_file_cache import get_hot_file_cache
+from metadata_cache import get_metadata_cache
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# 请求耗时的分桶（秒）
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+# 上传文件大小的分桶（字节）
+UPLOAD_SIZE_BUCKETS = (1024, 4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024,
+                       1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024, 50 * 1024 * 1024)
+KNOWN_METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels, extra=None):
+    pairs = list(labels)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def format_value(value):
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+class MetricsRegistry:
+    """
+    按线程分片的指标
+    分片中键为 (指标名, 标签)，计数器和仪表的值是数字，
+    直方图的值是 [各分桶的计数..., +Inf 分桶的计数, 总和]
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        # 指标名 -> (类型, 说明, 分桶)，按注册顺序输出
+        self._metrics = {}
+        # 汇总时调用的函数，返回 [(指标名, 类型, 说明, [(标签, 值)])]
+        self._collectors = []
+
+    def counter(self, name, help_text):
+        self._metrics[name] = ('counter', help_text, None)
+
+    def gauge(self, name, help_text):
+        """各线程的值相加得到的仪表，如正在处理的请求数"""
+        self._metrics[name] = ('gauge', help_text, None)
+
+    def histogram(self, name, help_text, buckets):
+        self._metrics[name] = ('histogram', help_text, tuple(buckets))
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def shard(self):
+        """当前线程的分片"""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name, labels=(), value=1):
+        shard = self.shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        buckets = self._metrics[name][2]
+        shard = self.shard()
+        key = (name, labels)
+        counts = shard.get(key)
+        if counts is None:
+            counts = shard[key] = [0] * (len(buckets) + 2)
+        counts[bisect.bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    def _merge(self):
+        with self._lock:
+            shards = list(self._shards)
+        merged = {}
+        for shard in shards:
+            # 复制字典是原子操作，其他线程可以继续写入
+            for key, value in list(shard.items()):
+                if isinstance(value, list):
+                    total = merged.get(key)
+                    if total is None:
+                        merged[key] = list(value)
+                    else:
+                        for i, v in enumerate(value):
+                            total[i] += v
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def render(self):
+        """Prometheus 文本格式"""
+        merged = self._merge()
+        by_name = {}
+        for (name, labels), value in merged.items():
+            by_name.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, (kind, help_text, buckets) in self._metrics.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in sorted(by_name.get(name, ()), key=lambda item: item[0]):
+                if kind != 'histogram':
+                    lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (float('inf'),), value):
+                    cumulative += count
+                    le = ('le', format_value(float(bound)))
+                    lines.append(f'{name}_bucket{format_labels(labels, le)} {cumulative}')
+                lines.append(f'{name}_sum{format_labels(labels)} {format_value(value[-1])}')
+                lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+METRICS.counter('http_requests_total', '处理的请求数')
+METRICS.histogram('http_request_duration_seconds', '请求处理耗时（秒）', LATENCY_BUCKETS)
+METRICS.counter('http_request_bytes_total', '接收的字节数（请求行、请求头和请求体）')
+METRICS.counter('http_response_bytes_total', '发送的字节数（包括 sendfile）')
+METRICS.gauge('http_requests_in_flight', '正在处理的请求数')
+METRICS.histogram('upload_size_bytes', '上传文件的大小（字节）', UPLOAD_SIZE_BUCKETS)
+
+_started = time.time()
+
+
+def collect_cache_metrics():
+    """各个缓存的命中情况"""
+    hot = get_hot_file_cache().stats()
+    variants = get_variant_cache()
+    metadata = get_metadata_cache()
+    # (缓存名, 命中, 未命中)
+    caches = (
+        ('hot_file', hot['hits'], hot['misses']),
+        ('compressed_variant', variants.hits, variants.builds),
+        ('metadata', metadata.hits, metadata.misses),
+    )
+    return [
+        ('cache_hits_total', 'counter', '缓存命中次数',
+         [((('cache', name),), hits) for name, hits, _ in caches]),
+        ('cache_misses_total', 'counter', '缓存未命中次数（压缩版本缓存为重新压缩的次数）',
+         [((('cache', name),), misses) for name, _, misses in caches]),
+        ('cache_hit_ratio', 'gauge', '缓存命中率',
+         [((('cache', name),), round(hits / (hits + misses), 4) if hits + misses else 0.0)
+          for name, hits, misses in caches]),
+        ('hot_file_cache_bytes', 'gauge', '热点文件缓存占用的内存（字节）', [((), hot['bytes'])]),
+        ('hot_file_cache_entries', 'gauge', '热点文件缓存中的文件数', [((), hot['entries'])]),
+        ('hot_file_cache_evictions_total', 'counter', '热点文件缓存淘汰的文件数',
+         [((), hot['evictions'])]),
+        ('process_start_time_seconds', 'gauge', '服务器启动时间（Unix 时间戳）', [((), _started)]),
+    ]
+
+
+def collect_log_metrics():
+    log = get_log_writer().stats()
+    return [
+        ('log_queue_depth', 'gauge', '等待写入的日志记录数', [((), log['queued'])]),
+        ('log_records_written_total', 'counter', '已写入的日志记录数', [((), log['written'])]),
+        ('log_records_dropped_total', 'counter', '队列已满或写入失败而丢弃的日志记录数',
+         [((), log['dropped'])]),
+        ('log_records_sampled_out_total', 'counter', '按采样率没有记录的成功请求数',
+         [((), log['sampled_out'])]),
+    ]
+
+
+def collect_admission_metrics():
+    admission = get_admission_controller().stats()
+    return [
+        ('admission_rejected_total', 'counter', '准入控制拒绝的上传请求数',
+         [((('reason', reason),), count) for reason, count in admission['rejected'].items()]),
+        ('admission_active_uploads', 'gauge', '正在接收的上传请求数',
+         [((), admission['active_uploads'])]),
+        ('admission_inflight_bytes', 'gauge', '正在接收的请求体预留的字节数',
+         [((), admission['inflight_bytes'])]),
+    ]
+
+
+METRICS.add_collector(collect_cache_metrics)
+METRICS.add_collector(collect_log_metrics)
+METRICS.add_collector(collect_admission_metrics)
+
+
+def observe_upload(size):
+    """记录一个上传文件的大小"""
+    METRICS.observe('upload_size_bytes', size)
+
+
+class CountingReader:
+    """统计读取字节数的 rfile 包装"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.count = 0
+
+    def read(self, *args):
+        data = self._raw.read(*args)
+        self.count += len(data)
+        return data
+
+    def read1(self, *args):
+        data = self._raw.read1(*args)
+        self.count += len(data)
+        return data
+
+    def readline(self, *args):
+        data = self._raw.readline(*args)
+        self.count += len(data)
+        return data
+
+    def readinto(self, buffer):
+        n = self._raw.readinto(buffer)
+        self.count += n or 0
+        return n
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class CountingWriter:
+    """统计写出字节数的 wfile 包装"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.count = 0
+
+    def write(self, data):
+        result = self._raw.write(data)
+        self.count += len(data)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+def add_bytes_sent(handler, count):
+    """不经过 wfile 发送的字节（sendfile）"""
+    wfile = handler.wfile
+    if isinstance(wfile, CountingWriter):
+        wfile.count += count
+
+
+class MetricsHandlerMixin:
+    """
+    为请求处理器记录指标和访问日志，放在 BaseHTTPRequestHandler 子类的基类列表最前面
+    默认的 log_message 在请求线程中同步写标准错误，这里改为交给后台日志线程
+    METRICS_ROUTES 为 (路径, 路由名)：以 / 结尾的路径（根路径除外）按前缀匹配，其余按完整路径匹配，
+    路由名的数量是固定的，不会因为文件名不同而产生大量的标签
+    """
+
+    METRICS_ROUTES = ()
+    METRICS_DEFAULT_ROUTE = 'other'
+
+    def setup(self):
+        super().setup()
+        self.rfile = CountingReader(self.rfile)
+        self.wfile = CountingWriter(self.wfile)
+
+    def metrics_route(self):
+        path = self.path.split('?', 1)[0]
+        for prefix, route in self.METRICS_ROUTES:
+            if path == prefix or (len(prefix) > 1 and prefix.endswith('/')
+                                  and path.startswith(prefix)):
+                return route
+        return self.METRICS_DEFAULT_ROUTE
+
+    def handle_one_request(self):
+        self._metrics_started = None
+        self._metrics_status = None
+        bytes_in = self.rfile.count
+        bytes_out = self.wfile.count
+        try:
+            super().handle_one_request()
+        finally:
+            if self._metrics_started is not None:
+                self._record_metrics(self.rfile.count - bytes_in, self.wfile.count - bytes_out)
+
+    def parse_request(self):
+        # 读到请求行后开始计时，不包括 keep-alive 连接的空闲时间
+        self._metrics_started = time.perf_counter()
+        METRICS.inc('http_requests_in_flight')
+        return super().parse_request()
+
+    def send_response_only(self, code, message=None):
+        self._metrics_status = code
+        super().send_response_only(code, message)
+
+    def log_request(self, code='-', size='-'):
+        # 请求结束时统一记录访问日志
+        pass
+
+    def log_message(self, format, *args):
+        log_event('http_message', client=self.client_address[0], message=format % args)
+
+    def _record_metrics(self, bytes_in, bytes_out):
+        elapsed = time.perf_counter() - self._metrics_started
+        shard = METRICS.shard()
+        shard[('http_requests_in_flight', ())] -= 1
+        path = getattr(self, 'path', None)
+        route = (('route', self.metrics_route() if path else 'invalid'),)
+        method = self.command if self.command in KNOWN_METHODS else 'OTHER'
+        status = str(self._metrics_status) if self._metrics_status else 'none'
+        METRICS.inc('http_requests_total', route + (('method', method), ('code', status)))
+        METRICS.observe('http_request_duration_seconds', elapsed, route)
+        METRICS.inc('http_request_bytes_total', route, bytes_in)
+        METRICS.inc('http_response_bytes_total', route, bytes_out)
+        log_access({
+            'client': self.client_address[0],
+            'method': self.command,
+            'path': path,
+            'status': self._metrics_status or 0,
+            'duration_ms': round(elapsed * 1000, 3),
+            'bytes_in': bytes_in,
+            'bytes_out': bytes_out,
+            'user_agent': self.headers.get('User-Agent') if getattr(self, 'headers', None) else None,
+        })
+
+
+def send_metrics(handler):
+    body = METRICS.render().encode('utf-8')
+    handler.send_response(200)
+    handler.send_header('Content-Type', CONTENT_TYPE)
+    handler.send_header('Content-Length', str(len(body)))
+    handler.send_header('Cache-Control', 'no-store')
+    handler.end_headers()
+    if handler.command != 'HEAD':
+        handler.wfile.write(body)
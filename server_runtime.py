@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务器并发运行模式
+为 upload_server.py 和 file_server.py 提供可选的并发处理方式：
+- threadpool: 有界线程池，多个请求并行处理
+- asyncio: 基于 asyncio 的连接接收循环，请求交给有限数量的工作线程处理
+两种模式都可以配置工作线程数和排队连接上限。
+持久连接（keep_alive.py）通过 connections_waiting() 知道是否有连接在等待工作线程。
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer
+
+# 默认工作线程数：一个班级 50 台左右的设备同时访问
+DEFAULT_WORKERS = 32
+# 默认排队连接上限：超过后直接返回 503
+DEFAULT_MAX_QUEUE = 128
+SERVER_MODES = ('threadpool', 'asyncio', 'single')
+
+BUSY_RESPONSE = (
+    b'HTTP/1.0 503 Service Unavailable\r\n'
+    b'Content-Type: text/plain; charset=utf-8\r\n'
+    b'Retry-After: 1\r\n'
+    b'Connection: close\r\n'
+    b'Content-Length: 21\r\n'
+    b'\r\n'
+    b'Server is busy, retry'
+)
+
+
+def reject_connection(sock):
+    """排队已满时告诉客户端稍后重试，然后关闭连接"""
+    try:
+        sock.sendall(BUSY_RESPONSE)
+    except OSError:
+        pass
+    try:
+        sock.close()
+    except OSError:
+        pass
+
+
+class ConnectionCounter:
+    """已接收的连接数和正在由工作线程处理的连接数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.accepted = 0
+        self.running = 0
+
+    def accept(self):
+        with self._lock:
+            self.accepted += 1
+
+    def start(self):
+        with self._lock:
+            self.running += 1
+
+    def finish(self, started=True):
+        with self._lock:
+            self.accepted -= 1
+            if started:
+                self.running -= 1
+
+    def waiting(self):
+        """已接收但还没有工作线程处理的连接数"""
+        return self.accepted - self.running
+
+
+class BoundedThreadPoolHTTPServer(HTTPServer):
+    """使用有界线程池并行处理请求的HTTP服务器"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, workers=DEFAULT_WORKERS,
+                 max_queue=DEFAULT_MAX_QUEUE):
+        # listen() 的 backlog 同样使用排队上限
+        self.request_queue_size = max_queue
+        self.workers = workers
+        self.max_queue = max_queue
+        # 绑定端口失败时 TCPServer.__init__ 会调用 server_close()，线程池要在此之前创建
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='http-worker')
+        # 正在处理或排队中的连接数
+        self._pending = threading.BoundedSemaphore(workers + max_queue)
+        self._connections = ConnectionCounter()
+        super().__init__(server_address, handler_class)
+
+    def connections_waiting(self):
+        return self._connections.waiting()
+
+    def process_request(self, request, client_address):
+        """把连接交给线程池；排队已满时立即拒绝"""
+        if not self._pending.acquire(blocking=False):
+            self.shutdown_request_busy(request)
+            return
+        self._connections.accept()
+        try:
+            self.executor.submit(self._process_in_worker, request, client_address)
+        except RuntimeError:
+            # 线程池已关闭
+            self._connections.finish(started=False)
+            self._pending.release()
+            self.shutdown_request_busy(request)
+
+    def _process_in_worker(self, request, client_address):
+        self._connections.start()
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._connections.finish()
+            self._pending.release()
+
+    def shutdown_request_busy(self, request):
+        reject_connection(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+class AsyncioHTTPServer(HTTPServer):
+    """
+    基于 asyncio 的HTTP服务器
+    由事件循环负责接收连接，再把每个连接交给有限的工作线程执行
+    BaseHTTPRequestHandler，因此现有的请求处理器无需修改。
+    """
+
+    def __init__(self, server_address, handler_class, workers=DEFAULT_WORKERS,
+                 max_queue=DEFAULT_MAX_QUEUE):
+        self.request_queue_size = max_queue
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='asyncio-worker')
+        self._loop = None
+        self._stop_event = None
+        self._stopped = threading.Event()
+        self._connections = ConnectionCounter()
+        super().__init__(server_address, handler_class)
+
+    def connections_waiting(self):
+        return self._connections.waiting()
+
+    def serve_forever(self, poll_interval=0.5):
+        """运行事件循环直到 shutdown() 被调用"""
+        self._stopped.clear()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._stopped.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop.set_default_executor(self.executor)
+        self._stop_event = asyncio.Event()
+        self.socket.setblocking(False)
+        pending = asyncio.Semaphore(self.workers + self.max_queue)
+        tasks = set()
+
+        accept_task = None
+        stop_task = asyncio.ensure_future(self._stop_event.wait())
+        try:
+            while True:
+                accept_task = asyncio.ensure_future(self._loop.sock_accept(self.socket))
+                done, _ = await asyncio.wait({accept_task, stop_task},
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if stop_task in done:
+                    accept_task.cancel()
+                    break
+                try:
+                    sock, client_address = accept_task.result()
+                except OSError:
+                    continue
+                if pending.locked():
+                    reject_connection(sock)
+                    continue
+                await pending.acquire()
+                task = asyncio.ensure_future(self._handle(sock, client_address, pending))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            stop_task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle(self, sock, client_address, pending):
+        self._connections.accept()
+        started = []
+        try:
+            sock.setblocking(True)
+            await self._loop.run_in_executor(self.executor, self._process, sock,
+                                             client_address, started)
+        finally:
+            self._connections.finish(started=bool(started))
+            pending.release()
+
+    def _process(self, sock, client_address, started):
+        self._connections.start()
+        started.append(True)
+        try:
+            self.finish_request(sock, client_address)
+        except Exception:
+            self.handle_error(sock, client_address)
+        finally:
+            self.shutdown_request(sock)
+
+    def shutdown(self):
+        """从其他线程停止事件循环"""
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+            self._stopped.wait()
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+def create_server(server_address, handler_class, mode='threadpool',
+                  workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE):
+    """按照指定的并发模式创建HTTP服务器"""
+    if mode == 'threadpool':
+        return BoundedThreadPoolHTTPServer(server_address, handler_class,
+                                           workers=workers, max_queue=max_queue)
+    if mode == 'asyncio':
+        return AsyncioHTTPServer(server_address, handler_class,
+                                 workers=workers, max_queue=max_queue)
+    if mode == 'single':
+        return HTTPServer(server_address, handler_class)
+    raise ValueError(f"未知的并发模式: {mode}")
+
+
+def add_server_arguments(parser, default_port):
+    """为命令行解析器添加通用的服务器参数"""
+    parser.add_argument('--host', default='0.0.0.0', help='监听地址')
+    parser.add_argument('--port', type=int, default=default_port, help='监听端口')
+    parser.add_argument('--mode', choices=SERVER_MODES, default='threadpool',
+                        help='并发模式 (默认: threadpool)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'工作线程数 (默认: {DEFAULT_WORKERS})')
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help=f'排队连接上限 (默认: {DEFAULT_MAX_QUEUE})')
+    return parser
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态文件发送
+- 通过 socket.sendfile()（Linux 上是 os.sendfile）由内核直接把文件复制到网络连接
+- 带 Content-Length、强 ETag 和 Last-Modified，支持 If-None-Match / If-Modified-Since 返回 304
+- 支持单个和多个 Range 请求（206），超出范围时返回 416
+- 客户端支持时发送预压缩的 gzip/br 版本，见 compressed_variants.py
+- 小文件从内存缓存发送，见 hot_file_cache.py
+- 带内容哈希的构建结果发送 Cache-Control: immutable，见 asset_build.py
+- 以 . 开头的文件和目录（上传索引、内容存储、缓存等内部文件）不对外发送
+"""
+
+import os
+import uuid
+import contextlib
+import email.utils
+import urllib.parse
+
+from asset_build import IMMUTABLE_CACHE_CONTROL, get_asset_manifest
+from compressed_variants import candidate_encodings, get_variant_cache, is_compressible
+from course_catalog import etag_matches
+from hot_file_cache import get_hot_file_cache
+from server_metrics import add_bytes_sent
+
+# 多段 Range 请求最多允许的段数，超过时按完整文件返回
+MAX_RANGES = 16
+
+
+def make_etag(stat, encoding=None):
+    """由文件修改时间和大小生成 ETag，文件内容变化时一定会变化，每种压缩编码各不相同"""
+    if encoding:
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}-{encoding}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_http_date(value):
+    """解析 HTTP 日期，失败时返回 None"""
+    if not value:
+        return None
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed is None:
+        return None
+    return parsed.timestamp()
+
+
+def is_not_modified(headers, etag, mtime):
+    """判断是否可以返回 304"""
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match is not None:
+        # 有 If-None-Match 时忽略 If-Modified-Since
+        return etag_matches(if_none_match, etag)
+    since = parse_http_date(headers.get('If-Modified-Since'))
+    return since is not None and int(mtime) <= since
+
+
+def parse_range(header, size):
+    """
+    解析 Range 请求头
+    返回 None 表示忽略 Range（按完整文件返回），返回 [] 表示范围无法满足，
+    否则返回 [(起始, 结束)] 列表（包含结束位置）
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    ranges = []
+    for spec in header[len('bytes='):].split(','):
+        spec = spec.strip()
+        if not spec or '-' not in spec:
+            return None
+        start, end = spec.split('-', 1)
+        try:
+            if start == '':
+                # 最后 N 个字节
+                length = int(end)
+                if length <= 0:
+                    continue
+                ranges.append((max(0, size - length), size - 1))
+            else:
+                first = int(start)
+                last = int(end) if end else size - 1
+                if first >= size:
+                    continue
+                if first > last:
+                    return None
+                ranges.append((first, min(last, size - 1)))
+        except ValueError:
+            return None
+    if len(ranges) > MAX_RANGES:
+        return None
+    return ranges
+
+
+def if_range_allows(headers, etag, mtime):
+    """If-Range 与当前文件一致时才按 Range 返回部分内容"""
+    value = headers.get('If-Range')
+    if not value:
+        return True
+    value = value.strip()
+    if value.startswith('"') or value.startswith('W/'):
+        # If-Range 必须使用强比较
+        return value == etag
+    date = parse_http_date(value)
+    return date is not None and int(mtime) == int(date)
+
+
+def is_hidden_path(url_path):
+    """URL 路径中有以 . 开头的部分，例如 /uploads/.index.sqlite3、/uploads/.blobs/refs.jsonl"""
+    path = urllib.parse.unquote(urllib.parse.urlsplit(url_path).path)
+    return any(part.startswith('.') for part in path.replace('\\', '/').split('/'))
+
+
+def content_disposition(filename):
+    """下载文件名，非 ASCII 文件名使用 RFC 5987 编码"""
+    fallback = filename.encode('ascii', 'replace').decode('ascii').replace('?', '_').replace('"', '_')
+    quoted = urllib.parse.quote(filename, safe='')
+    return f'attachment; filename="{fallback}"; filename*=UTF-8\'\'{quoted}'
+
+
+def copy_range(handler, f, offset, count):
+    """把文件的一段发送给客户端，优先使用 sendfile"""
+    if count <= 0:
+        return
+    handler.wfile.flush()
+    try:
+        sent = handler.connection.sendfile(f, offset, count)
+        add_bytes_sent(handler, sent)
+        remaining = count - sent
+    except (AttributeError, NotImplementedError):
+        # 连接对象不支持 sendfile 时按块复制
+        f.seek(offset)
+        remaining = count
+        while remaining > 0:
+            data = f.read(min(64 * 1024, remaining))
+            if not data:
+                break
+            handler.wfile.write(data)
+            remaining -= len(data)
+    if remaining > 0:
+        # 文件在发送过程中变短，响应比 Content-Length 短，客户端只能靠关闭连接发现
+        handler.close_connection = True
+
+
+def send_file(handler, file_path, content_type, extra_headers=None, head_only=False,
+              prefer_built=True):
+    """
+    发送一个文件，处理条件请求和 Range 请求
+    prefer_built 为真时，如果有最新的构建结果（见 asset_build.py）则发送构建结果
+    返回发送的状态码；文件不存在时返回 None，由调用方决定如何处理
+    """
+    extra_headers = dict(extra_headers or {})
+    try:
+        stat = os.stat(file_path)
+        assets = get_asset_manifest()
+        if assets.is_immutable(file_path):
+            # 带内容哈希的文件名，内容永远不会变化
+            extra_headers.setdefault('Cache-Control', IMMUTABLE_CACHE_CONTROL)
+        elif prefer_built:
+            # 原文件的地址不变，发送压缩后的内容，浏览器仍然用 ETag 重新验证
+            built_path = assets.built_path(file_path, stat)
+            if built_path is not None:
+                file_path, stat = built_path, os.stat(built_path)
+        # 先查内存缓存，命中时不需要访问磁盘；接受的压缩编码不同，发送的内容也可能不同
+        cache = get_hot_file_cache()
+        key = (file_path, tuple(candidate_encodings(handler, content_type, stat)))
+        cached = cache.lookup(key, stat)
+        if cached is None:
+            send_path, encoding = get_variant_cache().select(handler, file_path, content_type, stat)
+            cached = cache.load(key, encoding, send_path, stat, make_etag(stat, encoding))
+        if cached is not None:
+            f = None
+        else:
+            f = open(send_path, 'rb')
+    except OSError:
+        return None
+    with f or contextlib.nullcontext():
+        if cached is not None:
+            encoding = cached.encoding
+            size = len(cached.data)
+            etag = cached.etag
+            last_modified = cached.last_modified
+        else:
+            size = os.fstat(f.fileno()).st_size
+            etag = make_etag(stat, encoding)
+            last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+        def send_body(offset, count):
+            if cached is not None:
+                handler.wfile.write(memoryview(cached.data)[offset:offset + count])
+            else:
+                copy_range(handler, f, offset, count)
+
+        def send_common_headers():
+            handler.send_header('ETag', etag)
+            handler.send_header('Last-Modified', last_modified)
+            handler.send_header('Accept-Ranges', 'bytes')
+            if is_compressible(content_type):
+                handler.send_header('Vary', 'Accept-Encoding')
+            if encoding:
+                handler.send_header('Content-Encoding', encoding)
+            for name, value in extra_headers.items():
+                handler.send_header(name, value)
+
+        if is_not_modified(handler.headers, etag, stat.st_mtime):
+            handler.send_response(304)
+            send_common_headers()
+            handler.end_headers()
+            return 304
+
+        ranges = None
+        if if_range_allows(handler.headers, etag, stat.st_mtime):
+            ranges = parse_range(handler.headers.get('Range'), size)
+
+        if ranges == []:
+            handler.send_response(416)
+            handler.send_header('Content-Range', f'bytes */{size}')
+            handler.send_header('Content-Length', '0')
+            send_common_headers()
+            handler.end_headers()
+            return 416
+
+        if ranges is None:
+            handler.send_response(200)
+            handler.send_header('Content-type', content_type)
+            handler.send_header('Content-Length', str(size))
+            send_common_headers()
+            handler.end_headers()
+            if not head_only:
+                send_body(0, size)
+            return 200
+
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            handler.send_response(206)
+            handler.send_header('Content-type', content_type)
+            handler.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            handler.send_header('Content-Length', str(end - start + 1))
+            send_common_headers()
+            handler.end_headers()
+            if not head_only:
+                send_body(start, end - start + 1)
+            return 206
+
+        # 多段 Range 使用 multipart/byteranges
+        boundary = uuid.uuid4().hex
+        part_headers = []
+        length = 0
+        for start, end in ranges:
+            part = (f'--{boundary}\r\nContent-Type: {content_type}\r\n'
+                    f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n').encode('latin-1')
+            part_headers.append(part)
+            length += len(part) + (end - start + 1) + 2
+        closing = f'--{boundary}--\r\n'.encode('latin-1')
+        length += len(closing)
+
+        handler.send_response(206)
+        handler.send_header('Content-type', f'multipart/byteranges; boundary={boundary}')
+        handler.send_header('Content-Length', str(length))
+        send_common_headers()
+        handler.end_headers()
+        if not head_only:
+            for part, (start, end) in zip(part_headers, ranges):
+                handler.wfile.write(part)
+                send_body(start, end - start + 1)
+                handler.wfile.write(b'\r\n')
+            handler.wfile.write(closing)
+        return 206
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传文件索引
+每次写入文件时把文件名、大小、摘要、上传者IP、标题/作者/分类等信息记录到
+uploads/.index.sqlite3，文件列表直接从索引分页查询，不再遍历整个 uploads 目录。
+"""
+
+import os
+import json
+import time
+import base64
+import sqlite3
+import threading
+
+from access_log import log_event
+
+INDEX_FILENAME = '.index.sqlite3'
+# 每页默认条数和最大条数
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+# 可以排序的字段
+SORT_FIELDS = ('modified', 'created', 'name', 'size', 'title', 'author', 'category')
+INDEXED_EXTENSIONS = ('.html', '.htm')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    digest TEXT,
+    uploader_ip TEXT,
+    title TEXT,
+    author TEXT,
+    category TEXT,
+    created REAL NOT NULL,
+    modified REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_modified ON files (modified, name);
+CREATE INDEX IF NOT EXISTS files_created ON files (created, name);
+CREATE INDEX IF NOT EXISTS files_size ON files (size, name);
+CREATE INDEX IF NOT EXISTS files_title ON files (title, name);
+CREATE INDEX IF NOT EXISTS files_author ON files (author, name);
+CREATE INDEX IF NOT EXISTS files_category ON files (category, name);
+"""
+
+
+def is_indexed_name(name):
+    """只有HTML课件会进入索引"""
+    return name.lower().endswith(INDEXED_EXTENSIONS)
+
+
+def encode_cursor(sort_value, name):
+    raw = json.dumps([sort_value, name], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        sort_value, name = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return sort_value, name
+
+
+class UploadIndex:
+    """上传文件的 SQLite 索引，连接在线程间共享并用锁保护"""
+
+    def __init__(self, uploads_dir):
+        self.uploads_dir = uploads_dir
+        os.makedirs(uploads_dir, exist_ok=True)
+        self.db_path = os.path.join(uploads_dir, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.synced = False
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def record(self, name, size, digest=None, uploader_ip=None, meta=None,
+               created=None, modified=None):
+        """新增或更新一条文件记录"""
+        self.record_many([{
+            'name': name,
+            'size': size,
+            'digest': digest,
+            'uploader_ip': uploader_ip,
+            'meta': meta,
+            'created': created,
+            'modified': modified
+        }])
+
+    def record_many(self, entries):
+        """在一个事务中写入多条记录"""
+        now = time.time()
+        rows = []
+        for entry in entries:
+            if not is_indexed_name(entry['name']):
+                continue
+            meta = entry.get('meta') or {}
+            rows.append((
+                entry['name'], entry['size'], entry.get('digest'), entry.get('uploader_ip'),
+                meta.get('title'), meta.get('author'), meta.get('category'),
+                entry.get('created') or now, entry.get('modified') or now
+            ))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    """INSERT INTO files (name, size, digest, uploader_ip, title, author,
+                                          category, created, modified)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(name) DO UPDATE SET
+                           size=excluded.size, digest=excluded.digest,
+                           uploader_ip=COALESCE(excluded.uploader_ip, files.uploader_ip),
+                           title=excluded.title, author=excluded.author,
+                           category=excluded.category, modified=excluded.modified""",
+                    rows)
+
+    def remove(self, name):
+        with self._lock:
+            with self._conn:
+                self._conn.execute('DELETE FROM files WHERE name = ?', (name,))
+
+    def get(self, name):
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM files WHERE name = ?', (name,)).fetchone()
+        return dict(row) if row else None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def names(self):
+        with self._lock:
+            return {row[0] for row in self._conn.execute('SELECT name FROM files')}
+
+    def digests(self):
+        with self._lock:
+            return {row[0] for row in self._conn.execute(
+                'SELECT DISTINCT digest FROM files WHERE digest IS NOT NULL')}
+
+    def query(self, sort='modified', order='desc', limit=DEFAULT_LIMIT, cursor=None,
+              category=None, author=None):
+        """
+        分页查询文件列表
+        使用 (排序字段, 文件名) 作为游标，翻页时间与总文件数无关
+        返回 (记录列表, 下一页游标或 None)
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Invalid sort field: {sort}")
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Invalid order: {order}")
+        limit = max(1, min(int(limit), MAX_LIMIT))
+
+        where = []
+        params = []
+        if category:
+            where.append('category = ?')
+            params.append(category)
+        if author:
+            where.append('author = ?')
+            params.append(author)
+        if cursor:
+            sort_value, name = decode_cursor(cursor)
+            op = '<' if order == 'desc' else '>'
+            where.append(f'({sort}, name) {op} (?, ?)')
+            params.extend([sort_value, name])
+
+        sql = 'SELECT * FROM files'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        direction = 'DESC' if order == 'desc' else 'ASC'
+        sql += f' ORDER BY {sort} {direction}, name {direction} LIMIT ?'
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = [dict(row) for row in self._conn.execute(sql, params)]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last[sort], last['name'])
+        return rows, next_cursor
+
+    def sync(self, parse_meta=None):
+        """
+        把索引和 uploads 目录对齐：补充索引中没有的文件，删除已不存在的文件
+        只在启动时调用一次；parse_meta(file_path, filename) 用来提取标题等信息
+        """
+        known = self.names()
+        present = set()
+        entries = []
+        for entry in os.scandir(self.uploads_dir):
+            if not entry.is_file() or not is_indexed_name(entry.name):
+                continue
+            present.add(entry.name)
+            if entry.name in known:
+                continue
+            stat = entry.stat()
+            meta = parse_meta(entry.path, entry.name) if parse_meta else None
+            entries.append({
+                'name': entry.name,
+                'size': stat.st_size,
+                'meta': meta,
+                'created': stat.st_mtime,
+                'modified': stat.st_mtime
+            })
+        if entries:
+            self.record_many(entries)
+        missing = known - present
+        if missing:
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany('DELETE FROM files WHERE name = ?',
+                                           [(name,) for name in missing])
+        return len(entries), len(missing)
+
+    def ensure_synced(self, parse_meta=None):
+        """第一次使用时与目录内容对齐一次"""
+        with self._sync_lock:
+            if not self.synced:
+                added, removed = self.sync(parse_meta)
+                self.synced = True
+                if added or removed:
+                    log_event('upload_index_synced', added=added, removed=removed)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_upload_index(uploads_dir):
+    """每个上传目录共用一个 UploadIndex 实例"""
+    uploads_dir = os.path.abspath(uploads_dir)
+    with _indexes_lock:
+        index = _indexes.get(uploads_dir)
+        if index is None:
+            index = UploadIndex(uploads_dir)
+            _indexes[uploads_dir] = index
+        return index
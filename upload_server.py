@@ -8,337 +8,864 @@
 import os
 import json
 import time
+import uuid
 import shutil
+import argparse
 import urllib.parse
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import BaseHTTPRequestHandler
 from pathlib import Path
 import webbrowser
 
-class UploadHandler(BaseHTTPRequestHandler):
+from access_log import add_logging_arguments, configure_logging_from_args, log_event
+from admission import (AdmissionHandlerMixin, add_admission_arguments, configure_admission_from_args,
+                       get_admission_controller)
+from batch_upload import (MAX_BATCH_FILES, BatchEntry, BatchError, abort_entries,
+                          extract_zip, is_accepted_file, is_zip_request, parse_metadata_parallel,
+                          summarize)
+from blob_store import get_blob_store
+from compressed_variants import send_compressed_bytes
+from course_catalog import get_course_catalog
+from html_metadata import HtmlMetadataExtractor, extract_metadata, tee_metadata
+from keep_alive import KeepAliveHandlerMixin, add_keep_alive_arguments, configure_keep_alive_from_args
+from metadata_cache import cached_file_metadata, get_metadata_cache, warm_metadata_cache
+from multipart_stream import MultipartError, MultipartStreamParser
+from request_body import RequestBodyError, iter_request_body
+from resumable_upload import UploadSessionError, get_upload_manager
+from routing import RouterMixin, metrics_routes, send_course_catalog, send_course_search
+from search_index import get_search_index
+from server_metrics import MetricsHandlerMixin, observe_upload, send_metrics
+from server_runtime import add_server_arguments, create_server
+from upload_index import DEFAULT_LIMIT, get_upload_index
+
+class BatchUploadMixin:
+    """
+    POST /batch 批量上传，upload_server.py、file_server.py 和 server.py 共用
+    放在 BaseHTTPRequestHandler 子类的基类列表中 BaseHTTPRequestHandler 之前
+    """
+    
+    def send_json(self, status, data):
+        """发送JSON响应"""
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def body_limit(self):
+        """准入控制配置的请求体上限，批量上传使用批量上传的上限"""
+        return get_admission_controller().body_limit(self.is_batch_request())
+    
+    def handle_batch_upload(self):
+        """
+        处理 POST /batch
+        请求体是 ZIP 压缩包，或者包含多个 files 字段的 multipart/form-data，
+        返回每个文件的处理结果
+        """
+        started = time.perf_counter()
+        content_type = self.headers.get('Content-Type', '')
+        store = get_blob_store(get_uploads_dir())
+        entries = []
+        try:
+            if is_zip_request(content_type):
+                # ZIP 的文件目录在末尾，先把压缩包写入临时文件，再逐个解压
+                archive = store.open_writer()
+                try:
+                    for data in iter_request_body(self, max_size=self.body_limit()):
+                        archive.write(data)
+                    archive.close()
+                    entries = extract_zip(archive.temp_path, store)
+                finally:
+                    archive.abort()
+            elif content_type.startswith('multipart/form-data'):
+                entries = self.receive_multipart_batch(content_type, store)
+            else:
+                self.send_json(415, {'success': False, 'error': '请上传ZIP压缩包或multipart表单'})
+                return
+            save_uploaded_batch(entries, uploader_ip=self.client_address[0])
+        except (RequestBodyError, BatchError) as e:
+            abort_entries(entries, store)
+            self.close_connection = True
+            self.send_json(e.status, {'success': False, 'error': e.message})
+            return
+        except MultipartError as e:
+            abort_entries(entries, store)
+            self.close_connection = True
+            self.send_json(400, {'success': False, 'error': str(e)})
+            return
+        except Exception as e:
+            abort_entries(entries, store)
+            self.close_connection = True
+            self.send_json(500, {'success': False, 'error': str(e)})
+            return
+        
+        self.send_json(200, summarize(entries, time.perf_counter() - started))
+    
+    def receive_multipart_batch(self, content_type, store):
+        """按块接收 multipart 请求中的所有文件，返回 BatchEntry 列表（尚未提交）"""
+        if self.headers.get('Content-Length') is None:
+            raise RequestBodyError(411, 'Content-Length required')
+        content_length = int(self.headers['Content-Length'])
+        max_size = self.body_limit()
+        if content_length > max_size:
+            raise RequestBodyError(413, f'请求超过 {max_size // (1024 * 1024)}MB')
+        entries = []
+        
+        def open_part(part):
+            if part.name != 'files':
+                return None
+            if len(entries) >= MAX_BATCH_FILES:
+                raise BatchError(413, f'文件数超过上限 {MAX_BATCH_FILES}')
+            entry = BatchEntry(part.filename)
+            entries.append(entry)
+            if is_accepted_file(part.filename):
+                entry.writer = store.open_writer()
+            else:
+                # 不是课件的文件读取后丢弃
+                entry.status, entry.error = 'skipped', '不是HTML课件'
+            return entry
+        
+        try:
+            MultipartStreamParser(self.rfile, content_type, content_length, open_part).parse()
+        except BaseException:
+            abort_entries(entries, store)
+            raise
+        return entries
+
+
+class UploadHandler(MetricsHandlerMixin, AdmissionHandlerMixin, KeepAliveHandlerMixin, RouterMixin,
+                    BatchUploadMixin, BaseHTTPRequestHandler):
     """处理文件上传的HTTP请求处理器"""
     
-    def do_GET(self):
-        """处理GET请求"""
-        if self.path == '/':
-            # 返回主页
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
+    ROUTES = (
+        ('GET', '/', 'send_upload_page'),
+        ('GET', '/files', 'send_file_list'),
+        ('GET', '/api/courses', send_course_catalog),
+        ('GET', '/api/search', send_course_search),
+        ('GET', '/metrics', send_metrics),
+        ('GET', '/sessions/', 'handle_session_status'),
+        ('HEAD', '/sessions/', 'handle_session_status'),
+        ('HEAD', '/blobs/', 'send_blob_status'),
+        ('POST', '/upload', 'handle_json_upload'),
+        # 原始二进制上传
+        ('POST', '/upload/', 'handle_raw_upload'),
+        ('PUT', '/upload/', 'handle_raw_upload'),
+        # 断点续传
+        ('POST', '/sessions', 'handle_session_create'),
+        ('POST', '/sessions/*/complete', 'handle_session_complete'),
+        ('PATCH', '/sessions/', 'handle_session_append'),
+        # 秒传：内容已在服务器上
+        ('POST', '/blobs/', 'handle_blob_link'),
+        ('POST', '/batch', 'handle_batch_upload'),
+    )
+    # /metrics 中的路由
+    METRICS_ROUTES = metrics_routes(ROUTES)
+    # 使用批量上传大小上限的路径
+    ADMISSION_BATCH_ROUTES = ('/batch',)
+    # 创建会话（POST /sessions）时计入上传频率，同一个会话的分块不再计入
+    ADMISSION_UNMETERED_ROUTES = (('PATCH', '/sessions/'),)
+    
+    def send_upload_page(self):
+        """上传页面"""
+        html_content = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>文件上传服务</title>
+            <meta charset="UTF-8">
+            <style>
+                body { font-family: Arial, sans-serif; margin: 50px; }
+                .upload-area { border: 2px dashed #ccc; padding: 50px; text-align: center; margin: 20px 0; }
+                .upload-btn { background: #4CAF50; color: white; padding: 10px 20px; border: none; cursor: pointer; margin: 10px; }
+                .upload-btn:hover { background: #45a049; }
+                .file-list { margin-top: 20px; }
+                .file-item { padding: 5px; border-bottom: 1px solid #eee; }
+                .status { margin: 10px 0; padding: 10px; border-radius: 5px; }
+                .success { background: #d4edda; color: #155724; }
+                .error { background: #f8d7da; color: #721c24; }
+            </style>
+        </head>
+        <body>
+            <h1>📤 课件文件上传服务</h1>
+            <p>请在此页面上传HTML课件文件，文件将被保存到本地uploads目录。</p>
+            
+            <div class="upload-area">
+                <h3>选择要上传的文件</h3>
+                <input type="file" id="fileInput" multiple accept=".html,.htm,.zip" />
+                <br><br>
+                <button class="upload-btn" onclick="uploadFiles()">🚀 上传文件</button>
+            </div>
             
-            html_content = """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>文件上传服务</title>
-                <meta charset="UTF-8">
-                <style>
-                    body { font-family: Arial, sans-serif; margin: 50px; }
-                    .upload-area { border: 2px dashed #ccc; padding: 50px; text-align: center; margin: 20px 0; }
-                    .upload-btn { background: #4CAF50; color: white; padding: 10px 20px; border: none; cursor: pointer; margin: 10px; }
-                    .upload-btn:hover { background: #45a049; }
-                    .file-list { margin-top: 20px; }
-                    .file-item { padding: 5px; border-bottom: 1px solid #eee; }
-                    .status { margin: 10px 0; padding: 10px; border-radius: 5px; }
-                    .success { background: #d4edda; color: #155724; }
-                    .error { background: #f8d7da; color: #721c24; }
-                </style>
-            </head>
-            <body>
-                <h1>📤 课件文件上传服务</h1>
-                <p>请在此页面上传HTML课件文件，文件将被保存到本地uploads目录。</p>
+            <div id="status"></div>
+            <div id="fileList" class="file-list"></div>
+            
+            <script>
+                let uploadedFiles = [];
                 
-                <div class="upload-area">
-                    <h3>选择要上传的文件</h3>
-                    <input type="file" id="fileInput" multiple accept=".html,.htm" />
-                    <br><br>
-                    <button class="upload-btn" onclick="uploadFiles()">🚀 上传文件</button>
-                </div>
+                async function uploadFiles() {
+                    const fileInput = document.getElementById('fileInput');
+                    const files = fileInput.files;
+                    
+                    if (files.length === 0) {
+                        showStatus('请选择要上传的文件', 'error');
+                        return;
+                    }
+                    
+                    showStatus('正在上传文件...', 'info');
+                    
+                    // 多个文件或ZIP压缩包在一个请求中上传
+                    if (files.length > 1 || /\\.zip$/i.test(files[0].name)) {
+                        await uploadBatch(files);
+                        updateFileList();
+                        return;
+                    }
+                    
+                    for (let file of files) {
+                        try {
+                            const result = await saveFile(file);
+                            
+                            if (result.success) {
+                                uploadedFiles.push({
+                                    name: file.name,
+                                    path: result.path,
+                                    size: file.size,
+                                    timestamp: new Date().toLocaleString()
+                                });
+                                showStatus(`✅ ${file.name} 上传成功！保存位置: ${result.path}`, 'success');
+                            } else {
+                                showStatus(`❌ ${file.name} 上传失败: ${result.error}`, 'error');
+                            }
+                        } catch (error) {
+                            showStatus(`❌ ${file.name} 处理失败: ${error.message}`, 'error');
+                        }
+                    }
+                    
+                    updateFileList();
+                }
                 
-                <div id="status"></div>
-                <div id="fileList" class="file-list"></div>
+                const MAX_BUSY_RETRIES = 5;
                 
-                <script>
-                    let uploadedFiles = [];
-                    
-                    async function uploadFiles() {
-                        const fileInput = document.getElementById('fileInput');
-                        const files = fileInput.files;
-                        
-                        if (files.length === 0) {
-                            showStatus('请选择要上传的文件', 'error');
+                async function fetchWithRetry(url, options) {
+                    // 服务器忙（429/503）时按 Retry-After 等待后重新发送
+                    for (let attempt = 0; ; attempt++) {
+                        const response = await fetch(url, options);
+                        if ((response.status !== 429 && response.status !== 503) ||
+                                attempt >= MAX_BUSY_RETRIES) {
+                            return response;
+                        }
+                        const seconds = parseInt(response.headers.get('Retry-After'), 10);
+                        await new Promise(r => setTimeout(r, (seconds > 0 ? seconds : 1) * 1000));
+                    }
+                }
+                
+                async function uploadBatch(files) {
+                    try {
+                        let response;
+                        if (files.length === 1) {
+                            // 单个ZIP压缩包直接作为请求体发送
+                            response = await fetchWithRetry('/batch', {
+                                method: 'POST',
+                                headers: { 'Content-Type': 'application/zip' },
+                                body: files[0]
+                            });
+                        } else {
+                            const form = new FormData();
+                            for (let file of files) form.append('files', file);
+                            response = await fetchWithRetry('/batch', { method: 'POST', body: form });
+                        }
+                        const result = await response.json();
+                        if (!result.files) {
+                            showStatus(`❌ 批量上传失败: ${result.error}`, 'error');
                             return;
                         }
-                        
-                        showStatus('正在上传文件...', 'info');
-                        
-                        for (let file of files) {
-                            try {
-                                const content = await readFileContent(file);
-                                const result = await saveFile(file.name, content);
-                                
-                                if (result.success) {
-                                    uploadedFiles.push({
-                                        name: file.name,
-                                        path: result.path,
-                                        size: file.size,
-                                        timestamp: new Date().toLocaleString()
-                                    });
-                                    showStatus(`✅ ${file.name} 上传成功！保存位置: ${result.path}`, 'success');
-                                } else {
-                                    showStatus(`❌ ${file.name} 上传失败: ${result.error}`, 'error');
-                                }
-                            } catch (error) {
-                                showStatus(`❌ ${file.name} 处理失败: ${error.message}`, 'error');
+                        for (let item of result.files) {
+                            if (item.status === 'ok') {
+                                uploadedFiles.push({
+                                    name: item.filename,
+                                    path: item.saved_filename,
+                                    size: item.size,
+                                    timestamp: new Date().toLocaleString()
+                                });
                             }
                         }
-                        
-                        updateFileList();
-                    }
-                    
-                    function readFileContent(file) {
-                        return new Promise((resolve, reject) => {
-                            const reader = new FileReader();
-                            reader.onload = e => resolve(e.target.result);
-                            reader.onerror = e => reject(e);
-                            reader.readAsText(file, 'UTF-8');
-                        });
+                        const failed = result.files.filter(item => item.status === 'error');
+                        let message = `✅ 成功上传 ${result.saved} 个文件`;
+                        if (result.skipped) message += `，跳过 ${result.skipped} 个非课件文件`;
+                        if (failed.length) {
+                            message += `，${failed.length} 个失败: ` +
+                                failed.map(item => `${item.filename} (${item.error})`).join('、');
+                        }
+                        showStatus(message, failed.length ? 'error' : 'success');
+                    } catch (error) {
+                        showStatus(`❌ 批量上传失败: ${error.message}`, 'error');
                     }
+                }
+                
+                const RESUMABLE_THRESHOLD = 1024 * 1024;
+                const CHUNK_SIZE = 512 * 1024;
+                const MAX_RETRIES = 10;
+                
+                async function uploadResumable(file) {
+                    // 创建会话后分块发送，网络中断时查询服务器偏移量并从该位置继续
+                    const created = await fetchWithRetry('/sessions', {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify({ filename: file.name, size: file.size })
+                    });
+                    const session = await created.json();
+                    if (!session.success) return session;
                     
-                    async function saveFile(filename, content) {
+                    let offset = 0;
+                    let retries = 0;
+                    while (offset < file.size) {
                         try {
-                            const response = await fetch('/upload', {
-                                method: 'POST',
+                            const response = await fetchWithRetry('/sessions/' + session.id, {
+                                method: 'PATCH',
                                 headers: {
-                                    'Content-Type': 'application/json',
+                                    'Content-Type': 'application/offset+octet-stream',
+                                    'Upload-Offset': String(offset)
                                 },
-                                body: JSON.stringify({ filename, content })
+                                body: file.slice(offset, offset + CHUNK_SIZE)
                             });
-                            
                             const result = await response.json();
-                            return result;
+                            if (response.ok || response.status === 409) {
+                                offset = result.offset;
+                                retries = 0;
+                            } else {
+                                return result;
+                            }
                         } catch (error) {
-                            return { success: false, error: error.message };
+                            if (++retries > MAX_RETRIES) throw error;
+                            await new Promise(r => setTimeout(r, 1000 * retries));
+                            const head = await fetch('/sessions/' + session.id, { method: 'HEAD' })
+                                .catch(() => null);
+                            if (head && head.ok) {
+                                offset = parseInt(head.headers.get('Upload-Offset'), 10);
+                            }
                         }
                     }
                     
-                    function showStatus(message, type) {
-                        const statusDiv = document.getElementById('status');
-                        statusDiv.innerHTML = `<div class="status ${type}">${message}</div>`;
+                    const done = await fetchWithRetry('/sessions/' + session.id + '/complete', { method: 'POST' });
+                    return await done.json();
+                }
+                
+                async function sha256Hex(file) {
+                    // crypto.subtle 只在 https 或 localhost 下可用
+                    if (!window.crypto || !crypto.subtle) return null;
+                    const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+                    return Array.from(new Uint8Array(digest))
+                        .map(b => b.toString(16).padStart(2, '0')).join('');
+                }
+                
+                async function saveFile(file) {
+                    // 直接发送文件的原始字节，服务器边接收边写入磁盘
+                    try {
+                        // 服务器上已有相同内容时只发送摘要
+                        const digest = await sha256Hex(file);
+                        if (digest) {
+                            const head = await fetch('/blobs/' + digest, { method: 'HEAD' });
+                            if (head.ok) {
+                                const linked = await fetchWithRetry('/blobs/' + digest + '?name=' + encodeURIComponent(file.name), {
+                                    method: 'POST'
+                                });
+                                return await linked.json();
+                            }
+                        }
                         
-                        // 3秒后清除状态消息
-                        setTimeout(() => {
-                            statusDiv.innerHTML = '';
-                        }, 3000);
-                    }
-                    
-                    function updateFileList() {
-                        const fileListDiv = document.getElementById('fileList');
-                        if (uploadedFiles.length === 0) {
-                            fileListDiv.innerHTML = '';
-                            return;
+                        // 较大的文件使用可续传的分块上传
+                        if (file.size > RESUMABLE_THRESHOLD) {
+                            return await uploadResumable(file);
                         }
                         
-                        let html = '<h3>已上传的文件:</h3>';
-                        uploadedFiles.forEach(file => {
-                            html += `
-                                <div class="file-item">
-                                    📄 ${file.name}<br>
-                                    📍 ${file.path}<br>
-                                    📊 ${(file.size / 1024).toFixed(2)} KB | 🕒 ${file.timestamp}
-                                </div>
-                            `;
+                        const response = await fetchWithRetry('/upload/' + encodeURIComponent(file.name), {
+                            method: 'PUT',
+                            headers: {
+                                'Content-Type': file.type || 'application/octet-stream',
+                            },
+                            body: file
                         });
                         
-                        fileListDiv.innerHTML = html;
+                        const result = await response.json();
+                        return result;
+                    } catch (error) {
+                        return { success: false, error: error.message };
                     }
-                </script>
-            </body>
-            </html>
-            """
-            
-            self.wfile.write(html_content.encode('utf-8'))
-            
-        elif self.path == '/files':
-            # 返回已上传文件列表
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
-            files_info = self.get_uploaded_files()
-            self.wfile.write(json.dumps(files_info).encode('utf-8'))
-            
-        else:
-            self.send_error(404)
-    
-    def do_POST(self):
-        """处理POST请求"""
-        if self.path == '/upload':
-            try:
-                # 读取请求体
-                content_length = int(self.headers.get('Content-Length', 0))
-                post_data = self.rfile.read(content_length)
-                
-                # 解析JSON数据
-                data = json.loads(post_data.decode('utf-8'))
-                filename = data.get('filename', '')
-                content = data.get('content', '')
+                }
                 
-                # 保存文件
-                saved_filename, saved_path = save_uploaded_file(filename, content)
+                function showStatus(message, type) {
+                    const statusDiv = document.getElementById('status');
+                    statusDiv.innerHTML = `<div class="status ${type}">${message}</div>`;
+                    
+                    // 3秒后清除状态消息
+                    setTimeout(() => {
+                        statusDiv.innerHTML = '';
+                    }, 3000);
+                }
                 
-                if saved_filename:
-                    # 返回成功响应
-                    response = {
-                        'success': True,
-                        'filename': saved_filename,
-                        'path': saved_path,
-                        'message': '文件上传成功'
-                    }
-                else:
-                    response = {
-                        'success': False,
-                        'error': '文件保存失败'
+                function updateFileList() {
+                    const fileListDiv = document.getElementById('fileList');
+                    if (uploadedFiles.length === 0) {
+                        fileListDiv.innerHTML = '';
+                        return;
                     }
-                
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json; charset=utf-8')
-                self.end_headers()
-                self.wfile.write(json.dumps(response).encode('utf-8'))
-                
-            except Exception as e:
-                # 返回错误响应
-                error_response = {
-                    'success': False,
-                    'error': str(e)
+                    
+                    let html = '<h3>已上传的文件:</h3>';
+                    uploadedFiles.forEach(file => {
+                        html += `
+                            <div class="file-item">
+                                📄 ${file.name}<br>
+                                📍 ${file.path}<br>
+                                📊 ${(file.size / 1024).toFixed(2)} KB | 🕒 ${file.timestamp}
+                            </div>
+                        `;
+                    });
+                    
+                    fileListDiv.innerHTML = html;
                 }
-                
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json; charset=utf-8')
+            </script>
+        </body>
+        </html>
+        """
+        
+        # 浏览器支持时发送压缩后的页面
+        send_compressed_bytes(self, html_content.encode('utf-8'), 'text/html; charset=utf-8')
+    
+    def send_file_list(self):
+        """已上传文件列表（分页）"""
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        try:
+            files_info = self.get_uploaded_files(query)
+        except ValueError as e:
+            self.send_json(400, {'success': False, 'error': str(e)})
+            return
+        self.send_json(200, files_info)
+    
+    def handle_raw_upload(self):
+        """
+        处理 PUT/POST /upload/<文件名>
+        请求体就是文件的原始字节，按块直接写入磁盘
+        """
+        filename = urllib.parse.unquote(self.path[len('/upload/'):].split('?', 1)[0])
+        if not sanitize_filename(filename):
+            self.send_json(400, {'success': False, 'error': '缺少文件名'})
+            return
+        
+        try:
+            chunks = iter_request_body(self, max_size=self.body_limit())
+            saved_filename, saved_path, digest, size = save_uploaded_stream(
+                filename, chunks, uploader_ip=self.client_address[0])
+        except RequestBodyError as e:
+            # 请求体无法完整读取时关闭连接，剩余数据不再处理
+            self.close_connection = True
+            self.send_json(e.status, {'success': False, 'error': e.message})
+            return
+        except Exception as e:
+            self.close_connection = True
+            self.send_json(500, {'success': False, 'error': str(e)})
+            return
+        
+        self.send_json(200, {
+            'success': True,
+            'filename': saved_filename,
+            'path': saved_path,
+            'size': size,
+            'sha256': digest,
+            'message': '文件上传成功'
+        })
+    
+    def send_blob_status(self):
+        """HEAD /blobs/<摘要>  查询服务器上是否已有某个内容"""
+        digest = self.path[len('/blobs/'):].split('?', 1)[0].lower()
+        size = get_blob_store(get_uploads_dir()).blob_size(digest)
+        if size is None:
+            self.send_response(404)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(size))
+        self.send_header('ETag', f'"{digest}"')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+    
+    def handle_blob_link(self):
+        """
+        处理 POST /blobs/<摘要>?name=<文件名>
+        内容已在服务器上时，客户端只需发送摘要即可完成上传
+        """
+        parsed = urllib.parse.urlsplit(self.path)
+        digest = parsed.path[len('/blobs/'):].lower()
+        name = urllib.parse.parse_qs(parsed.query).get('name', [''])[0]
+        if not sanitize_filename(name):
+            self.send_json(400, {'success': False, 'error': '缺少文件名'})
+            return
+        if not get_blob_store(get_uploads_dir()).has_blob(digest):
+            self.send_json(404, {'success': False, 'error': '内容不存在'})
+            return
+        
+        saved_filename, saved_path, size = link_existing_blob(
+            name, digest, uploader_ip=self.client_address[0])
+        self.send_json(200, {
+            'success': True,
+            'filename': saved_filename,
+            'path': saved_path,
+            'size': size,
+            'sha256': digest,
+            'message': '文件上传成功'
+        })
+    
+    def send_session_error(self, e):
+        """返回续传会话错误，偏移量不一致时附带服务器当前偏移量"""
+        body = {'success': False, 'error': e.message}
+        if e.offset is not None:
+            body['offset'] = e.offset
+        self.send_json(e.status, body)
+    
+    def upload_manager(self):
+        return get_upload_manager(get_uploads_dir(), max_size=get_admission_controller().body_limit())
+    
+    def read_json_body(self, max_size=64 * 1024):
+        """读取较小的JSON请求体"""
+        data = b''.join(iter_request_body(self, max_size=max_size))
+        return json.loads(data.decode('utf-8')) if data else {}
+    
+    def handle_session_create(self):
+        """POST /sessions  请求体: {"filename": ..., "size": ...}"""
+        try:
+            data = self.read_json_body()
+            filename = sanitize_filename(str(data.get('filename', '')))
+            if not filename:
+                self.send_json(400, {'success': False, 'error': '缺少文件名'})
+                return
+            session = self.upload_manager().create(filename, int(data.get('size', -1)))
+        except RequestBodyError as e:
+            self.close_connection = True
+            self.send_json(e.status, {'success': False, 'error': e.message})
+            return
+        except UploadSessionError as e:
+            self.send_session_error(e)
+            return
+        except (ValueError, TypeError) as e:
+            self.send_json(400, {'success': False, 'error': str(e)})
+            return
+        session['success'] = True
+        self.send_json(201, session)
+    
+    def handle_session_status(self):
+        """GET/HEAD /sessions/<id>  返回服务器已收到的字节数"""
+        head_only = self.command == 'HEAD'
+        session_id = self.path[len('/sessions/'):].split('?', 1)[0]
+        try:
+            session = self.upload_manager().status(session_id)
+        except UploadSessionError as e:
+            if head_only:
+                self.send_response(e.status)
+                self.send_header('Access-Control-Allow-Origin', '*')
                 self.end_headers()
-                self.wfile.write(json.dumps(error_response).encode('utf-8'))
-        else:
-            self.send_error(404)
+            else:
+                self.send_session_error(e)
+            return
+        if head_only:
+            self.send_response(200)
+            self.send_header('Upload-Offset', str(session['offset']))
+            self.send_header('Upload-Length', str(session['size']))
+            self.send_header('Cache-Control', 'no-store')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Expose-Headers', 'Upload-Offset, Upload-Length')
+            self.end_headers()
+            return
+        session['success'] = True
+        self.send_json(200, session)
+    
+    def handle_session_append(self):
+        """PATCH /sessions/<id>  请求头 Upload-Offset 指明这一块数据的起始位置"""
+        session_id = self.path[len('/sessions/'):].split('?', 1)[0]
+        try:
+            offset = int(self.headers.get('Upload-Offset', ''))
+        except ValueError:
+            self.send_json(400, {'success': False, 'error': '缺少 Upload-Offset'})
+            return
+        try:
+            chunks = iter_request_body(self, max_size=self.body_limit())
+            session = self.upload_manager().append(session_id, offset, chunks)
+        except RequestBodyError as e:
+            self.close_connection = True
+            self.send_json(e.status, {'success': False, 'error': e.message})
+            return
+        except UploadSessionError as e:
+            # 未读取的请求体不能再复用这个连接
+            self.close_connection = True
+            self.send_session_error(e)
+            return
+        session['success'] = True
+        self.send_json(200, session)
     
-    def get_uploaded_files(self):
-        """获取已上传的文件列表"""
+    def handle_session_complete(self):
+        """POST /sessions/<id>/complete  所有数据收到后生成最终文件"""
+        path = urllib.parse.urlsplit(self.path).path
+        session_id = path[len('/sessions/'):-len('/complete')]
+        manager = self.upload_manager()
         try:
-            uploads_dir = os.path.join(os.getcwd(), "uploads")
-            files = []
+            session = manager.status(session_id)
+            saved_filename = make_unique_filename(session['filename'])
+            saved_path, digest, size = manager.complete(session_id, saved_filename)
+        except UploadSessionError as e:
+            self.send_session_error(e)
+            return
+        index_uploaded_file(saved_filename, saved_path, digest, size, self.client_address[0],
+                            session['filename'])
+        log_event('upload_saved', file=saved_filename, size=size, sha256=digest,
+                  client=self.client_address[0], source='session')
+        self.send_json(200, {
+            'success': True,
+            'filename': saved_filename,
+            'path': saved_path,
+            'size': size,
+            'sha256': digest,
+            'message': '文件上传成功'
+        })
+    
+    def handle_json_upload(self):
+        """POST /upload  请求体: {"filename": ..., "content": ...}"""
+        try:
+            # 读取请求体
+            content_length = int(self.headers.get('Content-Length', 0))
+            post_data = self.rfile.read(content_length)
             
-            if os.path.exists(uploads_dir):
-                for filename in os.listdir(uploads_dir):
-                    if filename.endswith(('.html', '.htm')):
-                        file_path = os.path.join(uploads_dir, filename)
-                        stat = os.stat(file_path)
-                        
-                        files.append({
-                            'name': filename,
-                            'path': file_path,
-                            'size': stat.st_size,
-                            'modified': time.ctime(stat.st_mtime)
-                        })
+            # 解析JSON数据
+            data = json.loads(post_data.decode('utf-8'))
+            filename = data.get('filename', '')
+            content = data.get('content', '')
+            
+            # 保存文件
+            saved_filename, saved_path = save_uploaded_file(
+                filename, content, uploader_ip=self.client_address[0])
+            
+            if saved_filename:
+                # 返回成功响应
+                response = {
+                    'success': True,
+                    'filename': saved_filename,
+                    'path': saved_path,
+                    'message': '文件上传成功'
+                }
+            else:
+                response = {
+                    'success': False,
+                    'error': '文件保存失败'
+                }
             
-            return files
         except Exception as e:
-            return []
+            # 返回错误响应
+            self.send_json(500, {'success': False, 'error': str(e)})
+            return
+        
+        self.send_json(200, response)
+    
+    def get_uploaded_files(self, query=None):
+        """
+        获取已上传的文件列表
+        从索引中分页查询，支持参数: limit, cursor, sort, order, category, author
+        """
+        query = query or {}
+        
+        def param(key, default=None):
+            return query.get(key, [default])[0]
+        
+        rows, next_cursor = get_index().query(
+            sort=param('sort', 'modified'),
+            order=param('order', 'desc'),
+            limit=int(param('limit', DEFAULT_LIMIT)),
+            cursor=param('cursor'),
+            category=param('category'),
+            author=param('author')
+        )
+        uploads_dir = get_uploads_dir()
+        files = []
+        for row in rows:
+            files.append({
+                'name': row['name'],
+                'path': os.path.join(uploads_dir, row['name']),
+                'size': row['size'],
+                'modified': time.ctime(row['modified']),
+                'created': time.ctime(row['created']),
+                'sha256': row['digest'],
+                'uploader_ip': row['uploader_ip'],
+                'title': row['title'],
+                'author': row['author'],
+                'category': row['category']
+            })
+        return {'files': files, 'next_cursor': next_cursor}
+
+def sanitize_filename(filename):
+    """去掉路径部分，防止文件被写到uploads目录之外"""
+    return os.path.basename(filename.replace('\\', '/')).strip()
+
+def get_uploads_dir():
+    """返回uploads目录，不存在时创建"""
+    uploads_dir = os.path.join(os.getcwd(), "uploads")
+    if not os.path.exists(uploads_dir):
+        os.makedirs(uploads_dir, exist_ok=True)
+        log_event('uploads_dir_created', path=uploads_dir)
+    return uploads_dir
 
-def save_uploaded_file(filename, content):
+def make_unique_filename(filename):
+    """生成唯一文件名避免冲突"""
+    timestamp = str(int(time.time()))
+    # 同一秒内上传同名文件（例如批量上传）时也不会重复
+    random_suffix = uuid.uuid4().hex[:6]
+    return f"{timestamp}_{random_suffix}_{filename}"
+
+def get_index():
+    """返回uploads目录的索引，第一次使用时补充索引中缺少的文件"""
+    index = get_upload_index(get_uploads_dir())
+    index.ensure_synced(cached_file_metadata)
+    return index
+
+def index_uploaded_file(saved_filename, file_path, digest, size, uploader_ip,
+                        original_filename, meta=None):
+    """把新写入的文件记录到索引和信息缓存，未提供信息时从文件开头提取"""
+    cache = get_metadata_cache()
+    if meta is None:
+        meta = cache.get(file_path, original_filename, digest=digest)
+    else:
+        cache.put(file_path, meta, digest=digest)
+    get_index().record(saved_filename, size, digest=digest, uploader_ip=uploader_ip,
+                       meta=meta)
+    observe_upload(size)
+
+def save_uploaded_file(filename, content, uploader_ip=None):
     """保存上传的文件到uploads目录"""
     try:
         # 创建uploads目录
-        uploads_dir = os.path.join(os.getcwd(), "uploads")
-        if not os.path.exists(uploads_dir):
-            os.makedirs(uploads_dir)
-            print(f"创建上传目录: {uploads_dir}")
+        uploads_dir = get_uploads_dir()
         
         # 生成唯一文件名避免冲突
-        timestamp = str(int(time.time()))
-        random_suffix = str(hash(filename))[-6:]
-        file_ext = Path(filename).suffix
-        unique_filename = f"{timestamp}_{random_suffix}_{filename}"
+        unique_filename = make_unique_filename(sanitize_filename(filename))
         
         # 完整的文件路径
         file_path = os.path.join(uploads_dir, unique_filename)
         
-        # 保存文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # 保存文件，相同内容只保存一份
+        _, digest, size = get_blob_store(uploads_dir).save_bytes(unique_filename,
+                                                                 content.encode('utf-8'))
+        index_uploaded_file(unique_filename, file_path, digest, size, uploader_ip, filename,
+                            meta=parse_html_content(content, filename))
         
-        print(f"文件已保存到: {file_path}")
+        log_event('upload_saved', file=unique_filename, size=size, sha256=digest,
+                  client=uploader_ip, source='json')
         return unique_filename, file_path
         
     except Exception as e:
-        print(f"保存文件时出错: {e}")
+        log_event('upload_failed', file=filename, error=str(e), client=uploader_ip)
         return None, None
 
+def save_uploaded_stream(filename, chunks, uploader_ip=None):
+    """
+    把按块到达的上传内容直接写入uploads目录
+    写入时计算SHA-256，相同内容只保存一份
+    返回 (保存的文件名, 完整路径, 摘要, 字节数)；读取请求体出错时异常会继续抛出
+    """
+    uploads_dir = get_uploads_dir()
+    unique_filename = make_unique_filename(sanitize_filename(filename))
+    
+    # 写入磁盘的同时提取标题和作者，找到后不再扫描
+    extractor = HtmlMetadataExtractor(filename)
+    file_path, digest, size = get_blob_store(uploads_dir).save_stream(
+        unique_filename, tee_metadata(chunks, extractor))
+    index_uploaded_file(unique_filename, file_path, digest, size, uploader_ip, filename,
+                        meta=extractor.close())
+    
+    log_event('upload_saved', file=unique_filename, size=size, sha256=digest,
+              client=uploader_ip, source='stream')
+    return unique_filename, file_path, digest, size
+
+def save_uploaded_batch(entries, uploader_ip=None):
+    """
+    提交批量上传的文件：生成文件名，在进程池中并行提取信息，
+    然后在一个事务中写入索引
+    """
+    uploads_dir = get_uploads_dir()
+    saved = []
+    for entry in entries:
+        if entry.writer is None:
+            continue
+        unique_filename = make_unique_filename(sanitize_filename(entry.filename))
+        try:
+            entry.path = entry.writer.commit(unique_filename)
+        except OSError as e:
+            entry.fail('error', str(e))
+            continue
+        entry.saved_filename = unique_filename
+        entry.digest = entry.writer.digest
+        entry.size = entry.writer.size
+        entry.writer = None
+        saved.append(entry)
+        observe_upload(entry.size)
+    
+    metas = parse_metadata_parallel([(entry.path, sanitize_filename(entry.filename))
+                                     for entry in saved])
+    for entry, meta in zip(saved, metas):
+        entry.meta = meta
+    get_metadata_cache().put_many([(entry.path, entry.meta, entry.digest) for entry in saved])
+    get_index().record_many([{
+        'name': entry.saved_filename,
+        'size': entry.size,
+        'digest': entry.digest,
+        'uploader_ip': uploader_ip,
+        'meta': entry.meta
+    } for entry in saved])
+    
+    log_event('batch_saved', files=len(saved), bytes=sum(entry.size for entry in saved),
+              path=uploads_dir, client=uploader_ip)
+    return saved
+
+def link_existing_blob(filename, digest, uploader_ip=None):
+    """
+    服务器上已有相同内容时，不需要再次上传，直接创建新的文件名
+    返回 (保存的文件名, 完整路径, 字节数)
+    """
+    uploads_dir = get_uploads_dir()
+    unique_filename = make_unique_filename(sanitize_filename(filename))
+    store = get_blob_store(uploads_dir)
+    file_path = store.link(digest, unique_filename)
+    size = store.blob_size(digest)
+    index_uploaded_file(unique_filename, file_path, digest, size, uploader_ip, filename)
+    
+    log_event('upload_saved', file=unique_filename, size=size, sha256=digest,
+              client=uploader_ip, source='dedup')
+    return unique_filename, file_path, size
+
 def parse_html_content(content, original_filename):
     """解析HTML内容提取信息"""
-    try:
-        # 提取标题
-        title = original_filename.replace('.html', '').replace('.HTML', '')
-        
-        # 简单的正则表达式提取信息
-        import re
-        
-        # 查找h1标签
-        h1_match = re.search(r'<h1[^>]*>([^<]+)</h1>', content, re.IGNORECASE)
-        if h1_match:
-            title = h1_match.group(1).strip()
-        
-        # 提取作者信息
-        author = "未知作者"
-        author_patterns = [
-            r'作者[：:]\s*([^\n\r<]+)',
-            r'制作者[：:]\s*([^\n\r<]+)',
-            r'制作者[：:]\s*([^\n\r<]+)'
-        ]
-        
-        for pattern in author_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                author = match.group(1).strip()
-                break
-        
-        # 自动判断分类
-        category = "九年级下册"  # 默认分类
-        if '七年级上册' in title:
-            category = "七年级上册"
-        elif '七年级下册' in title:
-            category = "七年级下册"
-        elif '八年级上册' in title:
-            category = "八年级上册"
-        elif '八年级下册' in title:
-            category = "八年级下册"
-        elif '九年级上册' in title:
-            category = "九年级上册"
-        elif '九年级下册' in title:
-            category = "九年级下册"
-        elif '中考复习' in title:
-            category = "中考复习"
-        
-        return {
-            'title': title,
-            'author': author,
-            'category': category,
-            'description': category
-        }
-        
-    except Exception as e:
-        print(f"解析HTML文件时出错: {e}")
-        return {
-            'title': original_filename.replace('.html', '').replace('.HTML', ''),
-            'author': "未知作者",
-            'category': "九年级下册",
-            'description': "九年级下册"
-        }
+    return extract_metadata(content, original_filename)
 
 def main():
     """启动文件上传服务器"""
-    server_port = 8080
-    server_host = '0.0.0.0'  # 监听所有网络接口，允许其他设备访问
+    parser = argparse.ArgumentParser(description='文件上传处理服务器')
+    # 默认监听所有网络接口，允许其他设备访问
+    add_server_arguments(parser, default_port=8080)
+    parser.add_argument('--no-browser', action='store_true', help='启动后不自动打开浏览器')
+    add_admission_arguments(parser)
+    add_keep_alive_arguments(parser)
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    configure_logging_from_args(args)
+    admission = configure_admission_from_args(args)
+    configure_keep_alive_from_args(args)
+    server_port = args.port
+    server_host = args.host
+    
+    # 启动时预热课件信息缓存，把已有文件补充到索引中，并建立搜索索引
+    warm_metadata_cache(os.getcwd())
+    get_index()
+    get_search_index(get_course_catalog(os.getcwd(), cached_file_metadata))
     
     # 创建HTTP服务器
-    server = HTTPServer((server_host, server_port), UploadHandler)
+    server = create_server((server_host, server_port), UploadHandler,
+                           mode=args.mode, workers=args.workers,
+                           max_queue=args.max_queue)
     
     print("=" * 50)
     print("📤 文件上传处理服务器已启动")
@@ -346,10 +873,14 @@ def main():
     print(f"🌐 本地访问: http://localhost:{server_port}")
     print(f"🌐 网络访问: http://[您的IP地址]:{server_port}")
     print(f"📁 上传目录: {os.path.join(os.getcwd(), 'uploads')}")
+    print(f"⚙️  并发模式: {args.mode} | 工作线程: {args.workers} | 排队上限: {args.max_queue}")
+    print(f"📦 上传上限: {args.max_body_mb} MB | 每个设备同时上传: {admission.uploads_per_client or '不限'} | "
+          f"同时接收: {args.max_inflight_mb or '不限'} MB")
+    print(f"🔗 持久连接: 空闲 {args.keep_alive_timeout} 秒 | 每个连接最多 {args.keep_alive_max or '不限'} 个请求")
     print("=" * 50)
     print("💡 使用说明:")
-    print("1. 在本机上访问: http://localhost:8080")
-    print("2. 在其他设备上访问: http://[本机IP]:8080")
+    print(f"1. 在本机上访问: http://localhost:{server_port}")
+    print(f"2. 在其他设备上访问: http://[本机IP]:{server_port}")
     print("3. 选择要上传的HTML课件文件")
     print("4. 点击'上传文件'按钮")
     print("5. 文件将自动保存到uploads目录")
@@ -360,8 +891,9 @@ def main():
     
     try:
         # 自动打开浏览器
-        webbrowser.open(f'http://localhost:{server_port}')
-        print("🚀 浏览器已自动打开...")
+        if not args.no_browser:
+            webbrowser.open(f'http://localhost:{server_port}')
+            print("🚀 浏览器已自动打开...")
         
         # 启动服务器
         server.serve_forever()